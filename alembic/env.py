@@ -0,0 +1,69 @@
+# Purpose: Alembic environment for Family Habit Bot.
+# Context: Схема из app.db.models, URL из настроек (async-драйвер, как у приложения).
+# Requirements: `alembic upgrade head`; шарды - `alembic -x shard=N upgrade head` для каждого DATABASE_SHARD_URLS.
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db.models import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def database_url() -> str:
+    """-x url=... > -x shard=N (1..N из DATABASE_SHARD_URLS) > DATABASE_URL."""
+    args = context.get_x_argument(as_dictionary=True)
+    if args.get("url"):
+        return args["url"]
+    shard = int(args.get("shard", 0))
+    if shard:
+        urls = [url.strip() for url in settings.database_shard_urls.split(",") if url.strip()]
+        return urls[shard - 1]
+    return settings.database_url
+
+
+def run_migrations_offline() -> None:
+    """SQL-скрипт без подключения к БД (`alembic upgrade head --sql`)."""
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    # SQLite не умеет ALTER COLUMN/CONSTRAINT - batch-режим пересоздаёт таблицу
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    engine = create_async_engine(database_url(), poolclass=pool.NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
@@ -0,0 +1,153 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 03:02:38.005348
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'families',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('plan', sa.Enum('FREE', 'PRO', name='plan'), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'shop_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sku', sa.String(length=32), nullable=False),
+        sa.Column('title', sa.String(length=120), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('price_coins', sa.Integer(), nullable=False),
+        sa.Column('image_url', sa.String(length=255), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('sku')
+    )
+    op.create_table(
+        'children',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('family_id', sa.Integer(), nullable=False),
+        sa.Column('tg_id', sa.Integer(), nullable=True),
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('coins', sa.Integer(), nullable=False),
+        sa.Column('avatar', sa.String(length=32), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['family_id'], ['families.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_children_family_id', 'children', ['family_id'])
+    op.create_index('ix_children_tg_id', 'children', ['tg_id'], unique=True)
+
+    op.create_table(
+        'parents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('family_id', sa.Integer(), nullable=False),
+        sa.Column('tg_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=64), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['family_id'], ['families.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_parents_family_id', 'parents', ['family_id'])
+    op.create_index('ix_parents_tg_id', 'parents', ['tg_id'], unique=True)
+
+    op.create_table(
+        'points_ledger',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('child_id', sa.Integer(), nullable=False),
+        sa.Column('delta_points', sa.Integer(), nullable=False),
+        sa.Column('delta_coins', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(length=120), nullable=False),
+        sa.Column('ref_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['child_id'], ['children.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_points_ledger_child_id', 'points_ledger', ['child_id'])
+
+    op.create_table(
+        'purchases',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('child_id', sa.Integer(), nullable=False),
+        sa.Column('item_id', sa.Integer(), nullable=False),
+        sa.Column('cost_coins', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['child_id'], ['children.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['item_id'], ['shop_items.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_purchases_child_id', 'purchases', ['child_id'])
+    op.create_index('ix_purchases_item_id', 'purchases', ['item_id'])
+
+    op.create_table(
+        'tasks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('parent_id', sa.Integer(), nullable=False),
+        sa.Column('child_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=120), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('type', sa.Enum('text', 'photo', 'video', name='tasktype'), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('coins', sa.Integer(), nullable=False),
+        sa.Column('due_at', sa.DateTime(), nullable=True),
+        sa.Column(
+            'status',
+            sa.Enum('new', 'in_progress', 'done', 'approved', 'rejected', name='taskstatus'),
+            nullable=False
+        ),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['child_id'], ['children.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['parent_id'], ['parents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tasks_child_id', 'tasks', ['child_id'])
+    op.create_index('ix_tasks_parent_id', 'tasks', ['parent_id'])
+    op.create_index('ix_tasks_status', 'tasks', ['status'])
+
+    op.create_table(
+        'checkins',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('child_id', sa.Integer(), nullable=False),
+        sa.Column('note', sa.String(length=280), nullable=True),
+        sa.Column('media_id', sa.String(length=128), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['child_id'], ['children.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_checkins_child_id', 'checkins', ['child_id'])
+    op.create_index('ix_checkins_task_id', 'checkins', ['task_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('checkins')
+    op.drop_table('tasks')
+    op.drop_table('purchases')
+    op.drop_table('points_ledger')
+    op.drop_table('parents')
+    op.drop_table('children')
+    op.drop_table('shop_items')
+    op.drop_table('families')
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in ('taskstatus', 'tasktype', 'plan'):
+            op.execute(f'DROP TYPE IF EXISTS {name}')
@@ -0,0 +1,35 @@
+"""task reminders: reminded_at, expired status, (status, due_at) index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 03:10:12.481920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # ADD VALUE нельзя использовать в той же транзакции, где значение добавлено
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE taskstatus ADD VALUE IF NOT EXISTS 'expired'")
+
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('reminded_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_tasks_status_due_at', 'tasks', ['status', 'due_at'])
+
+
+def downgrade() -> None:
+    # Значение enum в PostgreSQL не удаляется; просроченные задания возвращаются в «новые»
+    op.execute("UPDATE tasks SET status = 'new' WHERE status = 'expired'")
+    op.drop_index('ix_tasks_status_due_at', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('reminded_at')
@@ -0,0 +1,26 @@
+"""checkins.media_thumb_id for video previews
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 03:14:51.027364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('checkins') as batch_op:
+        batch_op.add_column(sa.Column('media_thumb_id', sa.String(length=128), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('checkins') as batch_op:
+        batch_op.drop_column('media_thumb_id')
@@ -0,0 +1,37 @@
+"""balance checkpoints for the ledger reconciler
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 03:16:08.593112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'balance_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('child_id', sa.Integer(), nullable=False),
+        sa.Column('ledger_id', sa.Integer(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('coins', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['child_id'], ['children.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_balance_checkpoints_child_ledger', 'balance_checkpoints', ['child_id', 'ledger_id'], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('balance_checkpoints')
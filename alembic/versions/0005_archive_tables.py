@@ -0,0 +1,73 @@
+"""cold archive tables, default partitions and hot+archive views
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 03:18:44.716203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+CHECKIN_COLUMNS = 'id, task_id, child_id, note, media_id, media_thumb_id, created_at'
+LEDGER_COLUMNS = 'id, child_id, delta_points, delta_coins, reason, ref_id, created_at'
+
+VIEWS = {
+    'checkins_all': ('checkins', 'checkins_archive', CHECKIN_COLUMNS),
+    'points_ledger_all': ('points_ledger', 'points_ledger_archive', LEDGER_COLUMNS),
+}
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    # Помесячные партиции создаёт ArchiveService; на PostgreSQL - RANGE (created_at)
+    op.create_table(
+        'checkins_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('child_id', sa.Integer(), nullable=False),
+        sa.Column('note', sa.String(length=280), nullable=True),
+        sa.Column('media_id', sa.String(length=128), nullable=True),
+        sa.Column('media_thumb_id', sa.String(length=128), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_checkins_archive_child_id', 'checkins_archive', ['child_id'])
+
+    op.create_table(
+        'points_ledger_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('child_id', sa.Integer(), nullable=False),
+        sa.Column('delta_points', sa.Integer(), nullable=False),
+        sa.Column('delta_coins', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(length=120), nullable=False),
+        sa.Column('ref_id', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_points_ledger_archive_child_id', 'points_ledger_archive', ['child_id'])
+
+    if dialect == 'postgresql':
+        # Партиция по умолчанию: вставка не падает, даже если помесячная ещё не создана
+        for table in ('checkins_archive', 'points_ledger_archive'):
+            op.execute(f'CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT')
+
+    create = 'CREATE OR REPLACE VIEW' if dialect == 'postgresql' else 'CREATE VIEW IF NOT EXISTS'
+    for name, (hot, cold, columns) in VIEWS.items():
+        op.execute(f'{create} {name} AS SELECT {columns} FROM {hot} UNION ALL SELECT {columns} FROM {cold}')
+
+
+def downgrade() -> None:
+    for name in VIEWS:
+        op.execute(f'DROP VIEW IF EXISTS {name}')
+    op.drop_table('points_ledger_archive')
+    op.drop_table('checkins_archive')
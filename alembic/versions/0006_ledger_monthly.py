@@ -0,0 +1,37 @@
+"""monthly ledger rollups
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 03:21:37.260518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ledger_monthly',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('child_id', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('coins_earned', sa.Integer(), nullable=False),
+        sa.Column('coins_spent', sa.Integer(), nullable=False),
+        sa.Column('tasks', sa.Integer(), nullable=False),
+        sa.Column('purchases', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['child_id'], ['children.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ledger_monthly_child_month', 'ledger_monthly', ['child_id', 'month'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table('ledger_monthly')
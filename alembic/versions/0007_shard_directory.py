@@ -0,0 +1,39 @@
+"""shard directory: family_shards, user_shards
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 03:23:05.918347
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Справочник нужен только в основной БД (DATABASE_URL); на шардах таблицы остаются пустыми
+    op.create_table(
+        'family_shards',
+        sa.Column('family_id', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('family_id')
+    )
+    op.create_table(
+        'user_shards',
+        sa.Column('tg_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('family_id', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('tg_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_shards')
+    op.drop_table('family_shards')
@@ -0,0 +1,25 @@
+"""created_at indexes on points_ledger and checkins
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 03:27:19.640841
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_points_ledger_created_at', 'points_ledger', ['created_at'])
+    op.create_index('ix_checkins_created_at', 'checkins', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_checkins_created_at', table_name='checkins')
+    op.drop_index('ix_points_ledger_created_at', table_name='points_ledger')
@@ -0,0 +1,5 @@
+# Purpose: WebApp JSON API module.
+
+from .routes import router as api_router
+
+__all__ = ["api_router"]
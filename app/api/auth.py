@@ -0,0 +1,103 @@
+# Purpose: Telegram WebApp authentication for the JSON API.
+# Context: Проверка initData (HMAC) один раз и выдача короткоживущего токена.
+# Requirements: Подпись токена секретом приложения, проверка без запросов в БД.
+
+import base64
+import hashlib
+import hmac
+import time
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qsl
+
+import orjson
+from fastapi import Header, HTTPException
+
+from app.core.config import settings
+
+
+class InitDataError(ValueError):
+    """Некорректные или поддельные данные Telegram WebApp."""
+
+
+@dataclass(frozen=True)
+class ApiUser:
+    """Пользователь, аутентифицированный по токену."""
+    tg_id: int
+    first_name: str = ""
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def verify_init_data(init_data: str, bot_token: str, max_age: int) -> dict:
+    """Проверить подпись initData и вернуть данные пользователя Telegram."""
+    fields = dict(parse_qsl(init_data, keep_blank_values=True))
+    received_hash = fields.pop("hash", None)
+    if not received_hash:
+        raise InitDataError("hash is missing")
+
+    data_check_string = "\n".join(f"{key}={fields[key]}" for key in sorted(fields))
+    secret = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+    expected = hmac.new(secret, data_check_string.encode(), hashlib.sha256).hexdigest()
+    # Байты, а не str: compare_digest падает с TypeError на не-ASCII строках
+    if not hmac.compare_digest(expected.encode(), received_hash.encode()):
+        raise InitDataError("bad signature")
+
+    try:
+        auth_date = int(fields.get("auth_date", 0))
+    except ValueError:
+        raise InitDataError("bad auth_date")
+    if max_age and time.time() - auth_date > max_age:
+        raise InitDataError("initData expired")
+
+    try:
+        user = orjson.loads(fields["user"])
+    except (KeyError, orjson.JSONDecodeError):
+        raise InitDataError("user is missing")
+    return user
+
+
+def _sign(payload: bytes) -> str:
+    digest = hmac.new(settings.secret_key.encode(), payload, hashlib.sha256).digest()
+    return _b64encode(digest)
+
+
+def issue_token(user: ApiUser, ttl: Optional[int] = None) -> tuple[str, int]:
+    """Выдать подписанный токен; возвращает (token, expires_at)."""
+    expires_at = int(time.time()) + (ttl or settings.api_token_ttl)
+    payload = orjson.dumps({"uid": user.tg_id, "name": user.first_name, "exp": expires_at})
+    return f"{_b64encode(payload)}.{_sign(payload)}", expires_at
+
+
+def read_token(token: str) -> ApiUser:
+    """Проверить подпись и срок действия токена."""
+    try:
+        encoded_payload, signature = token.split(".", 1)
+        payload = _b64decode(encoded_payload)
+    except ValueError:
+        raise InitDataError("malformed token")
+
+    if not hmac.compare_digest(_sign(payload).encode(), signature.encode()):
+        raise InitDataError("bad token signature")
+
+    data = orjson.loads(payload)
+    if data["exp"] < time.time():
+        raise InitDataError("token expired")
+    return ApiUser(tg_id=data["uid"], first_name=data.get("name", ""))
+
+
+async def current_user(authorization: str = Header(default="")) -> ApiUser:
+    """FastAPI dependency: пользователь из заголовка Authorization: Bearer."""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    try:
+        return read_token(token)
+    except InitDataError as e:
+        raise HTTPException(status_code=401, detail=str(e))
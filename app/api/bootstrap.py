@@ -0,0 +1,147 @@
+# Purpose: Aggregated first-screen payload for the WebApp.
+# Context: Роль, семья с балансами, задания и каталог одним ответом.
+# Requirements: Параллельные запросы на отдельных соединениях, кэш на пользователя.
+
+import asyncio
+import itertools
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import StaticPool
+
+from app.api.schemas import FamilyOut, MeOut, ShopItemOut, TaskOut
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.events import event_hub
+from app.db.models import TaskStatus
+from app.db.shards import shard_router
+from app.services import FamilyService, ShopService, TaskService
+from app.services.user_resolver import ResolvedUser
+
+T = TypeVar("T")
+
+
+class BootstrapCache:
+    """Кэш готовых bootstrap-ответов (JSON bytes) с индексом по семье."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 30.0):
+        self._payloads: TTLCache[int, bytes] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Индекс и версии живут не дольше ответов: семьи, которые давно не открывали WebApp, вытесняются
+        self._family_members: TTLCache[int, set[int]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: TTLCache[int, int] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._clock = itertools.count(1)
+
+    def get(self, tg_id: int) -> Optional[bytes]:
+        return self._payloads.get(tg_id)
+
+    def version(self, family_id: Optional[int]) -> int:
+        """Версия семьи; берётся до сборки ответа и передаётся в set."""
+        return self._versions.get(family_id, 0) if family_id is not None else 0
+
+    def set(self, tg_id: int, family_id: Optional[int], payload: bytes, version: int) -> bool:
+        """Сохранить ответ, если семью не меняли с момента version (иначе он уже устарел)."""
+        if family_id is not None:
+            if self.version(family_id) != version:
+                return False
+            members = self._family_members.get(family_id) or set()
+            members.add(tg_id)
+            self._family_members.set(family_id, members)
+        self._payloads.set(tg_id, payload)
+        return True
+
+    def invalidate_user(self, tg_id: int) -> None:
+        self._payloads.pop(tg_id)
+
+    def invalidate_family(self, family_id: int) -> None:
+        """Сбросить ответы всех участников семьи после записи."""
+        # Глобальный счётчик: версия не повторится, даже если запись о семье вытеснят
+        self._versions.set(family_id, next(self._clock))
+        for tg_id in self._family_members.pop(family_id, ()):
+            self._payloads.pop(tg_id)
+
+    def clear(self) -> None:
+        self._payloads.clear()
+        self._family_members.clear()
+        self._versions.clear()
+
+
+bootstrap_cache = BootstrapCache(ttl=settings.bootstrap_cache_ttl)
+
+
+def _invalidate_on_event(channel: str, event: dict) -> None:
+    # События заданий/покупок приходят из сервисов (в том числе из бота через Redis)
+    kind, _, family_id = channel.partition(":")
+    if kind == "family":
+        bootstrap_cache.invalidate_family(int(family_id))
+
+
+event_hub.add_listener(_invalidate_on_event)
+
+# Каталог общий для всех пользователей и меняется редко
+_catalog_cache: TTLCache[str, list] = TTLCache(maxsize=1, ttl=300.0)
+
+
+def _supports_parallel_sessions(shard: int) -> bool:
+    # StaticPool (SQLite) держит одно соединение на всех - параллелить нечего
+    return not isinstance(shard_router.engine(shard).pool, StaticPool)
+
+
+async def _in_own_session(shard: int, fn: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    async with shard_router.sessionmaker(shard)() as session:
+        return await fn(session)
+
+
+async def _load_family(session: AsyncSession, family_id: int) -> Optional[dict]:
+    family = await FamilyService(session).get_family_with_members(family_id)
+    return FamilyOut.model_validate(family).model_dump() if family else None
+
+
+async def _load_tasks(session: AsyncSession, user: ResolvedUser) -> list[dict]:
+    service = TaskService(session)
+    if user.role == "parent":
+        tasks = await service.get_pending_tasks(user.db_id)
+    else:
+        tasks = await service.get_tasks_for_child(user.db_id, TaskStatus.new)
+    return [TaskOut.model_validate(task).model_dump() for task in tasks]
+
+
+async def _load_catalog(session: AsyncSession) -> list[dict]:
+    catalog = _catalog_cache.get("items")
+    if catalog is None:
+        items = await ShopService(session).get_items()
+        catalog = [ShopItemOut.model_validate(item).model_dump() for item in items]
+        _catalog_cache.set("items", catalog)
+    return catalog
+
+
+async def build_bootstrap(session: AsyncSession, tg_id: int, user: Optional[ResolvedUser]) -> bytes:
+    """Собрать (или взять из кэша) bootstrap-ответ пользователя."""
+    cached = bootstrap_cache.get(tg_id)
+    if cached is not None:
+        return cached
+
+    if user is None:
+        payload = {"me": MeOut(role="unknown").model_dump(exclude={"family"}), "family": None, "tasks": [], "shop": []}
+        return orjson.dumps(payload)
+
+    version = bootstrap_cache.version(user.family_id)
+    loaders = (
+        lambda s: _load_family(s, user.family_id),
+        lambda s: _load_tasks(s, user),
+        _load_catalog,
+    )
+    shard = shard_router.shard_of(session)
+    if _supports_parallel_sessions(shard):
+        family, tasks, shop = await asyncio.gather(*(_in_own_session(shard, load) for load in loaders))
+    else:
+        family, tasks, shop = [await load(session) for load in loaders]
+
+    payload = orjson.dumps({
+        "me": MeOut(role=user.role, user_id=user.db_id).model_dump(exclude={"family"}),
+        "family": family,
+        "tasks": tasks,
+        "shop": shop,
+    })
+    bootstrap_cache.set(tg_id, user.family_id, payload, version)
+    return payload
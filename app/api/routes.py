@@ -0,0 +1,338 @@
+# Purpose: WebApp JSON API endpoints.
+# Context: FastAPI роутер поверх TaskService/ParentService/ShopService.
+# Requirements: Аутентификация по токену, ответы через orjson.
+
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.bootstrap import bootstrap_cache, build_bootstrap
+from app.api.auth import ApiUser, InitDataError, current_user, issue_token, read_token, verify_init_data
+from app.api.schemas import (
+    AuthRequest, AuthResponse, CheckInOut, MeOut, FamilyOut, RegistrationRequest, ChildrenRequest,
+    ChildOut, TaskOut, TaskCreateRequest, TaskSubmitRequest, ShopItemOut, LedgerEntryOut,
+    PurchaseRequest, PurchaseOut, ChildStatsOut, MonthStatsOut, StatusResponse
+)
+from app.core.config import settings
+from app.core.events import event_hub, family_channel
+from app.db.models import CheckIn, Child, Task, TaskStatus, TaskType
+from app.db.shards import shard_router
+from app.services import FamilyService, LedgerService, ParentService, ShopService, StatsService, TaskService
+from app.services.media_cache import get_media_cache
+from app.services.user_resolver import ResolvedUser, user_resolver
+from app.core import get_logger
+
+router = APIRouter(prefix="/api", default_response_class=ORJSONResponse)
+logger = get_logger(__name__)
+
+
+@router.on_event("startup")
+async def start_event_backplane():
+    """Redis backplane для событий между репликами."""
+    if settings.events_backend == "redis":
+        await event_hub.start_backplane(settings.redis_url)
+
+
+@router.on_event("shutdown")
+async def stop_event_backplane():
+    await event_hub.stop_backplane()
+
+
+async def _user_session(user: ApiUser = Depends(current_user)) -> AsyncIterator[AsyncSession]:
+    """Сессия на шарде семьи пользователя (без шардинга - основная БД)."""
+    async with shard_router.session_for_user(user.tg_id) as session:
+        yield session
+
+
+async def _require_user(session: AsyncSession, user: ApiUser, role: str | None = None) -> ResolvedUser:
+    resolved = await user_resolver.resolve(session, user.tg_id)
+    if not resolved:
+        raise HTTPException(status_code=403, detail="User is not registered")
+    if role and resolved.role != role:
+        raise HTTPException(status_code=403, detail=f"Only {role} can do this")
+    return resolved
+
+
+async def _family_child(session: AsyncSession, resolved: ResolvedUser, child_id: int) -> Child:
+    child = await session.get(Child, child_id)
+    if not child or child.family_id != resolved.family_id:
+        raise HTTPException(status_code=404, detail="Child not found")
+    return child
+
+
+@router.post("/auth/telegram", response_model=AuthResponse)
+@router.post("/telegram/user-data", response_model=AuthResponse)
+async def authenticate(body: AuthRequest):
+    """Проверить initData и выдать токен для последующих вызовов."""
+    try:
+        tg_user = verify_init_data(body.init_data, settings.TELEGRAM_BOT_TOKEN, settings.webapp_auth_max_age)
+    except InitDataError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    user = ApiUser(tg_id=int(tg_user["id"]), first_name=tg_user.get("first_name", ""))
+    async with shard_router.session_for_user(user.tg_id) as session:
+        resolved = await user_resolver.resolve(session, user.tg_id)
+    token, expires_at = issue_token(user)
+    return AuthResponse(token=token, expires_at=expires_at, role=resolved.role if resolved else "unknown")
+
+
+@router.get("/me", response_model=MeOut)
+async def get_me(user: ApiUser = Depends(current_user), session: AsyncSession = Depends(_user_session)):
+    """Роль пользователя и его семья."""
+    resolved = await user_resolver.resolve(session, user.tg_id)
+    if not resolved:
+        return MeOut(role="unknown")
+
+    family = await FamilyService(session).get_family_with_members(resolved.family_id)
+    return MeOut(
+        role=resolved.role,
+        user_id=resolved.db_id,
+        family=FamilyOut.model_validate(family) if family else None
+    )
+
+
+@router.get("/bootstrap")
+async def bootstrap(user: ApiUser = Depends(current_user), session: AsyncSession = Depends(_user_session)):
+    """Все данные первого экрана WebApp одним ответом."""
+    resolved = await user_resolver.resolve(session, user.tg_id)
+    payload = await build_bootstrap(session, user.tg_id, resolved)
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get("/events")
+async def stream_events(request: Request, token: str):
+    """Server-Sent Events семьи: изменения заданий и балансов."""
+    try:
+        user = read_token(token)  # EventSource не умеет передавать заголовки
+    except InitDataError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    # Сессия только на проверку: не держим соединение с БД всё время стрима
+    async with shard_router.session_for_user(user.tg_id) as session:
+        resolved = await _require_user(session, user)
+
+    subscription = event_hub.subscribe(family_channel(resolved.family_id))
+
+    async def stream():
+        with subscription:
+            yield b"retry: 3000\n\n"
+            while not await request.is_disconnected():
+                message = await subscription.get(timeout=settings.events_ping_interval)
+                if message is None:
+                    yield b": ping\n\n"
+                else:
+                    yield b"data: " + message + b"\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/registration", response_model=MeOut)
+async def register_parent(
+    body: RegistrationRequest,
+    user: ApiUser = Depends(current_user),
+    session: AsyncSession = Depends(_user_session)
+):
+    """Зарегистрировать родителя и создать семью."""
+    if not await user_resolver.resolve(session, user.tg_id):
+        await ParentService(session).create_parent(user.tg_id, body.name or user.first_name)
+        bootstrap_cache.invalidate_user(user.tg_id)
+    return await get_me(user, session)
+
+
+@router.post("/children", response_model=list[ChildOut])
+async def add_children(
+    body: ChildrenRequest,
+    user: ApiUser = Depends(current_user),
+    session: AsyncSession = Depends(_user_session)
+):
+    """Добавить детей в семью родителя."""
+    resolved = await _require_user(session, user, "parent")
+    children = await ParentService(session).add_children_to_family(
+        resolved.db_id, [(child.name, child.avatar) for child in body.children]
+    )
+    bootstrap_cache.invalidate_family(resolved.family_id)
+    return children
+
+
+@router.get("/tasks", response_model=list[TaskOut])
+async def list_tasks(user: ApiUser = Depends(current_user), session: AsyncSession = Depends(_user_session)):
+    """Задания ребёнка или задания, созданные родителем."""
+    resolved = await _require_user(session, user)
+    service = TaskService(session)
+    if resolved.role == "parent":
+        return await service.get_tasks_by_parent(resolved.db_id)
+    return await service.get_tasks_for_child(resolved.db_id)
+
+
+@router.post("/tasks/create", response_model=TaskOut)
+async def create_task(
+    body: TaskCreateRequest,
+    user: ApiUser = Depends(current_user),
+    session: AsyncSession = Depends(_user_session)
+):
+    """Создать задание для ребёнка из семьи родителя."""
+    resolved = await _require_user(session, user, "parent")
+    await _family_child(session, resolved, body.child_id)
+    return await TaskService(session).create_task(
+        parent_id=resolved.db_id,
+        child_id=body.child_id,
+        title=body.title,
+        description=body.description,
+        task_type=body.type,
+        points=body.points,
+        coins=body.coins,
+        due_at=body.due_at
+    )
+
+
+@router.post("/tasks/{task_id}/submit", response_model=StatusResponse)
+async def submit_task(
+    task_id: int,
+    body: TaskSubmitRequest,
+    user: ApiUser = Depends(current_user),
+    session: AsyncSession = Depends(_user_session)
+):
+    """Сдать задание на проверку."""
+    resolved = await _require_user(session, user, "child")
+    if not await TaskService(session).submit_task(task_id, resolved.db_id, note=body.note):
+        raise HTTPException(status_code=409, detail="Task cannot be submitted")
+    return StatusResponse()
+
+
+@router.post("/tasks/{task_id}/approve", response_model=StatusResponse)
+async def approve_task(task_id: int, user: ApiUser = Depends(current_user), session: AsyncSession = Depends(_user_session)):
+    """Одобрить выполненное задание."""
+    resolved = await _require_user(session, user, "parent")
+    if not await TaskService(session).approve_task(task_id, resolved.db_id):
+        raise HTTPException(status_code=409, detail="Task cannot be approved")
+    return StatusResponse()
+
+
+@router.post("/tasks/{task_id}/reject", response_model=StatusResponse)
+async def reject_task(task_id: int, user: ApiUser = Depends(current_user), session: AsyncSession = Depends(_user_session)):
+    """Отклонить выполненное задание."""
+    resolved = await _require_user(session, user, "parent")
+    if not await TaskService(session).reject_task(task_id, resolved.db_id):
+        raise HTTPException(status_code=409, detail="Task cannot be rejected")
+    return StatusResponse()
+
+
+def _thumbnail_source(task: Task, checkin: CheckIn) -> str | None:
+    # Для видео берём превью Telegram, а не сам ролик
+    if task.type == TaskType.video:
+        return checkin.media_thumb_id
+    return checkin.media_id
+
+
+@router.get("/checkins/pending", response_model=list[CheckInOut])
+async def list_pending_checkins(user: ApiUser = Depends(current_user), session: AsyncSession = Depends(_user_session)):
+    """Сданные задания для экрана проверки родителя."""
+    resolved = await _require_user(session, user, "parent")
+    pending = await TaskService(session).get_pending_checkins(resolved.db_id)
+    return [
+        CheckInOut(
+            checkin_id=checkin.id,
+            task=TaskOut.model_validate(task),
+            note=checkin.note,
+            has_media=checkin.media_id is not None,
+            thumbnail_url=f"/api/checkins/{checkin.id}/thumbnail" if _thumbnail_source(task, checkin) else None,
+            created_at=checkin.created_at
+        )
+        for task, checkin in pending
+    ]
+
+
+@router.get("/checkins/{checkin_id}/thumbnail")
+async def get_checkin_thumbnail(
+    checkin_id: int,
+    user: ApiUser = Depends(current_user),
+    session: AsyncSession = Depends(_user_session)
+):
+    """Превью медиа чекина из локального кэша (скачивается один раз)."""
+    resolved = await _require_user(session, user)
+    checkin = await session.get(CheckIn, checkin_id)
+    task = await session.get(Task, checkin.task_id) if checkin else None
+    if not task:
+        raise HTTPException(status_code=404, detail="Check-in not found")
+    await _family_child(session, resolved, task.child_id)
+
+    file_id = _thumbnail_source(task, checkin)
+    if not file_id:
+        raise HTTPException(status_code=404, detail="Check-in has no media")
+    try:
+        path = await get_media_cache().get_thumbnail(file_id)
+    except Exception as e:
+        logger.warning(f"Failed to fetch thumbnail for check-in {checkin_id}: {e}")
+        raise HTTPException(status_code=502, detail="Media is unavailable")
+    return FileResponse(path, media_type="image/jpeg", headers={"Cache-Control": "private, max-age=86400"})
+
+
+@router.get("/shop/items", response_model=list[ShopItemOut])
+async def list_shop_items(user: ApiUser = Depends(current_user), session: AsyncSession = Depends(_user_session)):
+    """Каталог магазина."""
+    return await ShopService(session).get_items()
+
+
+@router.post("/shop/purchase", response_model=PurchaseOut)
+async def purchase_item(
+    body: PurchaseRequest,
+    user: ApiUser = Depends(current_user),
+    session: AsyncSession = Depends(_user_session)
+):
+    """Купить товар: ребёнок за себя, родитель - за ребёнка из семьи."""
+    resolved = await _require_user(session, user)
+    if resolved.role == "child":
+        child_id = resolved.db_id
+    elif body.child_id is not None:
+        child_id = (await _family_child(session, resolved, body.child_id)).id
+    else:
+        raise HTTPException(status_code=400, detail="child_id is required")
+
+    try:
+        return await ShopService(session).purchase(child_id, body.item_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/children/{child_id}/ledger", response_model=list[LedgerEntryOut])
+async def export_ledger(
+    child_id: int,
+    limit: int = 100,
+    before_id: int | None = None,
+    user: ApiUser = Depends(current_user),
+    session: AsyncSession = Depends(_user_session)
+):
+    """Выгрузка журнала начислений ребёнка, включая архив (страницы по before_id)."""
+    resolved = await _require_user(session, user)
+    if resolved.role == "child" and resolved.db_id != child_id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    await _family_child(session, resolved, child_id)
+    return await LedgerService(session).get_history(child_id, min(max(limit, 1), 1000), before_id)
+
+
+@router.get("/user/{user_id}/stats")
+async def get_user_stats(user_id: int, user: ApiUser = Depends(current_user), session: AsyncSession = Depends(_user_session)):
+    """Статистика пользователя (user_id - Telegram ID)."""
+    if user_id != user.tg_id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    resolved = await _require_user(session, user)
+    if resolved.role == "parent":
+        return await ParentService(session).get_family_stats(resolved.db_id)
+
+    child = await session.get(Child, resolved.db_id)
+    counts = await TaskService(session).count_tasks_by_status(resolved.db_id)
+    by_month = (await StatsService(session).monthly([child.id])).get(child.id, {})
+    return ChildStatsOut(
+        child_id=child.id,
+        points=child.points,
+        coins=child.coins,
+        tasks_completed=counts.get(TaskStatus.approved, 0),
+        tasks_pending=counts.get(TaskStatus.new, 0) + counts.get(TaskStatus.in_progress, 0),
+        months=[MonthStatsOut(month=month, **values) for month, values in sorted(by_month.items())]
+    )
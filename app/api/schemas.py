@@ -0,0 +1,178 @@
+# Purpose: Pydantic schemas for the WebApp JSON API.
+# Context: Компактные модели запросов и ответов.
+# Requirements: Валидация входных данных, сериализация ORM-объектов.
+
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from app.db.models import TaskType, TaskStatus
+
+
+class ORMModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+
+# --- Auth ---
+
+class AuthRequest(BaseModel):
+    init_data: str
+
+
+class AuthResponse(BaseModel):
+    token: str
+    expires_at: int
+    role: str
+
+
+# --- Family ---
+
+class ChildOut(ORMModel):
+    id: int
+    name: str
+    points: int
+    coins: int
+    avatar: Optional[str] = None
+
+
+class ParentOut(ORMModel):
+    id: int
+    name: Optional[str] = None
+
+
+class FamilyOut(ORMModel):
+    id: int
+    plan: str
+    parents: list[ParentOut] = []
+    children: list[ChildOut] = []
+
+
+class MeOut(BaseModel):
+    role: str
+    user_id: Optional[int] = None
+    family: Optional[FamilyOut] = None
+
+
+class RegistrationRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    name: Optional[str] = Field(default=None, max_length=64)
+
+
+class ChildIn(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    name: str = Field(min_length=1, max_length=64)
+    avatar: Optional[str] = Field(default=None, max_length=32)
+
+
+class ChildrenRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    children: list[ChildIn] = Field(min_length=1, max_length=20)
+
+
+# --- Tasks ---
+
+class TaskOut(ORMModel):
+    id: int
+    child_id: int
+    title: str
+    description: str
+    type: TaskType
+    status: TaskStatus
+    points: int
+    coins: int
+    due_at: Optional[datetime] = None
+
+
+class CheckInOut(BaseModel):
+    checkin_id: int
+    task: TaskOut
+    note: Optional[str] = None
+    has_media: bool
+    thumbnail_url: Optional[str] = None
+    created_at: datetime
+
+
+class TaskCreateRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    child_id: int
+    title: str = Field(min_length=3, max_length=120)
+    description: str = Field(min_length=5)
+    type: TaskType = TaskType.text
+    points: int = Field(default=5, ge=1, le=100)
+    coins: int = Field(default=0, ge=0, le=100)
+    due_at: Optional[datetime] = None
+
+    @field_validator("due_at")
+    @classmethod
+    def naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Сроки хранятся naive UTC (TIMESTAMP, utcnow планировщика); toISOString() присылает 'Z'."""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+class TaskSubmitRequest(BaseModel):
+    note: Optional[str] = Field(default=None, max_length=280)
+
+
+# --- Shop ---
+
+class ShopItemOut(ORMModel):
+    id: int
+    sku: str
+    title: str
+    description: Optional[str] = None
+    price_coins: int
+    image_url: Optional[str] = None
+
+
+class PurchaseRequest(BaseModel):
+    item_id: int
+    child_id: Optional[int] = None
+
+
+class PurchaseOut(ORMModel):
+    id: int
+    child_id: int
+    item_id: int
+    cost_coins: int
+
+
+# --- Ledger ---
+
+class LedgerEntryOut(ORMModel):
+    id: int
+    delta_points: int
+    delta_coins: int
+    reason: str
+    ref_id: Optional[int] = None
+    created_at: datetime
+
+
+# --- Stats ---
+
+class MonthStatsOut(BaseModel):
+    month: date
+    points: int
+    coins_earned: int
+    coins_spent: int
+    tasks: int
+    purchases: int
+
+
+class ChildStatsOut(BaseModel):
+    child_id: int
+    points: int
+    coins: int
+    tasks_completed: int
+    tasks_pending: int
+    months: list[MonthStatsOut] = []  # Последние 12 месяцев, старые сверху
+
+
+class StatusResponse(BaseModel):
+    status: str = "ok"
@@ -0,0 +1 @@
+# Purpose: Benchmarks and performance reports.
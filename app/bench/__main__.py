@@ -0,0 +1,6 @@
+# Purpose: `python -m app.bench` - service-layer benchmark suite.
+# Context: Остальные бенчмарки запускаются своими модулями (app.bench.load, app.bench.keyboards, ...).
+
+from app.bench.services import main
+
+main()
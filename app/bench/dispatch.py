@@ -0,0 +1,99 @@
+# Purpose: Text command dispatch benchmark.
+# Context: Цепочка lambda-фильтров по роутерам против таблицы кнопок (TextCommandRouter).
+# Requirements: Стоимость маршрутизации на update в зависимости от числа кнопок.
+
+import argparse
+import asyncio
+import logging
+import time
+
+from aiogram import Dispatcher, Router
+from aiogram.filters import Command
+from aiogram.types import Update
+
+from app.bench.fake_bot import create_fake_bot
+from app.bot.text_commands import TextCommandRouter
+
+# Как у webapp_router: команды проверяются раньше кнопок
+COMMANDS = ("app", "webapp", "start", "family", "tasks", "shop", "profile", "stats", "support")
+
+
+async def _noop(message) -> None:
+    return None
+
+
+def _command_router() -> Router:
+    router = Router()
+    for command in COMMANDS:
+        router.message.register(_noop, Command(command))
+    return router
+
+
+def legacy_dispatcher(buttons: list[str], routers: int = 3) -> Dispatcher:
+    """Кнопки как `lambda message: message.text == ...`, разложенные по нескольким роутерам."""
+    dp = Dispatcher()
+    dp.include_router(_command_router())
+    groups = [Router() for _ in range(routers)]
+    for index, text in enumerate(buttons):
+        groups[index % routers].message.register(_noop, lambda message, text=text: message.text == text)
+    for router in groups:
+        dp.include_router(router)
+    return dp
+
+
+def table_dispatcher(buttons: list[str]) -> Dispatcher:
+    dp = Dispatcher()
+    table = TextCommandRouter()
+    for text in buttons:
+        table.button(text)(_noop)
+    dp.include_router(table)
+    dp.include_router(_command_router())
+    return dp
+
+
+def _update(update_id: int, text: str) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Bench"},
+            "text": text,
+        },
+    })
+
+
+async def _per_update_us(dp: Dispatcher, bot, updates: list[Update]) -> float:
+    for update in updates[:20]:
+        await dp.feed_update(bot, update)  # Прогрев
+    started = time.perf_counter()
+    for update in updates:
+        await dp.feed_update(bot, update)
+    return (time.perf_counter() - started) / len(updates) * 1e6
+
+
+async def run(sizes: list[int], iterations: int) -> None:
+    # Лог «Update is handled» на каждый update исказил бы замер
+    logging.getLogger("aiogram.event").setLevel(logging.WARNING)
+    bot = create_fake_bot(record=False)
+    print(f"\n🔀 Dispatch overhead per update ({iterations} updates, last button of the table)")
+    print(f"  {'buttons':>8}{'lambda µs':>12}{'table µs':>11}{'speedup':>9}")
+    for size in sizes:
+        buttons = [f"🔘 Кнопка {i}" for i in range(size)]
+        updates = [_update(i, buttons[-1]) for i in range(iterations)]
+        legacy_us = await _per_update_us(legacy_dispatcher(buttons), bot, updates)
+        table_us = await _per_update_us(table_dispatcher(buttons), bot, updates)
+        print(f"  {size:>8}{legacy_us:>12.1f}{table_us:>11.1f}{legacy_us / table_us:>8.1f}x")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Reply-keyboard dispatch benchmark")
+    parser.add_argument("--sizes", default="3,10,30,100,300")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args(argv)
+    asyncio.run(run([int(size) for size in args.sizes.split(",")], args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Purpose: Offline Bot API session for benchmarks.
+# Context: Handler работают как с настоящим Telegram, но запросы не уходят в сеть.
+# Requirements: Сериализация запросов как в реальной сессии, правдоподобные ответы, задержка по желанию.
+
+import asyncio
+import itertools
+from datetime import datetime
+from typing import Any, AsyncGenerator, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import Chat, Message, User
+
+BOT_USER = User(id=42, is_bot=True, first_name="FamilyHabitBot", username="family_habit_bot")
+
+
+class FakeBotSession(BaseSession):
+    """Сессия, которая отвечает на методы Bot API локально и запоминает вызовы."""
+
+    def __init__(self, latency: float = 0.0, record: bool = True):
+        super().__init__()
+        self.latency = latency
+        self.record = record
+        self.requests: list[tuple[str, dict]] = []
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None) -> TelegramType:
+        # Подготовка полей как у настоящей сессии (сериализация разметки и т.д.)
+        files: dict[str, Any] = {}
+        payload = {
+            key: self.prepare_value(value, bot=bot, files=files)
+            for key, value in method.model_dump(warnings=False).items()
+            if value is not None
+        }
+        if self.record:
+            self.requests.append((type(method).__name__, payload))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._result(method)
+
+    def _result(self, method: TelegramMethod) -> Any:
+        returning = method.__returning__
+        if returning is User:
+            return BOT_USER
+        if returning is bool:
+            return True
+        chat_id = getattr(method, "chat_id", None)
+        if returning is Message or chat_id is not None:
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.now(),
+                chat=Chat(id=chat_id if isinstance(chat_id, int) else 0, type="private"),
+                from_user=BOT_USER,
+                text=getattr(method, "text", None)
+            )
+        return True
+
+    async def stream_content(self, url: str, headers: Optional[dict] = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def create_fake_bot(latency: float = 0.0, record: bool = True) -> Bot:
+    """Bot с офлайн-сессией (токен формально валидный)."""
+    return Bot(token="42:FAKE-TOKEN-FOR-BENCHMARKS", session=FakeBotSession(latency, record), parse_mode="HTML")
@@ -0,0 +1,143 @@
+# Purpose: Keyboard registry and handler CPU benchmark.
+# Context: Сравнение сборки разметки на каждый update с готовыми клавиатурами + CPU на update.
+# Requirements: Офлайн (FakeBotSession), БД в памяти, запуск `python -m app.bench.keyboards`.
+
+import argparse
+import asyncio
+import time
+import timeit
+from types import SimpleNamespace
+
+from aiogram.types import (
+    InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup, Update, WebAppInfo
+)
+
+from app.core.config import settings
+
+
+def legacy_main_keyboard(role: str) -> ReplyKeyboardMarkup:
+    """Как было: разметка собирается заново на каждый вызов."""
+    if role == "parent":
+        webapp_url = f"{settings.WEBAPP_URL}/parent"
+        buttons = [
+            [KeyboardButton(text="🏠 Семейная панель", web_app=WebAppInfo(url=webapp_url))],
+            [KeyboardButton(text="📝 Создать задание")],
+            [KeyboardButton(text="📊 Статистика"), KeyboardButton(text="👨‍👩‍👧‍👦 Дети")]
+        ]
+    else:
+        webapp_url = f"{settings.WEBAPP_URL}/child"
+        buttons = [
+            [KeyboardButton(text="🎮 Мои задания", web_app=WebAppInfo(url=webapp_url))],
+            [KeyboardButton(text="🏆 Мои очки"), KeyboardButton(text="🛒 Магазин")]
+        ]
+    return ReplyKeyboardMarkup(keyboard=buttons, resize_keyboard=True)
+
+
+def legacy_child_picker(children) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=f"👦👧 {child.name}", callback_data=f"child_{child.id}")]
+        for child in children
+    ] + [[InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_task")]])
+
+
+def legacy_type_keyboard() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📝 Текст", callback_data="type_text")],
+        [InlineKeyboardButton(text="📸 Фото", callback_data="type_photo")],
+        [InlineKeyboardButton(text="🎥 Видео", callback_data="type_video")],
+        [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_task")]
+    ])
+
+
+def bench_markups(number: int) -> None:
+    from app.bot.keyboards import TASK_TYPE_KEYBOARD, child_picker, main_keyboard
+
+    children = [SimpleNamespace(id=i, name=f"Ребёнок {i}") for i in range(1, 4)]
+    cases = [
+        ("main keyboard", lambda: legacy_main_keyboard("parent"), lambda: main_keyboard("parent")),
+        ("child picker", lambda: legacy_child_picker(children), lambda: child_picker(children)),
+        ("task type keyboard", legacy_type_keyboard, lambda: TASK_TYPE_KEYBOARD),
+    ]
+    print(f"\n⌨️  Markup per call ({number} calls)")
+    print(f"  {'case':<22}{'rebuild µs':>12}{'registry µs':>13}{'speedup':>9}")
+    for name, legacy, cached in cases:
+        legacy_us = timeit.timeit(legacy, number=number) / number * 1e6
+        cached_us = timeit.timeit(cached, number=number) / number * 1e6
+        print(f"  {name:<22}{legacy_us:>12.2f}{cached_us:>13.2f}{legacy_us / cached_us:>8.1f}x")
+
+
+async def _seed(parent_tg: int, child_count: int) -> None:
+    from app.db.models import Base, Family, Parent, Child
+    from app.db.session import SessionLocal, get_engine
+
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        family = Family()
+        session.add(family)
+        await session.flush()
+        session.add(Parent(tg_id=parent_tg, family_id=family.id, name="Родитель"))
+        session.add_all(
+            Child(tg_id=parent_tg + i, family_id=family.id, name=f"Ребёнок {i}") for i in range(1, child_count + 1)
+        )
+        await session.commit()
+
+
+def _message_update(update_id: int, tg_id: int, text: str) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": tg_id, "type": "private"},
+            "from": {"id": tg_id, "is_bot": False, "first_name": "Родитель"},
+            "text": text,
+        },
+    })
+
+
+async def bench_handlers(iterations: int) -> None:
+    from app.bench.fake_bot import create_fake_bot
+    from app.bot.main import create_dispatcher
+    from app.db.session import get_engine
+
+    # Лимиты не должны отбрасывать повторные update бенчмарка
+    settings.throttle_enabled = False
+    parent_tg = 1000
+    await _seed(parent_tg, child_count=3)
+
+    bot = create_fake_bot(record=False)
+    dp = await create_dispatcher()
+    update_ids = iter(range(1, 10 ** 9))
+
+    cases = ["/app", "/family", "📝 Создать задание", "/support"]
+    print(f"\n⚙️  Handler CPU per update ({iterations} updates each, fake Bot API, in-memory DB)")
+    print(f"  {'update':<24}{'cpu µs':>10}{'wall µs':>10}")
+    for text in cases:
+        # Прогрев: кэши пользователей и клавиатур
+        await dp.feed_update(bot, _message_update(next(update_ids), parent_tg, text))
+        updates = [_message_update(next(update_ids), parent_tg, text) for _ in range(iterations)]
+        cpu, wall = time.process_time(), time.perf_counter()
+        for update in updates:
+            await dp.feed_update(bot, update)
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        print(f"  {text:<24}{cpu / iterations * 1e6:>10.0f}{wall / iterations * 1e6:>10.0f}")
+
+    await dp.storage.close()
+    await get_engine().dispose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Keyboard registry and handler CPU benchmark")
+    parser.add_argument("--number", type=int, default=20000, help="calls per markup case")
+    parser.add_argument("--iterations", type=int, default=300, help="updates per handler case")
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///:memory:")
+    args = parser.parse_args(argv)
+
+    settings.database_url = args.database_url
+    bench_markups(args.number)
+    asyncio.run(bench_handlers(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
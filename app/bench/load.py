@@ -0,0 +1,390 @@
+# Purpose: End-to-end load harness for the bot.
+# Context: Настоящий Dispatcher из create_dispatcher, офлайн Bot API (FakeBotSession), синтетические семьи.
+# Requirements: Пропускная способность, p50/p95/p99 и SQL-запросы на handler, baseline для поиска регрессий.
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import sys
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.types import TelegramObject, Update
+
+from app.core.config import settings
+
+# Синтетические пользователи: не пересекаются с сидом (app.bench.seed) и между собой
+TG_LOAD_BASE = 1_800_000_000
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу (values уже отсортированы)."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))]
+
+
+@dataclass
+class Sample:
+    """Один update: какой handler его обработал."""
+    handler: str = "unhandled"
+
+
+_sample: ContextVar[Optional[Sample]] = ContextVar("load_sample", default=None)
+
+
+class HandlerProbe(BaseMiddleware):
+    """Внутренняя middleware: запоминает handler, выбранный роутером."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        from app.bot.middlewares.profiler import handler_name
+
+        sample = _sample.get()
+        if sample is not None:
+            sample.handler = handler_name(data)
+        return await handler(event, data)
+
+
+@dataclass
+class HandlerStats:
+    """Задержки (мс) и число SQL-запросов по handler."""
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+
+    def summary(self) -> dict[str, float]:
+        latencies = sorted(self.latencies)
+        return {
+            "count": len(latencies),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "queries": sum(self.queries) / len(self.queries) if self.queries else 0.0,
+        }
+
+
+class LoadHarness:
+    """Гоняет синтетические семьи через dp.feed_update: /start, создание задания, сдача, проверка."""
+
+    def __init__(self, concurrency: int = 50, bot_latency: float = 0.0):
+        self.concurrency = concurrency
+        self.bot_latency = bot_latency
+        self.stats: dict[str, HandlerStats] = {}
+        self.updates = 0
+        self.failures = 0
+        self.bot: Optional[Bot] = None
+        self.dp: Optional[Dispatcher] = None
+        self._update_ids = itertools.count(1)
+
+    async def setup(self, create_tables: bool = True) -> None:
+        from app.bench.fake_bot import create_fake_bot
+        from app.bot.main import create_dispatcher
+        from app.db.models import Base
+        from app.db.profiler import install_query_profiler
+        from app.db.session import get_reader_engines
+        from app.db.shards import shard_router
+
+        for shard in range(shard_router.count):
+            engine = shard_router.engine(shard)
+            install_query_profiler(engine)
+            if create_tables:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+        for engine in get_reader_engines():
+            install_query_profiler(engine)
+
+        self.bot = create_fake_bot(latency=self.bot_latency, record=False)
+        self.dp = await create_dispatcher()
+        # Последней - ближе всех к handler, когда он уже выбран
+        probe = HandlerProbe()
+        self.dp.message.middleware(probe)
+        self.dp.callback_query.middleware(probe)
+
+    async def close(self) -> None:
+        from app.db.session import get_engine
+        from app.db.shards import shard_router
+
+        await self.dp.emit_shutdown(bot=self.bot)
+        await self.dp.storage.close()
+        await shard_router.dispose()
+        await get_engine().dispose()
+
+    def reset(self) -> None:
+        self.stats.clear()
+        self.updates = self.failures = 0
+
+    def message(self, tg_id: int, text: str) -> Update:
+        update_id = next(self._update_ids)
+        return Update.model_validate({
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": tg_id, "type": "private"},
+                "from": {"id": tg_id, "is_bot": False, "first_name": f"User{tg_id % 10000}"},
+                "text": text,
+            },
+        })
+
+    def callback(self, tg_id: int, data: str) -> Update:
+        update_id = next(self._update_ids)
+        user = {"id": tg_id, "is_bot": False, "first_name": f"User{tg_id % 10000}"}
+        return Update.model_validate({
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": user,
+                "chat_instance": str(tg_id),
+                "data": data,
+                "message": {
+                    "message_id": update_id,
+                    "date": 0,
+                    "chat": {"id": tg_id, "type": "private"},
+                    "from": {"id": 42, "is_bot": True, "first_name": "FamilyHabitBot"},
+                    "text": "…",
+                },
+            },
+        })
+
+    async def feed(self, update: Update) -> None:
+        """Один update через Dispatcher с замером времени и запросов."""
+        from app.db.profiler import profile_queries
+
+        sample = Sample()
+        token = _sample.set(sample)
+        try:
+            with profile_queries() as queries:
+                started = time.perf_counter()
+                try:
+                    await self.dp.feed_update(self.bot, update)
+                except Exception:
+                    self.failures += 1
+                elapsed_ms = (time.perf_counter() - started) * 1000
+        finally:
+            _sample.reset(token)
+        stats = self.stats.setdefault(sample.handler, HandlerStats())
+        stats.latencies.append(elapsed_ms)
+        stats.queries.append(queries.count)
+        self.updates += 1
+
+    async def _register_family(self, parent_tg: int, child_tg: int) -> int:
+        """Семья как после регистрации в WebApp (/api/registration, /api/children) и привязки ребёнка."""
+        from app.db.shards import shard_router
+        from app.services.parent_service import ParentService
+
+        async with shard_router.session_for_user(parent_tg) as session:
+            service = ParentService(session)
+            parent = await service.get_parent_by_tg_id(parent_tg)
+            if parent is not None:
+                # Повторный проход по той же семье (soak): семья уже есть
+                return (await service.get_children(parent.id))[0].id
+            parent = await service.create_parent(parent_tg, f"User{parent_tg % 10000}")
+            child = await service.add_child_to_family(parent.id, f"Ребёнок {child_tg % 10000}")
+            await service.link_child_telegram(child.id, child_tg)
+        return child.id
+
+    async def _latest_task(self, parent_tg: int, child_id: int) -> Optional[int]:
+        from sqlalchemy import select
+        from app.db.models import Task
+        from app.db.shards import shard_router
+
+        async with shard_router.session_for_user(parent_tg) as session:
+            return await session.scalar(
+                select(Task.id).where(Task.child_id == child_id).order_by(Task.id.desc()).limit(1)
+            )
+
+    async def family_flow(self, index: int, tasks: int = 1) -> None:
+        """Сценарий одной семьи: регистрация, задания через FSM, сдача ребёнком, одобрение."""
+        from app.bot.keyboards import BTN_CREATE_TASK
+
+        parent_tg = TG_LOAD_BASE + 2 * index
+        child_tg = parent_tg + 1
+        await self.feed(self.message(parent_tg, "/start"))
+        child_id = await self._register_family(parent_tg, child_tg)
+        await self.feed(self.message(parent_tg, "/start"))
+
+        for number in range(tasks):
+            for update in (
+                self.message(parent_tg, BTN_CREATE_TASK),
+                self.callback(parent_tg, f"child_{child_id}"),
+                self.message(parent_tg, f"Задание {number + 1}"),
+                self.message(parent_tg, "Описание нагрузочного задания"),
+                self.callback(parent_tg, "type_text"),
+                self.message(parent_tg, "5"),
+                self.message(parent_tg, "2"),
+            ):
+                await self.feed(update)
+            task_id = await self._latest_task(parent_tg, child_id)
+            if task_id is None:
+                self.failures += 1
+                return
+
+            for update in (
+                self.message(child_tg, "/mytasks"),
+                self.callback(child_tg, f"submit_{task_id}"),
+                self.message(child_tg, "Готово!"),
+                self.message(parent_tg, "/review"),
+                self.callback(parent_tg, f"approve_{task_id}"),
+            ):
+                await self.feed(update)
+
+    async def run(self, families: int, tasks: int = 1, offset: int = 0, pool: Optional[int] = None) -> dict:
+        """Прогнать families семей (до concurrency одновременно) и вернуть отчёт; pool - номера семей по кругу."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(index: int) -> None:
+            async with semaphore:
+                await self.family_flow(index % pool if pool else index, tasks)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(offset + index) for index in range(families)))
+        return self.report(time.perf_counter() - started)
+
+    def report(self, seconds: float) -> dict:
+        all_queries = [count for stats in self.stats.values() for count in stats.queries]
+        return {
+            "updates": self.updates,
+            "failures": self.failures,
+            "seconds": seconds,
+            "throughput": self.updates / seconds if seconds else 0.0,
+            "queries_per_update": sum(all_queries) / len(all_queries) if all_queries else 0.0,
+            "handlers": {name: stats.summary() for name, stats in sorted(self.stats.items())},
+        }
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"\n📈 {report['updates']} updates in {report['seconds']:.1f}s: "
+        f"{report['throughput']:.0f} updates/s, {report['queries_per_update']:.1f} SQL queries/update, "
+        f"{report['failures']} failures"
+    )
+    print(f"  {'handler':<44}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}")
+    for name, row in report["handlers"].items():
+        print(
+            f"  {name.removeprefix('app.bot.handlers.'):<44}{row['count']:>7}{row['p50_ms']:>9.2f}"
+            f"{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['queries']:>9.1f}"
+        )
+
+
+def compare(report: dict, baseline: dict, tolerance: float, rows: str = "handlers") -> list[str]:
+    """Регрессии относительно baseline: p95 выше допуска или больше SQL-запросов на вызов.
+
+    rows - раздел отчёта со строками: handlers (load, replay) или cases (app.bench.services).
+    """
+    regressions = []
+    if "throughput" in report and report["throughput"] < baseline.get("throughput", 0) * (1 - tolerance):
+        regressions.append(f"throughput {report['throughput']:.0f}/s < baseline {baseline['throughput']:.0f}/s")
+    for name, row in report[rows].items():
+        base = baseline.get(rows, {}).get(name)
+        if base is None:
+            continue
+        if row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {row['p95_ms']:.2f} ms > baseline {base['p95_ms']:.2f} ms")
+        if row["queries"] > base["queries"] + 0.5:
+            regressions.append(f"{name}: {row['queries']:.1f} queries/call > baseline {base['queries']:.1f}")
+    return regressions
+
+
+def check_baseline(report: dict, path: Optional[str], save: bool, tolerance: float, rows: str = "handlers") -> bool:
+    """Сравнить с baseline (если есть) и/или сохранить отчёт как новый baseline; False - регрессия."""
+    if not path:
+        return True
+    baseline_path = Path(path)
+    ok = True
+    if save:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"\n💾 Baseline saved to {baseline_path}")
+    elif baseline_path.exists():
+        regressions = compare(report, json.loads(baseline_path.read_text()), tolerance, rows)
+        for line in regressions:
+            print(f"  ❌ {line}")
+        ok = not regressions
+        print(f"\n{'✅ No regressions' if ok else '❌ Regressions'} vs {baseline_path} (tolerance {tolerance:.0%})")
+    return ok
+
+
+def configure(database_url: str, concurrency: int = 1) -> None:
+    """Настройки прогона: свой URL БД, пул под concurrency, без лимитов и шумных логов."""
+    from app.core import setup_logging
+
+    settings.database_url = database_url
+    # Ожидание свободного соединения в пуле не должно попадать в замеры
+    settings.database_pool_size = max(settings.database_pool_size, concurrency)
+    # Лимиты не должны отбрасывать синтетических пользователей
+    settings.throttle_enabled = False
+    setup_logging("WARNING")
+    logging.getLogger("aiogram.event").setLevel(logging.WARNING)
+
+
+async def _main(args: argparse.Namespace) -> bool:
+    if args.seed_families:
+        from app.bench.seed import Seeder
+        await Seeder(args.seed_families).run(create_tables=True, derive=False)
+
+    concurrency = args.concurrency
+    if settings.database_url.startswith("sqlite") and concurrency > 1:
+        # StaticPool: одно соединение SQLite на процесс, параллельные транзакции мешают друг другу
+        print("ℹ️  SQLite: running families one at a time (use PostgreSQL for --concurrency)")
+        concurrency = 1
+    harness = LoadHarness(concurrency=concurrency, bot_latency=args.bot_latency)
+    await harness.setup(create_tables=not args.seed_families)
+    try:
+        if args.soak_seconds or args.soak_updates:
+            from app.bench.soak import soak
+            return await soak(
+                harness, args.soak_seconds, args.soak_updates,
+                pool=args.families, round_families=max(concurrency, 10),
+                snapshot_every=args.snapshot_every, max_growth_mb=args.max_rss_growth_mb
+            )
+        # Прогрев: импорты, кэши клавиатур и пользователей, планы запросов
+        await harness.run(min(concurrency, args.families), args.tasks, offset=args.families)
+        harness.reset()
+        report = await harness.run(args.families, args.tasks)
+    finally:
+        await harness.close()
+
+    print_report(report)
+    return check_baseline(report, args.baseline, args.save_baseline, args.tolerance)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="End-to-end bot load test through Dispatcher.feed_update")
+    parser.add_argument("--families", type=int, default=1000, help="synthetic families (parent + child)")
+    parser.add_argument("--tasks", type=int, default=1, help="task create/submit/approve cycles per family")
+    parser.add_argument("--concurrency", type=int, default=50, help="families in flight at once")
+    parser.add_argument("--bot-latency", type=float, default=0.0, help="simulated Bot API latency, seconds")
+    parser.add_argument("--database-url", help="default: in-memory SQLite (soak: temporary SQLite file)")
+    parser.add_argument("--seed-families", type=int, default=0, help="pre-seed background data (app.bench.seed)")
+    parser.add_argument("--baseline", help="baseline JSON to compare against (or to write with --save-baseline)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95/throughput regression")
+    soak = parser.add_argument_group("soak", "long run over --families in rotation with memory tracking")
+    soak.add_argument("--soak-seconds", type=float, help="run for this long (e.g. 10800 for 3 hours)")
+    soak.add_argument("--soak-updates", type=int, help="run until this many updates")
+    soak.add_argument("--snapshot-every", type=int, default=10_000, help="updates between tracemalloc snapshots")
+    soak.add_argument("--max-rss-growth-mb", type=float, default=5.0, help="allowed RSS growth per 10k updates")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or "sqlite+aiosqlite:///:memory:"
+    if not args.database_url and (args.soak_seconds or args.soak_updates):
+        # Данные БД в памяти - законный рост RSS, в soak он маскировал бы утечки
+        import tempfile
+        database_url = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='soak-')}/soak.db"
+    configure(database_url, args.concurrency)
+    if not asyncio.run(_main(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# Purpose: Replay of recorded update streams.
+# Context: Файлы UpdateRecorder (UPDATE_RECORD_DIR) -> create_dispatcher() офлайн, с исходными интервалами или быстрее.
+# Requirements: Скорость воспроизведения, засеянная БД, профиль задержек по handler (как у app.bench.load).
+
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+import time
+from typing import Iterable, Iterator
+
+from aiogram.types import Update
+
+from app.bench.load import LoadHarness, check_baseline, configure, print_report
+from app.core.config import settings
+
+
+def read_updates(paths: Iterable[str]) -> Iterator[tuple[float, dict]]:
+    """(время от начала записи, update); файлы идут подряд, время каждого следующего сдвигается."""
+    offset = 0.0
+    for path in paths:
+        last = 0.0
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            try:
+                for line in file:
+                    record = json.loads(line)
+                    last = record["t"]
+                    yield offset + last, record["update"]
+            except EOFError:
+                # Файл процесса, который не успел его закрыть: всё до последнего flush читается
+                pass
+        offset += last
+
+
+def senders(records: list[tuple[float, dict]]) -> list[int]:
+    """Анонимные Telegram ID отправителей в порядке появления."""
+    seen: dict[int, None] = {}
+    for _, update in records:
+        for key in ("message", "callback_query", "edited_message"):
+            user = update.get(key, {}).get("from")
+            if user:
+                seen.setdefault(user["id"], None)
+    return list(seen)
+
+
+async def register_senders(tg_ids: list[int]) -> int:
+    """Семья для каждого отправителя, которого нет в БД (роли в записи нет - все становятся родителями).
+
+    id заданий и детей из callback_data принадлежат продакшен-БД: такие нажатия отрабатывают ветку «не найдено».
+    """
+    from app.db.shards import shard_router
+    from app.services.parent_service import ParentService
+    from app.services.user_resolver import user_resolver
+
+    created = 0
+    for tg_id in tg_ids:
+        async with shard_router.session_for_user(tg_id) as session:
+            if await user_resolver.resolve(session, tg_id) is None:
+                await ParentService(session).create_parent(tg_id, "User")
+                created += 1
+    user_resolver.clear()
+    return created
+
+
+async def replay(harness: LoadHarness, records: list[tuple[float, dict]], speed: float, concurrent: bool) -> dict:
+    """Подать update в моменты прихода (делённые на speed; 0 - без пауз) и вернуть отчёт."""
+    tasks = []
+    max_lag = 0.0
+    started = time.perf_counter()
+    for at, data in records:
+        delay = (at / speed if speed else 0.0) - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            max_lag = max(max_lag, -delay)
+        update = Update.model_validate(data)
+        if concurrent:
+            # Как в продакшене: следующий update не ждёт окончания предыдущего
+            tasks.append(asyncio.create_task(harness.feed(update)))
+        else:
+            await harness.feed(update)
+    await asyncio.gather(*tasks)
+    report = harness.report(time.perf_counter() - started)
+    report["recorded_seconds"] = records[-1][0] if records else 0.0
+    report["max_lag_ms"] = max_lag * 1000 if speed else 0.0
+    return report
+
+
+async def _main(args: argparse.Namespace) -> bool:
+    records = list(read_updates(args.files))
+    if not records:
+        print("No updates recorded in the given files")
+        return True
+
+    if args.seed_families:
+        from app.bench.seed import Seeder
+        await Seeder(args.seed_families).run(create_tables=True, derive=False)
+    harness = LoadHarness()
+    await harness.setup(create_tables=not args.seed_families)
+    try:
+        if not args.no_register:
+            print(f"👥 Registered {await register_senders(senders(records))} senders as parents")
+        # SQLite (StaticPool): одно соединение - update обрабатываются по очереди, задержка очереди видна в lag
+        concurrent = not settings.database_url.startswith("sqlite")
+        report = await replay(harness, records, args.speed, concurrent)
+    finally:
+        await harness.close()
+
+    print(f"\n⏯  Replayed {len(records)} updates recorded over {report['recorded_seconds']:.0f}s "
+          f"at {'max' if not args.speed else f'{args.speed:g}x'} speed"
+          + (f", max lag behind schedule {report['max_lag_ms']:.0f} ms" if args.speed else ""))
+    print_report(report)
+    return check_baseline(report, args.baseline, args.save_baseline, args.tolerance)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded updates through the real Dispatcher")
+    parser.add_argument("files", nargs="+", help="updates-*.jsonl.gz from UPDATE_RECORD_DIR, in order")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 - original timing, 10 - 10x faster, 0 - no pauses")
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--seed-families", type=int, default=0, help="pre-seed background data (app.bench.seed)")
+    parser.add_argument("--no-register", action="store_true", help="do not create families for recorded senders")
+    parser.add_argument("--throttle", action="store_true", help="keep anti-flood limits as in production")
+    parser.add_argument("--baseline", help="baseline JSON to compare against (or to write with --save-baseline)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    configure(args.database_url)
+    settings.throttle_enabled = args.throttle
+    if not asyncio.run(_main(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
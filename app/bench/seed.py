@@ -0,0 +1,339 @@
+# Purpose: Synthetic data generator and bulk seeder.
+# Context: Бенчмарки и планы запросов на объёме продакшена, а не на одной демо-семье из run_bot.
+# Requirements: Детерминированно по seed, пачки многострочных INSERT (COPY на PostgreSQL), шарды, `python -m app.bench.seed`.
+
+import argparse
+import asyncio
+import enum
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Table, select, func, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+
+# Синтетические Telegram ID: не пересекаются между собой и с реальными пользователями бенчмарков
+TG_PARENT_BASE = 1_000_000_000
+TG_CHILD_BASE = 1_500_000_000
+# Конец истории по умолчанию: один и тот же seed даёт те же данные в любой день
+SEED_EPOCH = datetime(2026, 1, 1)
+
+CATALOG = [
+    ("ice_cream", "🍦 Мороженое", 3),
+    ("movie_night", "🎬 Семейный кинопросмотр", 5),
+    ("extra_screen", "📱 +30 мин экранного времени", 2),
+    ("pizza", "🍕 Пицца на выходных", 8),
+    ("book_choice", "📚 Выбор книги для чтения", 4),
+]
+PARENT_NAMES = ["Мама", "Папа", "Анна", "Сергей", "Ольга", "Дмитрий", "Елена", "Алексей"]
+CHILD_NAMES = ["Аня", "Максим", "Соня", "Артём", "Маша", "Иван", "Лиза", "Миша", "Варя", "Лев"]
+TASK_TITLES = [
+    "Убрать комнату", "Сделать уроки", "Почистить зубы", "Погулять с собакой", "Полить цветы",
+    "Прочитать 20 страниц", "Помыть посуду", "Сделать зарядку", "Собрать портфель", "Вынести мусор",
+]
+
+
+def _at(start: datetime, end: datetime, rng: random.Random) -> datetime:
+    """Случайный момент в [start, end] с точностью до секунды."""
+    return start + timedelta(seconds=int(rng.random() * max((end - start).total_seconds(), 0)))
+
+
+class Seeder:
+    """Генератор семей с историей заданий, чекинов, журнала и покупок."""
+
+    def __init__(
+        self,
+        families: int,
+        seed: int = 42,
+        batch: int = 1000,
+        months: int = 6,
+        tasks_per_week: float = 2.0,
+        now: Optional[datetime] = None
+    ):
+        from app.db.shards import shard_router
+
+        self.families = families
+        self.batch = batch
+        self.tasks_per_week = tasks_per_week
+        self.rng = random.Random(seed)
+        self.now = (now or SEED_EPOCH).replace(microsecond=0)
+        self.start = self.now - timedelta(days=30 * months)
+        self.router = shard_router
+        self.next_id: dict[str, int] = {}
+        self.items: dict[int, list[tuple[int, str, int]]] = {}
+        self.counts: Counter = Counter()
+
+    async def _prepare(self, create_tables: bool) -> None:
+        """Таблицы, каталог магазина и стартовые id (сид можно докатывать в непустую БД)."""
+        from app.db.models import Base, ShopItem, FamilyShard
+
+        maximums: dict[str, int] = defaultdict(int)
+        for shard in range(self.router.count):
+            if create_tables:
+                async with self.router.engine(shard).begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+            async with self.router.sessionmaker(shard)() as session:
+                if not await session.scalar(select(func.count(ShopItem.id))):
+                    session.add_all(ShopItem(sku=sku, title=title, price_coins=price) for sku, title, price in CATALOG)
+                    await session.commit()
+                items = await session.execute(
+                    select(ShopItem.id, ShopItem.title, ShopItem.price_coins).where(ShopItem.is_active.is_(True))
+                )
+                self.items[shard] = [tuple(row) for row in items]
+                for table in self._tables():
+                    current = await session.scalar(select(func.max(table.c.id))) or 0
+                    maximums[table.name] = max(maximums[table.name], current)
+        if self.router.enabled:
+            async with self.router.sessionmaker(0)() as session:
+                current = await session.scalar(select(func.max(FamilyShard.family_id))) or 0
+                maximums["families"] = max(maximums["families"], current)
+        self.next_id = {name: value + 1 for name, value in maximums.items()}
+
+    @staticmethod
+    def _tables() -> list[Table]:
+        # Порядок вставки - по внешним ключам
+        from app.db.models import Family, Parent, Child, Task, CheckIn, Purchase, PointsLedger
+
+        return [model.__table__ for model in (Family, Parent, Child, Task, CheckIn, Purchase, PointsLedger)]
+
+    def _id(self, table: str) -> int:
+        value = self.next_id[table]
+        self.next_id[table] = value + 1
+        return value
+
+    def _family(self, shard_rows: dict[int, dict[str, list]]) -> None:
+        """Сгенерировать одну семью целиком и разложить строки по таблицам её шарда."""
+        from app.db.models import Plan, TaskType, TaskStatus
+
+        rng, now = self.rng, self.now
+        created = self.start + (now - self.start) * rng.random() ** 2  # Больше старых семей, чем новых
+        family_id = self._id("families")
+        parents = [
+            {
+                "id": parent_id, "family_id": family_id, "tg_id": TG_PARENT_BASE + parent_id,
+                "name": rng.choice(PARENT_NAMES), "is_active": True, "created_at": created
+            }
+            for parent_id in (self._id("parents") for _ in range(rng.choices([1, 2], [70, 30])[0]))
+        ]
+        shard = self.router.placement(parents[0]["tg_id"]) if self.router.enabled else 0
+        rows = shard_rows[shard]
+        rows["families"].append({
+            "id": family_id, "plan": Plan.PRO if rng.random() < 0.15 else Plan.FREE,
+            "is_active": True, "created_at": created
+        })
+        rows["parents"] += parents
+        if self.router.enabled:
+            shard_rows[0]["family_shards"].append({"family_id": family_id, "shard": shard, "created_at": created})
+            shard_rows[0]["user_shards"] += [
+                {"tg_id": parent["tg_id"], "family_id": family_id, "shard": shard} for parent in parents
+            ]
+
+        weeks = (now - created).total_seconds() / (7 * 86400)
+        for _ in range(rng.choices([1, 2, 3, 4], [35, 40, 18, 7])[0]):
+            child_id = self._id("children")
+            ledger = []
+            for _ in range(int(rng.gammavariate(2, self.tasks_per_week * weeks / 2)) if weeks > 0 else 0):
+                task_id = self._id("tasks")
+                task_created = _at(created, now, rng)
+                due_at = task_created + timedelta(hours=rng.choice([6, 24, 48, 72])) if rng.random() < 0.8 else None
+                if (due_at or task_created + timedelta(days=2)) > now:
+                    status = rng.choices([TaskStatus.new, TaskStatus.in_progress, TaskStatus.done], [4, 2, 3])[0]
+                elif due_at:
+                    status = rng.choices([TaskStatus.approved, TaskStatus.rejected, TaskStatus.expired], [80, 8, 12])[0]
+                else:
+                    status = rng.choices([TaskStatus.approved, TaskStatus.rejected], [90, 10])[0]
+                task_type = rng.choices([TaskType.text, TaskType.photo, TaskType.video], [60, 30, 10])[0]
+                title = rng.choice(TASK_TITLES)
+                task = {
+                    "id": task_id, "parent_id": rng.choice(parents)["id"], "child_id": child_id,
+                    "title": title, "description": title, "type": task_type,
+                    "points": rng.choice([3, 5, 5, 10, 15]), "coins": rng.choice([0, 0, 1, 2, 3]),
+                    "due_at": due_at, "reminded_at": None, "status": status,
+                    "created_at": task_created, "updated_at": task_created
+                }
+                rows["tasks"].append(task)
+
+                if status in (TaskStatus.done, TaskStatus.approved, TaskStatus.rejected):
+                    checkin_at = _at(task_created, min(due_at or now, now), rng)
+                    media = f"seed_{task_type.value}_{task_id}" if task_type != TaskType.text else None
+                    rows["checkins"].append({
+                        "id": self._id("checkins"), "task_id": task_id, "child_id": child_id,
+                        "note": None, "media_id": media,
+                        "media_thumb_id": f"{media}_thumb" if task_type == TaskType.video else None,
+                        "created_at": checkin_at
+                    })
+                    task["updated_at"] = checkin_at
+                    if status != TaskStatus.done:
+                        task["updated_at"] = _at(checkin_at, min(checkin_at + timedelta(hours=12), now), rng)
+                    if status == TaskStatus.approved:
+                        ledger.append({
+                            "child_id": child_id, "delta_points": task["points"], "delta_coins": task["coins"],
+                            "reason": f"Выполнено задание: {title}", "ref_id": task_id,
+                            "created_at": task["updated_at"]
+                        })
+
+            # Покупки: тратим накопленные монеты в хронологическом порядке, баланс не уходит в минус
+            ledger.sort(key=lambda row: row["created_at"])
+            points = coins = 0
+            for entry in list(ledger):
+                points += entry["delta_points"]
+                coins += entry["delta_coins"]
+                affordable = [item for item in self.items[shard] if item[2] <= coins]
+                if affordable and rng.random() < 0.3:
+                    item_id, item_title, price = rng.choice(affordable)
+                    bought_at = _at(entry["created_at"], min(entry["created_at"] + timedelta(days=3), now), rng)
+                    purchase_id = self._id("purchases")
+                    rows["purchases"].append({
+                        "id": purchase_id, "child_id": child_id, "item_id": item_id,
+                        "cost_coins": price, "created_at": bought_at
+                    })
+                    ledger.append({
+                        "child_id": child_id, "delta_points": 0, "delta_coins": -price,
+                        "reason": f"Покупка: {item_title}", "ref_id": purchase_id, "created_at": bought_at
+                    })
+                    coins -= price
+
+            # Счётчики сходятся с журналом - сверка на сиде не находит расхождений
+            child_tg = TG_CHILD_BASE + child_id if rng.random() < 0.6 else None
+            rows["children"].append({
+                "id": child_id, "family_id": family_id, "tg_id": child_tg,
+                "name": rng.choice(CHILD_NAMES), "points": points, "coins": coins, "avatar": None,
+                "is_active": True, "created_at": created
+            })
+            if child_tg is not None and self.router.enabled:
+                # Как link_child_telegram: иначе placement(tg_id) уведёт ребёнка не на шард семьи
+                shard_rows[0]["user_shards"].append({"tg_id": child_tg, "family_id": family_id, "shard": shard})
+            rows["points_ledger"] += ledger
+
+    async def _insert(self, session: AsyncSession, table: Table, rows: list[dict]) -> None:
+        if not rows:
+            return
+        if session.get_bind().dialect.name == "postgresql":
+            # COPY через asyncpg: на порядок быстрее executemany
+            columns = list(rows[0])
+            connection = await (await session.connection()).get_raw_connection()
+            await connection.driver_connection.copy_records_to_table(
+                table.name,
+                records=[
+                    tuple(value.name if isinstance(value, enum.Enum) else value for value in row.values())
+                    for row in rows
+                ],
+                columns=columns
+            )
+        else:
+            await session.execute(insert(table), rows)
+        self.counts[table.name] += len(rows)
+
+    async def _flush(self, shard: int, rows: dict[str, list]) -> None:
+        """Одна транзакция на пачку семей шарда."""
+        from app.db.models import FamilyShard, UserShard
+
+        # id журнала растут вместе со временем (внутри пачки) - как при живой записи
+        ledger = sorted(rows["points_ledger"], key=lambda row: row["created_at"])
+        rows["points_ledger"] = [{"id": self._id("points_ledger"), **row} for row in ledger]
+        async with self.router.sessionmaker(shard)() as session:
+            for table in self._tables():
+                await self._insert(session, table, rows[table.name])
+            for model in (FamilyShard, UserShard):
+                await self._insert(session, model.__table__, rows[model.__tablename__])
+            await session.commit()
+
+    async def _sync_sequences(self) -> None:
+        """PostgreSQL: id вставлены явно - двигаем последовательности за максимум."""
+        from app.db.models import FamilyShard
+
+        for shard in range(self.router.count):
+            async with self.router.sessionmaker(shard)() as session:
+                if session.get_bind().dialect.name != "postgresql":
+                    continue
+                columns = [(table.name, "id") for table in self._tables()]
+                if shard == 0 and self.router.enabled:
+                    columns.append((FamilyShard.__tablename__, "family_id"))
+                for table, column in columns:
+                    await session.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                        f"(SELECT COALESCE(MAX({column}), 1) FROM {table}))"
+                    ))
+                await session.commit()
+
+    async def _derive(self, sessionmaker: async_sessionmaker) -> None:
+        """Производные таблицы как в продакшене: checkpoint балансов и месячные итоги."""
+        from app.services.ledger_service import LedgerReconciler
+        from app.services.stats_service import RollupJob, StatsService, month_start
+
+        await LedgerReconciler(fix=False, session_factory=sessionmaker).reconcile()
+        await RollupJob(session_factory=sessionmaker).backfill(full=True)
+        # Текущий месяц в продакшене наращивает record() - здесь пересчитываем целиком
+        async with sessionmaker() as session:
+            await StatsService(session).rebuild_month(month_start(self.now), settings.rollup_batch)
+
+    async def run(self, create_tables: bool = False, derive: bool = True) -> Counter:
+        await self._prepare(create_tables)
+        started = time.perf_counter()
+        shard_rows: dict[int, dict[str, list]] = defaultdict(lambda: defaultdict(list))
+        family_counts: Counter = Counter()
+        for index in range(1, self.families + 1):
+            self._family(shard_rows)
+            for shard, rows in list(shard_rows.items()):
+                if len(rows["families"]) >= self.batch:
+                    family_counts[shard] += len(rows["families"])
+                    await self._flush(shard, shard_rows.pop(shard))
+            if index % (self.batch * 10) == 0:
+                print(f"  {index}/{self.families} families, {time.perf_counter() - started:.0f}s")
+        for shard, rows in shard_rows.items():
+            family_counts[shard] += len(rows["families"])
+            await self._flush(shard, rows)
+        await self._sync_sequences()
+        elapsed = time.perf_counter() - started
+
+        if derive:
+            for sessionmaker in self.router.sessionmakers():
+                await self._derive(sessionmaker)
+
+        total = sum(self.counts.values())
+        print(f"\n🌱 Seeded {self.families} families in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+        for name, count in self.counts.items():
+            print(f"  {name:<16}{count:>12,}")
+        if self.router.enabled:
+            print("  by shard: " + ", ".join(f"{shard}: {count}" for shard, count in sorted(family_counts.items())))
+        return self.counts
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from app.db.session import get_engine
+
+    seeder = Seeder(
+        args.families, seed=args.seed, batch=args.batch, months=args.months,
+        tasks_per_week=args.tasks_per_week, now=datetime.fromisoformat(args.now) if args.now else None
+    )
+    try:
+        await seeder.run(create_tables=args.create_tables, derive=not args.skip_derived)
+    finally:
+        await seeder.router.dispose()
+        await get_engine().dispose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Seed the database with synthetic families")
+    parser.add_argument("--families", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch", type=int, default=1000, help="families per transaction")
+    parser.add_argument("--months", type=int, default=6, help="length of generated history")
+    parser.add_argument("--tasks-per-week", type=float, default=2.0, help="average tasks per child")
+    parser.add_argument("--now", help=f"ISO timestamp the history ends at (default: {SEED_EPOCH:%Y-%m-%d})")
+    parser.add_argument("--database-url", help="override DATABASE_URL")
+    parser.add_argument("--create-tables", action="store_true", help="create_all before seeding (no alembic)")
+    parser.add_argument("--skip-derived", action="store_true", help="skip balance checkpoints and monthly rollups")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        settings.database_url = args.database_url
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# Purpose: Service-layer benchmark suite.
+# Context: Горячие методы TaskService/ParentService на засеянной БД разного размера и при разной параллельности.
+# Requirements: Регистрация бенчмарков как фикстур, JSON-отчёт, сравнение с baseline, `python -m app.bench`.
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bench.load import check_baseline, percentile
+from app.core.config import settings
+
+
+@dataclass
+class BenchContext:
+    """Данные засеянной БД (все шарды), из которых бенчмарки берут аргументы."""
+    rng: random.Random
+    parents: list[tuple[int, int]] = field(default_factory=list)  # (shard, parent_id)
+    children: list[tuple[int, int, int]] = field(default_factory=list)  # (shard, child_id, parent_id)
+
+
+@dataclass
+class Benchmark:
+    """Замеряемый вызов: setup готовит (шард, аргумент) (не замеряется), call - одна операция в сессии шарда."""
+    name: str
+    call: Callable[[AsyncSession, Any], Awaitable[Any]]
+    setup: Callable[[BenchContext, int], Awaitable[list]]
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, setup: Callable[[BenchContext, int], Awaitable[list]]) -> Callable:
+    """Декоратор в духе фикстур pytest-benchmark: setup(ctx, rounds) -> [(шард, аргумент)] по одному на вызов."""
+    def decorator(call: Callable[[AsyncSession, Any], Awaitable[Any]]) -> Callable:
+        BENCHMARKS[name] = Benchmark(name, call, setup)
+        return call
+    return decorator
+
+
+async def random_parents(ctx: BenchContext, rounds: int) -> list[tuple[int, int]]:
+    return [ctx.rng.choice(ctx.parents) for _ in range(rounds)]
+
+
+async def _tasks(ctx: BenchContext, rounds: int, status) -> list[tuple[int, tuple[int, int, int]]]:
+    """Свежие задания в нужном статусе (чекин для сданных): (шард, (task_id, child_id, parent_id))."""
+    from app.db.models import CheckIn, Task, TaskStatus, TaskType
+    from app.db.shards import shard_router
+
+    by_shard: dict[int, list[tuple[int, int]]] = defaultdict(list)
+    for shard, child_id, parent_id in (ctx.rng.choice(ctx.children) for _ in range(rounds)):
+        by_shard[shard].append((child_id, parent_id))
+
+    targets = []
+    for shard, picked in by_shard.items():
+        async with shard_router.sessionmaker(shard)() as session:
+            tasks = [
+                Task(parent_id=parent_id, child_id=child_id, title="Бенчмарк", description="Бенчмарк",
+                     type=TaskType.text, points=5, coins=1, status=status)
+                for child_id, parent_id in picked
+            ]
+            session.add_all(tasks)
+            await session.flush()
+            if status == TaskStatus.done:
+                session.add_all(CheckIn(task_id=task.id, child_id=task.child_id, note="Готово") for task in tasks)
+            await session.commit()
+        targets.extend((shard, (task.id, task.child_id, task.parent_id)) for task in tasks)
+    ctx.rng.shuffle(targets)
+    return targets
+
+
+async def new_tasks(ctx: BenchContext, rounds: int) -> list[tuple[int, tuple[int, int, int]]]:
+    from app.db.models import TaskStatus
+    return await _tasks(ctx, rounds, TaskStatus.new)
+
+
+async def done_tasks(ctx: BenchContext, rounds: int) -> list[tuple[int, tuple[int, int, int]]]:
+    from app.db.models import TaskStatus
+    return await _tasks(ctx, rounds, TaskStatus.done)
+
+
+@benchmark("TaskService.submit_task", setup=new_tasks)
+async def bench_submit_task(session: AsyncSession, target: tuple[int, int, int]) -> None:
+    from app.services.task_service import TaskService
+    task_id, child_id, _ = target
+    assert await TaskService(session).submit_task(task_id, child_id, note="Готово")
+
+
+@benchmark("TaskService.approve_task", setup=done_tasks)
+async def bench_approve_task(session: AsyncSession, target: tuple[int, int, int]) -> None:
+    from app.services.task_service import TaskService
+    task_id, _, parent_id = target
+    assert await TaskService(session).approve_task(task_id, parent_id)
+
+
+@benchmark("TaskService.get_pending_tasks", setup=random_parents)
+async def bench_pending_tasks(session: AsyncSession, parent_id: int) -> None:
+    from app.services.task_service import TaskService
+    await TaskService(session).get_pending_tasks(parent_id)
+
+
+@benchmark("ParentService.get_family_stats", setup=random_parents)
+async def bench_family_stats(session: AsyncSession, parent_id: int) -> None:
+    from app.services.parent_service import ParentService
+    await ParentService(session).get_family_stats(parent_id)
+
+
+async def load_context(seed: int) -> BenchContext:
+    from app.db.models import Child, Parent
+    from app.db.shards import shard_router
+
+    async def children(session: AsyncSession) -> list:
+        # Один родитель на семью - тот, кто будет ставить и проверять задания
+        first_parent = (
+            select(Parent.family_id, func.min(Parent.id).label("parent_id")).group_by(Parent.family_id).subquery()
+        )
+        return list((await session.execute(
+            select(Child.id, first_parent.c.parent_id)
+            .join(first_parent, first_parent.c.family_id == Child.family_id)
+            .order_by(Child.id)
+        )).all())
+
+    ctx = BenchContext(rng=random.Random(seed))
+    # Сидер раскладывает семьи по шардам - аргументы берутся со всех
+    for shard, rows in enumerate(await shard_router.fan_out(children)):
+        ctx.children.extend((shard, child_id, parent_id) for child_id, parent_id in rows)
+    ctx.parents = sorted({(shard, parent_id) for shard, _, parent_id in ctx.children})
+    return ctx
+
+
+async def measure(bench: Benchmark, ctx: BenchContext, rounds: int, concurrency: int) -> dict[str, float]:
+    """rounds вызовов (каждый в своей сессии шарда, как handler), до concurrency одновременно."""
+    from app.db.profiler import profile_queries
+    from app.db.shards import shard_router
+
+    warmup = await bench.setup(ctx, min(10, rounds))
+    targets = await bench.setup(ctx, rounds)
+    for shard, target in warmup:
+        async with shard_router.sessionmaker(shard)() as session:
+            await bench.call(session, target)
+
+    latencies: list[float] = []
+    queries: list[int] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(shard: int, target: Any) -> None:
+        async with semaphore:
+            with profile_queries() as stats:
+                started = time.perf_counter()
+                async with shard_router.sessionmaker(shard)() as session:
+                    await bench.call(session, target)
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(stats.count)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(shard, target) for shard, target in targets))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rounds": rounds,
+        "mean_ms": sum(latencies) / len(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "ops": rounds / elapsed,
+        "queries": sum(queries) / len(queries),
+    }
+
+
+def _key(name: str, size: Any, concurrency: int) -> str:
+    return f"{name}[families={size},concurrency={concurrency}]"
+
+
+async def run_suite(
+    sizes: list[int],
+    concurrency: list[int],
+    rounds: int,
+    selected: Optional[list[str]] = None,
+    seed: int = 42,
+    existing: bool = False
+) -> dict:
+    from app.bench.seed import Seeder
+    from app.db.models import Base
+    from app.db.profiler import install_query_profiler
+    from app.db.session import get_engine
+    from app.db.shards import shard_router
+
+    for shard in range(shard_router.count):
+        install_query_profiler(shard_router.engine(shard))
+    benches = [bench for name, bench in BENCHMARKS.items() if not selected or name in selected]
+    if settings.database_url.startswith("sqlite") and max(concurrency) > 1:
+        # StaticPool: одно соединение SQLite на процесс, параллельные транзакции мешают друг другу
+        print("ℹ️  SQLite: only concurrency 1 (use PostgreSQL for concurrent runs)")
+        concurrency = [1]
+
+    report: dict[str, Any] = {"database": get_engine().dialect.name, "rounds": rounds, "cases": {}}
+    if not existing:
+        for shard in range(shard_router.count):
+            async with shard_router.engine(shard).begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+    seeded = 0
+    for size in (["existing"] if existing else sorted(sizes)):
+        if not existing:
+            # Размеры по возрастанию: БД досеивается до следующего размера
+            await Seeder(size - seeded, seed=seed + seeded).run()
+            seeded = size
+        ctx = await load_context(seed)
+        print(f"\n🧪 {size} families ({len(ctx.children)} children), {rounds} calls per case")
+        print(f"  {'case':<34}{'conc':>5}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'ops/s':>9}{'queries':>9}")
+        for bench in benches:
+            for level in concurrency:
+                row = await measure(bench, ctx, rounds, level)
+                report["cases"][_key(bench.name, size, level)] = row
+                print(
+                    f"  {bench.name:<34}{level:>5}{row['mean_ms']:>9.2f}{row['p50_ms']:>9.2f}"
+                    f"{row['p95_ms']:>9.2f}{row['ops']:>9.0f}{row['queries']:>9.1f}"
+                )
+    return report
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    from app.db.session import get_engine
+    from app.db.shards import shard_router
+
+    try:
+        return await run_suite(
+            [int(size) for size in args.sizes.split(",")],
+            [int(level) for level in args.concurrency.split(",")],
+            args.rounds,
+            selected=args.only.split(",") if args.only else None,
+            seed=args.seed,
+            existing=args.existing
+        )
+    finally:
+        await shard_router.dispose()
+        await get_engine().dispose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Service-layer benchmark suite")
+    parser.add_argument("--sizes", default="100,1000", help="seeded families per run, comma-separated")
+    parser.add_argument("--concurrency", default="1,8", help="concurrent calls, comma-separated")
+    parser.add_argument("--rounds", type=int, default=200, help="calls per case")
+    parser.add_argument("--only", help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--existing", action="store_true", help="benchmark the data already in --database-url")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    from app.bench.load import configure
+    configure(args.database_url, max(int(level) for level in args.concurrency.split(",")))
+    report = asyncio.run(_main(args))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"\n💾 Report saved to {args.json}")
+    if not check_baseline(report, args.baseline, save=False, tolerance=args.tolerance, rows="cases"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# Purpose: Soak mode of the load harness.
+# Context: Бот живёт неделями: MemoryStorage, identity map сессий и кэши не должны расти без предела.
+# Requirements: Часы синтетического трафика, снимки tracemalloc, рост аллокаций по модулям, порог роста RSS на 10k update.
+
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+from app.bench.load import LoadHarness
+
+
+def rss_bytes() -> int:
+    """Текущий RSS процесса (Linux - /proc, иначе пиковый из getrusage)."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def module_path(filename: str) -> str:
+    """Путь файла относительно sys.path: app/bot/handlers/tasks.py, aiogram/fsm/storage/memory.py."""
+    best = ""
+    for entry in sys.path:
+        entry = os.path.abspath(entry or ".")
+        if filename.startswith(entry + os.sep) and len(entry) > len(best):
+            best = entry
+    return os.path.relpath(filename, best) if best else filename
+
+
+@dataclass
+class Growth:
+    """Рост аллокаций одного модуля между снимками."""
+    module: str
+    size: int
+    count: int
+
+
+def top_growth(old_path: str, new_path: str, limit: int) -> list[Growth]:
+    """Рост по модулям между двумя снимками на диске."""
+    old, new = tracemalloc.Snapshot.load(old_path), tracemalloc.Snapshot.load(new_path)
+    by_module: dict[str, Growth] = {}
+    for diff in new.compare_to(old, "filename"):
+        module = module_path(diff.traceback[0].filename)
+        growth = by_module.setdefault(module, Growth(module, 0, 0))
+        growth.size += diff.size_diff
+        growth.count += diff.count_diff
+    return sorted(by_module.values(), key=lambda growth: -growth.size)[:limit]
+
+
+def _snapshot(path: str) -> None:
+    # Снимок сразу на диск: десятки МБ в памяти исказили бы RSS следующего окна
+    gc.collect()
+    tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ]).dump(path)
+
+
+def _process_mb() -> float:
+    # Память самого tracemalloc в RSS не считаем
+    gc.collect()
+    return (rss_bytes() - tracemalloc.get_tracemalloc_memory()) / 2 ** 20
+
+
+async def soak(
+    harness: LoadHarness,
+    seconds: Optional[float],
+    updates: Optional[int],
+    pool: int,
+    round_families: int,
+    snapshot_every: int = 10_000,
+    max_growth_mb: float = 5.0,
+    top: int = 15,
+    frames: int = 1
+) -> bool:
+    """Гонять семьи из pool по кругу до seconds/updates; False - RSS растёт быстрее max_growth_mb на 10k update."""
+    tracemalloc.start(frames)
+    round_families = min(round_families, pool)
+
+    # Прогрев: каждая семья регистрируется, ограниченные кэши (dedup, пользователи) заполняются
+    offset = warm = 0
+    while offset < pool or warm < snapshot_every:
+        await harness.run(round_families, offset=offset, pool=pool)
+        offset += round_families
+        warm += harness.updates
+        harness.reset()
+    offset %= pool
+
+    directory = tempfile.mkdtemp(prefix="soak-snapshots-")
+    base, previous, current = (os.path.join(directory, f"{name}.snapshot") for name in ("base", "previous", "current"))
+    _snapshot(base)
+    shutil.copyfile(base, previous)
+    # Базовый RSS - после первого сравнения: память под загрузку снимков уже выделена
+    top_growth(base, previous, 1)
+    base_mb = _process_mb()
+    print(f"\n🧪 Soak: {pool} families in rotation, baseline RSS {base_mb:.1f} MB")
+    print(f"  {'updates':>10}{'elapsed s':>11}{'upd/s':>8}{'RSS MB':>9}{'traced MB':>11}  top growth since last snapshot")
+
+    total = failures = 0
+    next_snapshot = snapshot_every
+    started = time.monotonic()
+    while (seconds is None or time.monotonic() - started < seconds) and (updates is None or total < updates):
+        await harness.run(round_families, offset=offset, pool=pool)
+        offset = (offset + round_families) % pool
+        total += harness.updates
+        failures += harness.failures
+        # Задержки не копим: иначе сама статистика стала бы «утечкой»
+        harness.reset()
+        if total >= next_snapshot:
+            next_snapshot += snapshot_every
+            _snapshot(current)
+            elapsed = time.monotonic() - started
+            traced, _ = tracemalloc.get_traced_memory()
+            leaders = ", ".join(
+                f"{growth.module} {growth.size / 1024:+.0f} KiB" for growth in top_growth(previous, current, 3)
+            )
+            os.replace(current, previous)
+            print(f"  {total:>10}{elapsed:>11.0f}{total / elapsed:>8.0f}{_process_mb():>9.1f}{traced / 2 ** 20:>11.1f}  {leaders}")
+
+    _snapshot(current)
+    growth_by_module = top_growth(base, current, top)
+    growth_mb = _process_mb() - base_mb
+    per_10k = growth_mb / max(total, 1) * 10_000
+    tracemalloc.stop()
+    shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"\n📦 Allocation growth by module over {total} updates ({failures} failures):")
+    for growth in growth_by_module:
+        print(f"  {growth.size / 1024:>+10.0f} KiB {growth.count:>+9} blocks  {growth.module}")
+    ok = per_10k <= max_growth_mb
+    print(
+        f"\n{'✅' if ok else '❌'} RSS {growth_mb:+.1f} MB over {total} updates: "
+        f"{per_10k:+.2f} MB per 10k updates (threshold {max_growth_mb:g} MB)"
+    )
+    return ok
@@ -0,0 +1,107 @@
+# Purpose: Cold-start report.
+# Context: `python -X importtime` по точке входа + время до первого ответа сервера.
+# Requirements: Запуск в чистом процессе, сводка по пакетам и самым тяжёлым модулям.
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from dataclasses import dataclass
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(stderr: str) -> list[ImportRecord]:
+    """Разобрать вывод -X importtime (строки `import time: self | cumulative | name`)."""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append(ImportRecord(name.strip(), depth, int(self_us), int(cumulative_us)))
+    return records
+
+
+def measure_imports(module: str) -> tuple[list[ImportRecord], float]:
+    """Импортировать модуль в новом процессе, вернуть записи и время импорта (мс)."""
+    code = f"import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=_env(), check=True
+    )
+    wall_ms = float(result.stdout.strip().splitlines()[-1])
+    return parse_importtime(result.stderr), wall_ms
+
+
+def measure_first_response(app: str, port: int, path: str = "/health", timeout: float = 60.0) -> float:
+    """Запустить uvicorn и измерить время до первого успешного ответа (мс)."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=1):
+                    return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"{app} did not answer {path} within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    return env
+
+
+def print_report(module: str, records: list[ImportRecord], wall_ms: float, top: int) -> None:
+    packages: dict[str, int] = defaultdict(int)
+    for record in records:
+        packages[record.module.split(".")[0]] += record.self_us
+
+    print(f"\n📦 import {module}: {wall_ms:.0f} ms, {len(records)} modules")
+    print("\nBy top-level package (self time):")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    print(f"\nHeaviest modules (cumulative):")
+    for record in sorted(records, key=lambda r: -r.cumulative_us)[:top]:
+        print(f"  {record.cumulative_us / 1000:8.1f} ms  {record.module}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Cold-start import and first-response report")
+    parser.add_argument("modules", nargs="*", default=["cloud_server", "app.bot.main"])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--serve", metavar="APP", help="uvicorn app to time, e.g. cloud_server:app")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        records, wall_ms = measure_imports(module)
+        print_report(module, records, wall_ms, args.top)
+
+    if args.serve:
+        samples = sorted(measure_first_response(args.serve, args.port) for _ in range(args.runs))
+        print(f"\n🚀 {args.serve} first response: median {samples[len(samples) // 2]:.0f} ms "
+              f"(min {samples[0]:.0f}, max {samples[-1]:.0f}, runs {len(samples)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
 # Purpose: Bot handlers module.
+# Context: Роутеры загружаются при первом обращении (быстрый холодный старт).
 
-from .start import router as start_router
-from .tasks import router as tasks_router  
-from .admin import router as admin_router
-from .webapp import webapp_router
+from app.core.lazy import lazy_exports
 
-__all__ = ["start_router", "tasks_router", "admin_router", "webapp_router"]
\ No newline at end of file
+_EXPORTS = {
+    "start_router": ".start:router",
+    "tasks_router": ".tasks:router",
+    "admin_router": ".admin:router",
+    "webapp_router": ".webapp",
+    "checkins_router": ".checkins:router",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
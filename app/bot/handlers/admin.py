@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
 from app.db.models import Parent, Child, Task, Family
+from app.db.shards import shard_router
 from app.core.config import settings
 from app.core import get_logger
 
@@ -74,17 +75,25 @@ async def info_handler(message: types.Message, session: AsyncSession):
         )
 
 
-@router.message(Command("stats"))
+def is_admin(message: types.Message) -> bool:
+    return message.from_user is not None and message.from_user.id in settings.ADMIN_USER_IDS
+
+
+# Только для админов; остальным /stats отвечает webapp_router (статистика семьи)
+@router.message(Command("stats"), is_admin)
 async def stats_handler(message: types.Message, session: AsyncSession):
     """Общая статистика бота."""
-    # Только для админов
-    if message.from_user.id not in settings.ADMIN_USER_IDS:
-        return
+    # Один запрос на шард, шарды опрашиваются параллельно
+    async def count_shard(shard_session: AsyncSession):
+        return (await shard_session.execute(select(
+            select(func.count(Family.id)).scalar_subquery(),
+            select(func.count(Parent.id)).scalar_subquery(),
+            select(func.count(Child.id)).scalar_subquery(),
+            select(func.count(Task.id)).scalar_subquery()
+        ))).one()
     
-    families_count = await session.scalar(select(func.count(Family.id)))
-    parents_count = await session.scalar(select(func.count(Parent.id)))
-    children_count = await session.scalar(select(func.count(Child.id)))
-    tasks_count = await session.scalar(select(func.count(Task.id)))
+    per_shard = await shard_router.fan_out(count_shard)
+    families_count, parents_count, children_count, tasks_count = (sum(column) for column in zip(*per_shard))
     
     await message.answer(
         f"📊 <b>Статистика Family Habit Bot</b>\n\n"
@@ -92,4 +101,5 @@ async def stats_handler(message: types.Message, session: AsyncSession):
         f"👨‍👩‍👧‍👦 Родителей: <b>{parents_count}</b>\n"
         f"👦👧 Детей: <b>{children_count}</b>\n"
         f"📝 Заданий создано: <b>{tasks_count}</b>"
+        + (f"\n🗄 Шардов: <b>{shard_router.count}</b>" if shard_router.enabled else "")
     )
\ No newline at end of file
@@ -0,0 +1,180 @@
+# Purpose: Task check-in handlers (text/photo/video).
+# Context: Ребёнок сдаёт задание с медиа, родитель проверяет и одобряет.
+# Requirements: Храним только file_id Telegram, сами файлы качаются лениво (MediaCache).
+
+from aiogram import Router, types, F
+from aiogram.filters import Command, StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bot.keyboards import review_keyboard
+from app.db.models import Parent, Task, TaskType, TaskStatus
+from app.services.task_service import TaskService
+from app.services.user_resolver import user_resolver
+from app.core import get_logger
+
+router = Router()
+logger = get_logger(__name__)
+
+TYPE_HINTS = {
+    TaskType.text: "✍️ Напиши, что ты сделал(а)",
+    TaskType.photo: "📸 Пришли фото выполненного задания",
+    TaskType.video: "🎬 Пришли видео выполненного задания",
+}
+
+
+class CheckInStates(StatesGroup):
+    """FSM состояния для сдачи задания."""
+    waiting_for_proof = State()
+
+
+@router.message(Command("mytasks"))
+async def my_tasks_handler(message: types.Message, session: AsyncSession):
+    """Список новых заданий ребёнка с кнопками сдачи."""
+    child = await user_resolver.get_child(session, message.from_user.id)
+    if not child:
+        await message.answer("❌ Команда доступна только детям")
+        return
+
+    tasks = await TaskService(session).get_tasks_for_child(child.id, TaskStatus.new)
+    if not tasks:
+        await message.answer("🎉 Все задания выполнены! Новых пока нет.")
+        return
+
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=f"📋 {task.title} (+{task.points})", callback_data=f"submit_{task.id}")]
+        for task in tasks
+    ])
+    await message.answer("🎮 <b>Твои задания</b>\n\nВыбери задание, чтобы сдать его:", reply_markup=keyboard)
+
+
+@router.callback_query(F.data.startswith("submit_"))
+async def submit_selected(callback: types.CallbackQuery, state: FSMContext, session: AsyncSession):
+    """Задание выбрано - ждём подтверждение нужного типа."""
+    task_id = int(callback.data.split("_")[1])
+
+    child = await user_resolver.get_child(session, callback.from_user.id)
+    task = await session.get(Task, task_id)
+    if not child or not task or task.child_id != child.id or task.status != TaskStatus.new:
+        await callback.answer("❌ Задание недоступно")
+        return
+
+    await state.update_data(task_id=task.id, task_type=task.type.value)
+    await state.set_state(CheckInStates.waiting_for_proof)
+
+    await callback.message.edit_text(
+        f"📋 <b>{task.title}</b>\n\n"
+        f"{TYPE_HINTS[task.type]}\n"
+        f"<i>Для отмены отправь /cancel</i>"
+    )
+    await callback.answer()
+
+
+@router.message(StateFilter(CheckInStates.waiting_for_proof), Command("cancel"))
+async def submit_cancelled(message: types.Message, state: FSMContext):
+    """Отмена сдачи задания."""
+    await state.clear()
+    await message.answer("❌ Сдача задания отменена")
+
+
+@router.message(StateFilter(CheckInStates.waiting_for_proof))
+async def proof_received(message: types.Message, state: FSMContext, session: AsyncSession):
+    """Принять текст, фото или видео и сдать задание."""
+    data = await state.get_data()
+    task_type = TaskType(data["task_type"])
+
+    note = message.caption or message.text
+    media_id = media_thumb_id = None
+    if task_type == TaskType.photo:
+        if not message.photo:
+            await message.answer(TYPE_HINTS[task_type])
+            return
+        media_id = message.photo[-1].file_id  # Самый большой размер
+    elif task_type == TaskType.video:
+        video = message.video or message.video_note
+        if not video:
+            await message.answer(TYPE_HINTS[task_type])
+            return
+        media_id = video.file_id
+        media_thumb_id = video.thumbnail.file_id if video.thumbnail else None
+    elif not message.text:
+        await message.answer(TYPE_HINTS[task_type])
+        return
+
+    child = await user_resolver.get_child(session, message.from_user.id)
+    task_service = TaskService(session)
+    if not child or not await task_service.submit_task(
+        data["task_id"], child.id, note=note, media_id=media_id, media_thumb_id=media_thumb_id
+    ):
+        await state.clear()
+        await message.answer("❌ Не удалось сдать задание")
+        return
+
+    await state.clear()
+    await message.answer("✅ Задание отправлено на проверку родителям!")
+
+    task = await session.get(Task, data["task_id"])
+    parent = await session.get(Parent, task.parent_id)
+    try:
+        await message.bot.send_message(
+            parent.tg_id,
+            f"📬 <b>{child.name} сдал(а) задание</b>\n\n"
+            f"📋 {task.title}\n"
+            + (f"💬 {note}\n" if note else "")
+            + f"\nПосмотреть все: /review",
+            reply_markup=review_keyboard(task.id)
+        )
+    except Exception as e:
+        logger.warning(f"Failed to notify parent {parent.id} about task {task.id}: {e}")
+
+
+@router.message(Command("review"), flags={"throttling": "review"})
+async def review_handler(message: types.Message, session: AsyncSession):
+    """Задания на проверке с превью медиа."""
+    parent = await user_resolver.get_parent(session, message.from_user.id)
+    if not parent:
+        await message.answer("❌ Команда доступна только родителям")
+        return
+
+    pending = await TaskService(session).get_pending_checkins(parent.id)
+    if not pending:
+        await message.answer("✅ Нет заданий на проверке")
+        return
+
+    for task, checkin in pending:
+        caption = f"📋 <b>{task.title}</b>" + (f"\n💬 {checkin.note}" if checkin.note else "")
+        keyboard = review_keyboard(task.id)
+        # Повторная отправка по file_id не требует скачивания файла
+        if task.type == TaskType.photo and checkin.media_id:
+            await message.answer_photo(checkin.media_id, caption=caption, reply_markup=keyboard)
+        elif task.type == TaskType.video and checkin.media_id:
+            await message.answer_video(checkin.media_id, caption=caption, reply_markup=keyboard)
+        else:
+            await message.answer(caption, reply_markup=keyboard)
+
+
+@router.callback_query(F.data.startswith("approve_") | F.data.startswith("reject_"), flags={"throttling": "review"})
+async def review_decision(callback: types.CallbackQuery, session: AsyncSession):
+    """Решение родителя по сданному заданию."""
+    action, task_id = callback.data.split("_")
+    parent = await user_resolver.get_parent(session, callback.from_user.id)
+    if not parent:
+        await callback.answer("❌ Только для родителей")
+        return
+
+    task_service = TaskService(session)
+    if action == "approve":
+        ok = await task_service.approve_task(int(task_id), parent.id)
+        verdict = "✅ Принято"
+    else:
+        ok = await task_service.reject_task(int(task_id), parent.id)
+        verdict = "❌ Отклонено"
+
+    if not ok:
+        await callback.answer("Задание уже проверено")
+        return
+
+    await callback.message.edit_reply_markup(reply_markup=None)
+    await callback.answer(verdict)
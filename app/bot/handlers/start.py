@@ -4,12 +4,13 @@
 
 from aiogram import Router, types
 from aiogram.filters import CommandStart
-from aiogram.types import WebAppInfo, KeyboardButton, ReplyKeyboardMarkup
+from aiogram.types import ReplyKeyboardMarkup
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.bot.keyboards import BTN_CHILDREN, BTN_MY_POINTS, main_keyboard, render
+from app.bot.text_commands import text_commands
 from app.db.models import Parent, Child
 from app.services.parent_service import ParentService
-from app.core.config import settings
 from app.core import get_logger
 
 router = Router()
@@ -17,25 +18,11 @@ logger = get_logger(__name__)
 
 
 def get_main_keyboard(role: str) -> ReplyKeyboardMarkup:
-    """Получить главную клавиатуру в зависимости от роли."""
-    if role == "parent":
-        webapp_url = f"{settings.WEBAPP_URL}/parent"
-        buttons = [
-            [KeyboardButton(text="🏠 Семейная панель", web_app=WebAppInfo(url=webapp_url))],
-            [KeyboardButton(text="📝 Создать задание")],
-            [KeyboardButton(text="📊 Статистика"), KeyboardButton(text="👨‍👩‍👧‍👦 Дети")]
-        ]
-    else:  # child
-        webapp_url = f"{settings.WEBAPP_URL}/child"
-        buttons = [
-            [KeyboardButton(text="🎮 Мои задания", web_app=WebAppInfo(url=webapp_url))],
-            [KeyboardButton(text="🏆 Мои очки"), KeyboardButton(text="🛒 Магазин")]
-        ]
-    
-    return ReplyKeyboardMarkup(keyboard=buttons, resize_keyboard=True)
+    """Получить главную клавиатуру в зависимости от роли (собрана при старте)."""
+    return main_keyboard(role)
 
 
-@router.message(CommandStart())
+@router.message(CommandStart(), flags={"throttling": "start"})
 async def start_handler(message: types.Message, session: AsyncSession):
     """Обработка команды /start."""
     user_id = message.from_user.id
@@ -49,12 +36,7 @@ async def start_handler(message: types.Message, session: AsyncSession):
     if parent:
         # Существующий родитель
         keyboard = get_main_keyboard("parent")
-        await message.answer(
-            f"👋 С возвращением, {first_name}!\n\n"
-            f"🏠 Добро пожаловать в Family Habit!\n"
-            f"Управляйте заданиями для ваших детей и следите за их прогрессом.",
-            reply_markup=keyboard
-        )
+        await message.answer(render("start.parent_back", first_name=first_name), reply_markup=keyboard)
         logger.info(f"Returning parent {user_id} ({username}) logged in")
         return
     
@@ -68,12 +50,7 @@ async def start_handler(message: types.Message, session: AsyncSession):
     if child:
         # Существующий ребёнок
         keyboard = get_main_keyboard("child")
-        await message.answer(
-            f"👋 Привет, {child.name}! 🎉\n\n"
-            f"🎮 Добро пожаловать в твои задания!\n"
-            f"Выполняй задачи и получай очки! 🏆",
-            reply_markup=keyboard
-        )
+        await message.answer(render("start.child_back", name=child.name), reply_markup=keyboard)
         logger.info(f"Child {user_id} ({child.name}) logged in")
         return
     
@@ -81,20 +58,12 @@ async def start_handler(message: types.Message, session: AsyncSession):
     parent = await parent_service.create_parent(user_id, first_name)
     
     keyboard = get_main_keyboard("parent")
-    await message.answer(
-        f"🎉 Добро пожаловать в Family Habit, {first_name}!\n\n"
-        f"👨‍👩‍👧‍👦 Вы зарегистрированы как <b>Родитель</b>\n\n"
-        f"📝 Создавайте задания для детей\n"
-        f"⭐ Одобряйте выполненные задачи\n"
-        f"🏆 Следите за прогрессом семьи\n\n"
-        f"💡 Начните с добавления детей в семью!",
-        reply_markup=keyboard
-    )
+    await message.answer(render("start.parent_new", first_name=first_name), reply_markup=keyboard)
     
     logger.info(f"New parent registered: {user_id} ({username}) -> {parent.id}")
 
 
-@router.message(lambda message: message.text == "👨‍👩‍👧‍👦 Дети")
+@text_commands.button(BTN_CHILDREN)
 async def children_handler(message: types.Message, session: AsyncSession):
     """Управление детьми."""
     user_id = message.from_user.id
@@ -129,7 +98,7 @@ async def children_handler(message: types.Message, session: AsyncSession):
     )
 
 
-@router.message(lambda message: message.text == "🏆 Мои очки")
+@text_commands.button(BTN_MY_POINTS, flags={"throttling": "points"})
 async def my_points_handler(message: types.Message, session: AsyncSession):
     """Показать очки ребёнка."""
     user_id = message.from_user.id
@@ -6,10 +6,11 @@ from aiogram import Router, types, F
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.bot.keyboards import BTN_CREATE_TASK, TASK_TYPE_KEYBOARD, TASK_TYPE_LABELS, child_picker, render
+from app.bot.text_commands import text_commands
 from app.db.models import Parent, Child, Task, TaskType, TaskStatus
 from app.services.parent_service import ParentService
 from app.services.task_service import TaskService
@@ -29,7 +30,7 @@ class TaskCreationStates(StatesGroup):
     waiting_for_coins = State()
 
 
-@router.message(lambda message: message.text == "📝 Создать задание")
+@text_commands.button(BTN_CREATE_TASK)
 async def create_task_start(message: types.Message, state: FSMContext, session: AsyncSession):
     """Начало создания задания."""
     user_id = message.from_user.id
@@ -52,11 +53,8 @@ async def create_task_start(message: types.Message, state: FSMContext, session:
         )
         return
     
-    # Создаём клавиатуру с детьми
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text=f"👦👧 {child.name}", callback_data=f"child_{child.id}")]
-        for child in children
-    ] + [[InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_task")]])
+    # Клавиатура с детьми (кэшируется по составу семьи)
+    keyboard = child_picker(children)
     
     await message.answer(
         "👨‍👩‍👧‍👦 <b>Для кого создаём задание?</b>\n\n"
@@ -126,18 +124,10 @@ async def description_received(message: types.Message, state: FSMContext):
     
     await state.update_data(description=description)
     
-    # Клавиатура с типами заданий
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="📝 Текст", callback_data="type_text")],
-        [InlineKeyboardButton(text="📸 Фото", callback_data="type_photo")],
-        [InlineKeyboardButton(text="🎥 Видео", callback_data="type_video")],
-        [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_task")]
-    ])
-    
     await message.answer(
-        f"✅ Описание добавлено\n\n"
-        f"🎯 <b>Как ребёнок должен подтвердить выполнение?</b>",
-        reply_markup=keyboard
+        "✅ Описание добавлено\n\n"
+        "🎯 <b>Как ребёнок должен подтвердить выполнение?</b>",
+        reply_markup=TASK_TYPE_KEYBOARD
     )
     
     await state.set_state(TaskCreationStates.waiting_for_type)
@@ -149,14 +139,7 @@ async def type_selected(callback: types.CallbackQuery, state: FSMContext):
     task_type = callback.data.split("_")[1]
     await state.update_data(type=task_type)
     
-    type_emojis = {"text": "📝", "photo": "📸", "video": "🎥"}
-    type_names = {"text": "Текст", "photo": "Фото", "video": "Видео"}
-    
-    await callback.message.edit_text(
-        f"✅ Тип: {type_emojis[task_type]} {type_names[task_type]}\n\n"
-        f"⭐ <b>Сколько очков дать за выполнение?</b>\n"
-        f"<i>Введите число от 1 до 100</i>"
-    )
+    await callback.message.edit_text(render("tasks.type_selected", type_label=TASK_TYPE_LABELS[task_type]))
     
     await state.set_state(TaskCreationStates.waiting_for_points)
     await callback.answer()
@@ -204,21 +187,16 @@ async def coins_received(message: types.Message, state: FSMContext, session: Asy
     parent = await parent_service.get_parent_by_tg_id(user_id)
     
     # Создаём задание
-    task = Task(
+    task = await TaskService(session).create_task(
+        parent_id=parent.id,
+        child_id=data["child_id"],
         title=data["title"],
         description=data["description"],
-        type=TaskType(data["type"]),
+        task_type=TaskType(data["type"]),
         points=data["points"],
-        coins=coins,
-        child_id=data["child_id"],
-        parent_id=parent.id,
-        status=TaskStatus.new
+        coins=coins
     )
     
-    session.add(task)
-    await session.commit()
-    await session.refresh(task)
-    
     # Получаем ребёнка для уведомления
     child = await session.get(Child, data["child_id"])
     
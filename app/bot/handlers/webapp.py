@@ -2,12 +2,14 @@
 Handlers for Telegram WebApp integration
 """
 from aiogram import Router, F
-from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, WebAppInfo
+from aiogram.types import Message
 from aiogram.filters import Command
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.bot.keyboards import render, webapp_keyboard
 from app.db.session import get_session
-from app.db.models import Parent, Child, Family
+from app.services.family_service import FamilyService
+from app.services.user_resolver import user_resolver
 from aiogram.fsm.context import FSMContext
 import os
 import logging
@@ -19,52 +21,27 @@ webapp_router = Router()
 # URL вашего веб-приложения
 WEBAPP_URL = os.getenv("WEBAPP_URL", "http://localhost:8000")
 
-@webapp_router.message(Command("app", "webapp", "start"))
+# Роутер подключён раньше start_router - /start приходит сюда, лимит "start" тоже здесь
+@webapp_router.message(Command("app", "webapp", "start"), flags={"throttling": "start"})
 async def cmd_webapp(message: Message, session: AsyncSession, state: FSMContext):
     """Открыть веб-приложение Family Habits"""
     
     # Проверяем, есть ли пользователь в базе
-    parent = await session.get(Parent, message.from_user.id)
+    parent = await user_resolver.get_parent(session, message.from_user.id)
     
     if not parent:
         # Новый пользователь - начинаем регистрацию
         webapp_url = f"{WEBAPP_URL}/registration.html?user_id={message.from_user.id}&first_name={message.from_user.first_name}"
         button_text = "🌱 Начать семейный путь"
-        welcome_text = f"🌟 Добро пожаловать, {message.from_user.first_name}!\n\n" \
-                      f"Хабит и Хабби готовы помочь вашей семье развивать полезные привычки! 🌿\n\n" \
-                      f"Нажмите кнопку ниже, чтобы создать семейный профиль и начать увлекательное путешествие к лучшим привычкам! 🚀"
+        welcome_text = render("webapp.welcome_new", first_name=message.from_user.first_name)
     else:
         # Существующий пользователь - переходим к главной странице
-        family = await session.get(Family, parent.family_id) if parent.family_id else None
-        webapp_url = f"{WEBAPP_URL}/index.html?user_id={message.from_user.id}&family_id={parent.family_id if family else ''}"
+        webapp_url = f"{WEBAPP_URL}/index.html?user_id={message.from_user.id}&family_id={parent.family_id}"
         button_text = "🏠 Открыть Family Habits"
-        welcome_text = f"🎉 С возвращением, {parent.name}!\n\n" \
-                      f"Ваша семья '{family.name if family else 'Личный профиль'}' ждет вас! 👨‍👩‍👧‍👦\n\n" \
-                      f"Готовы продолжить развивать полезные привычки? 💪"
+        welcome_text = render("webapp.welcome_back", name=parent.name, family_id=parent.family_id)
 
-    # Создаем клавиатуру с WebApp кнопкой
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text=button_text,
-                    web_app=WebAppInfo(url=webapp_url)
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text="ℹ️ О приложении",
-                    callback_data="about_app"
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    text="🆘 Помощь",
-                    callback_data="help_app"
-                )
-            ]
-        ]
-    )
+    # Клавиатура с WebApp кнопкой (LRU по тексту и URL)
+    keyboard = webapp_keyboard(button_text, webapp_url, with_info=True)
 
     await message.answer(
         text=welcome_text,
@@ -75,32 +52,27 @@ async def cmd_webapp(message: Message, session: AsyncSession, state: FSMContext)
 async def cmd_family_dashboard(message: Message, session: AsyncSession):
     """Открыть семейную панель управления"""
     
-    parent = await session.get(Parent, message.from_user.id)
-    if not parent or not parent.family_id:
+    parent = await user_resolver.get_parent(session, message.from_user.id)
+    family = None
+    if parent and parent.family_id:
+        # Семья могла быть удалена, а кэш профиля ещё хранит её id
+        family = await FamilyService(session).get_family_with_members(parent.family_id)
+    if not family:
         await message.answer(
             "❌ Сначала создайте семейный профиль!\n\n"
             "Используйте команду /app для начала работы."
         )
         return
 
-    family = await session.get(Family, parent.family_id)
+    children = FamilyService.active_children(family)
     webapp_url = f"{WEBAPP_URL}/index.html?user_id={message.from_user.id}&family_id={parent.family_id}&tab=family"
 
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text="👨‍👩‍👧‍👦 Семейная панель",
-                    web_app=WebAppInfo(url=webapp_url)
-                )
-            ]
-        ]
-    )
+    keyboard = webapp_keyboard("👨‍👩‍👧‍👦 Семейная панель", webapp_url)
 
     await message.answer(
-        f"🏠 Семья '{family.name}'\n\n"
-        f"👥 Участников: {len(family.children) + 1 if family.children else 1}\n"
-        f"⭐ Общие баллы: {sum(child.points for child in family.children) if family.children else 0}\n\n"
+        f"🏠 Семья #{family.id}\n\n"
+        f"👥 Участников: {len(family.parents) + len(children)}\n"
+        f"⭐ Общие баллы: {sum(child.points for child in children)}\n\n"
         f"Откройте семейную панель для управления задачами и прогрессом! 📊",
         reply_markup=keyboard
     )
@@ -109,23 +81,14 @@ async def cmd_family_dashboard(message: Message, session: AsyncSession):
 async def cmd_tasks(message: Message, session: AsyncSession):
     """Открыть страницу создания задач"""
     
-    parent = await session.get(Parent, message.from_user.id)
+    parent = await user_resolver.get_parent(session, message.from_user.id)
     if not parent:
         await cmd_webapp(message, session, None)
         return
 
     webapp_url = f"{WEBAPP_URL}/create-task.html?user_id={message.from_user.id}&family_id={parent.family_id or ''}"
 
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text="✅ Создать задачу",
-                    web_app=WebAppInfo(url=webapp_url)
-                )
-            ]
-        ]
-    )
+    keyboard = webapp_keyboard("✅ Создать задачу", webapp_url)
 
     await message.answer(
         "🎯 Создание новой задачи\n\n"
@@ -138,23 +101,14 @@ async def cmd_tasks(message: Message, session: AsyncSession):
 async def cmd_shop(message: Message, session: AsyncSession):
     """Открыть магазин наград"""
     
-    parent = await session.get(Parent, message.from_user.id)
+    parent = await user_resolver.get_parent(session, message.from_user.id)
     if not parent:
         await cmd_webapp(message, session, None)
         return
 
     webapp_url = f"{WEBAPP_URL}/shop.html?user_id={message.from_user.id}&stars=0"
 
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text="🛍️ Открыть магазин",
-                    web_app=WebAppInfo(url=webapp_url)
-                )
-            ]
-        ]
-    )
+    keyboard = webapp_keyboard("🛍️ Открыть магазин", webapp_url)
 
     await message.answer(
         f"🛒 Магазин наград\n\n"
@@ -168,29 +122,20 @@ async def cmd_shop(message: Message, session: AsyncSession):
 async def cmd_profile(message: Message, session: AsyncSession):
     """Открыть профиль пользователя"""
     
-    parent = await session.get(Parent, message.from_user.id)
+    parent = await user_resolver.get_parent(session, message.from_user.id)
     if not parent:
         await cmd_webapp(message, session, None)
         return
 
     webapp_url = f"{WEBAPP_URL}/profile.html?user_id={message.from_user.id}"
 
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text="👤 Мой профиль",
-                    web_app=WebAppInfo(url=webapp_url)
-                )
-            ]
-        ]
-    )
+    keyboard = webapp_keyboard("👤 Мой профиль", webapp_url)
 
     await message.answer(
         f"👤 Профиль: {parent.name or 'Родитель'}\n\n"
         f"⭐ Баллы: 0 (демо)\n"
         f"🏆 Статус: Родитель\n"
-        f"👨‍👩‍👧‍� Семья: {family.name if parent.family_id else 'Не указана'}\n\n"
+        f"👨‍👩‍👧‍👦 Семья: #{parent.family_id}\n\n"
         f"Просмотрите свой прогресс, достижения и настройки! 📊",
         reply_markup=keyboard
     )
@@ -199,23 +144,14 @@ async def cmd_profile(message: Message, session: AsyncSession):
 async def cmd_statistics(message: Message, session: AsyncSession):
     """Открыть статистику"""
     
-    parent = await session.get(Parent, message.from_user.id)
+    parent = await user_resolver.get_parent(session, message.from_user.id)
     if not parent:
         await cmd_webapp(message, session, None)
         return
 
     webapp_url = f"{WEBAPP_URL}/statistics.html?user_id={message.from_user.id}&family_id={parent.family_id or ''}"
 
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text="📊 Статистика",
-                    web_app=WebAppInfo(url=webapp_url)
-                )
-            ]
-        ]
-    )
+    keyboard = webapp_keyboard("📊 Статистика", webapp_url)
 
     await message.answer(
         "📈 Статистика и аналитика\n\n"
@@ -0,0 +1,129 @@
+# Purpose: Prebuilt keyboards and message templates.
+# Context: Клавиатуры и тексты собираются один раз при старте, а не на каждый update.
+# Requirements: Неизменяемые разметки по роли/локали, LRU для клавиатур с параметрами.
+
+from functools import lru_cache
+from typing import Iterable
+
+from aiogram.types import (
+    InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup, WebAppInfo
+)
+
+from app.core.config import settings
+
+DEFAULT_LOCALE = "ru"
+
+# (ключ, локаль) -> шаблон str.format
+TEMPLATES: dict[tuple[str, str], str] = {
+    ("start.parent_back", "ru"): (
+        "👋 С возвращением, {first_name}!\n\n"
+        "🏠 Добро пожаловать в Family Habit!\n"
+        "Управляйте заданиями для ваших детей и следите за их прогрессом."
+    ),
+    ("start.child_back", "ru"): (
+        "👋 Привет, {name}! 🎉\n\n"
+        "🎮 Добро пожаловать в твои задания!\n"
+        "Выполняй задачи и получай очки! 🏆"
+    ),
+    ("start.parent_new", "ru"): (
+        "🎉 Добро пожаловать в Family Habit, {first_name}!\n\n"
+        "👨‍👩‍👧‍👦 Вы зарегистрированы как <b>Родитель</b>\n\n"
+        "📝 Создавайте задания для детей\n"
+        "⭐ Одобряйте выполненные задачи\n"
+        "🏆 Следите за прогрессом семьи\n\n"
+        "💡 Начните с добавления детей в семью!"
+    ),
+    ("webapp.welcome_new", "ru"): (
+        "🌟 Добро пожаловать, {first_name}!\n\n"
+        "Хабит и Хабби готовы помочь вашей семье развивать полезные привычки! 🌿\n\n"
+        "Нажмите кнопку ниже, чтобы создать семейный профиль и начать увлекательное путешествие к лучшим привычкам! 🚀"
+    ),
+    ("webapp.welcome_back", "ru"): (
+        "🎉 С возвращением, {name}!\n\n"
+        "Ваша семья #{family_id} ждет вас! 👨‍👩‍👧‍👦\n\n"
+        "Готовы продолжить развивать полезные привычки? 💪"
+    ),
+    ("tasks.type_selected", "ru"): (
+        "✅ Тип: {type_label}\n\n"
+        "⭐ <b>Сколько очков дать за выполнение?</b>\n"
+        "<i>Введите число от 1 до 100</i>"
+    ),
+}
+
+# Тексты кнопок reply-клавиатуры (по ним же ищутся handler в text_commands)
+BTN_CREATE_TASK = "📝 Создать задание"
+BTN_CHILDREN = "👨‍👩‍👧‍👦 Дети"
+BTN_STATS = "📊 Статистика"
+BTN_MY_POINTS = "🏆 Мои очки"
+BTN_SHOP = "🛒 Магазин"
+
+TASK_TYPE_LABELS = {"text": "📝 Текст", "photo": "📸 Фото", "video": "🎥 Видео"}
+
+
+def render(key: str, locale: str = DEFAULT_LOCALE, **params) -> str:
+    """Текст по шаблону; для неизвестной локали - шаблон по умолчанию."""
+    template = TEMPLATES.get((key, locale)) or TEMPLATES[(key, DEFAULT_LOCALE)]
+    return template.format(**params) if params else template
+
+
+def _build_main_keyboards(webapp_url: str) -> dict[str, ReplyKeyboardMarkup]:
+    parent = ReplyKeyboardMarkup(keyboard=[
+        [KeyboardButton(text="🏠 Семейная панель", web_app=WebAppInfo(url=f"{webapp_url}/parent"))],
+        [KeyboardButton(text=BTN_CREATE_TASK)],
+        [KeyboardButton(text=BTN_STATS), KeyboardButton(text=BTN_CHILDREN)]
+    ], resize_keyboard=True)
+    child = ReplyKeyboardMarkup(keyboard=[
+        [KeyboardButton(text="🎮 Мои задания", web_app=WebAppInfo(url=f"{webapp_url}/child"))],
+        [KeyboardButton(text=BTN_MY_POINTS), KeyboardButton(text=BTN_SHOP)]
+    ], resize_keyboard=True)
+    return {"parent": parent, "child": child}
+
+
+# Разметки aiogram неизменяемы (frozen pydantic), поэтому один объект можно отдавать всем
+MAIN_KEYBOARDS = _build_main_keyboards(settings.WEBAPP_URL)
+
+CANCEL_TASK_BUTTON = InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_task")
+
+TASK_TYPE_KEYBOARD = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text=label, callback_data=f"type_{task_type}")]
+    for task_type, label in TASK_TYPE_LABELS.items()
+] + [[CANCEL_TASK_BUTTON]])
+
+ABOUT_BUTTON = InlineKeyboardButton(text="ℹ️ О приложении", callback_data="about_app")
+HELP_BUTTON = InlineKeyboardButton(text="🆘 Помощь", callback_data="help_app")
+
+
+def main_keyboard(role: str) -> ReplyKeyboardMarkup:
+    """Главная клавиатура роли (всё, что не parent, - детская)."""
+    return MAIN_KEYBOARDS["parent" if role == "parent" else "child"]
+
+
+@lru_cache(maxsize=settings.keyboard_cache_size)
+def webapp_keyboard(text: str, url: str, with_info: bool = False) -> InlineKeyboardMarkup:
+    """Кнопка WebApp (URL зависит от пользователя), опционально с «О приложении» и «Помощь»."""
+    rows = [[InlineKeyboardButton(text=text, web_app=WebAppInfo(url=url))]]
+    if with_info:
+        rows += [[ABOUT_BUTTON], [HELP_BUTTON]]
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+@lru_cache(maxsize=settings.keyboard_cache_size)
+def _child_picker(children: tuple[tuple[int, str], ...]) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=f"👦👧 {name}", callback_data=f"child_{child_id}")]
+        for child_id, name in children
+    ] + [[CANCEL_TASK_BUTTON]])
+
+
+def child_picker(children: Iterable) -> InlineKeyboardMarkup:
+    """Выбор ребёнка; кэш по составу семьи (id и имена)."""
+    return _child_picker(tuple((child.id, child.name) for child in children))
+
+
+@lru_cache(maxsize=settings.keyboard_cache_size)
+def review_keyboard(task_id: int) -> InlineKeyboardMarkup:
+    """Кнопки проверки задания для родителя."""
+    return InlineKeyboardMarkup(inline_keyboard=[[
+        InlineKeyboardButton(text="✅ Принять", callback_data=f"approve_{task_id}"),
+        InlineKeyboardButton(text="❌ Отклонить", callback_data=f"reject_{task_id}")
+    ]])
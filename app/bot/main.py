@@ -5,44 +5,102 @@
 import asyncio
 import logging
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from app.core.config import settings
-from app.bot.handlers import start_router, tasks_router, admin_router, webapp_router
-from app.bot.middlewares import DatabaseMiddleware, AuthMiddleware
+from app.core.events import event_hub
+from app.bot.handlers import start_router, tasks_router, admin_router, webapp_router, checkins_router
+from app.bot.middlewares import (
+    DatabaseMiddleware, AuthMiddleware, QueryProfilerMiddleware,
+    UpdateSequencerMiddleware, DedupMiddleware, ThrottlingMiddleware, UpdateRecorder
+)
+from app.bot.scheduler import ReminderScheduler
+from app.bot.text_commands import text_commands
+from app.db.shards import shard_router
+from app.services.archive_service import ArchiveJob
+from app.services.ledger_service import LedgerReconciler
+from app.services.stats_service import RollupJob
 from app.core import get_logger
 
 logger = get_logger(__name__)
 
 
+def create_bot_session() -> AiohttpSession:
+    """HTTP-сессия Bot API (можно направить на локальный/фейковый сервер)."""
+    if settings.telegram_api_server:
+        return AiohttpSession(api=TelegramAPIServer.from_base(settings.telegram_api_server))
+    return AiohttpSession()
+
+
 async def create_bot() -> Bot:
     """Создать и настроить Telegram Bot."""
-    bot = Bot(token=settings.TELEGRAM_BOT_TOKEN, parse_mode=ParseMode.HTML)
+    bot = Bot(token=settings.TELEGRAM_BOT_TOKEN, session=create_bot_session(), parse_mode=ParseMode.HTML)
     return bot
 
 
 async def create_dispatcher() -> Dispatcher:
     """Создать и настроить Dispatcher с middleware и handlers."""
-    # FSM storage
-    storage = MemoryStorage()
+    # FSM storage (общий между воркерами, если их несколько)
+    if settings.fsm_storage == "redis":
+        from aiogram.fsm.storage.redis import RedisStorage
+        storage = RedisStorage.from_url(settings.redis_url)
+    else:
+        storage = MemoryStorage()
     dp = Dispatcher(storage=storage)
     
     # Middleware
+    if settings.update_record_dir:
+        # Первой: пишется всё, что пришло, с временем прихода (для app.bench.replay)
+        recorder = UpdateRecorder()
+        dp.update.outer_middleware(recorder)
+        dp.shutdown.register(recorder.close)
+    # Повторы update отбрасываются раньше очереди и handler
+    dp.update.outer_middleware(DedupMiddleware())
+    # Порядок апдейтов внутри чата (FSM, двойные нажатия), чаты - параллельно
+    dp.update.outer_middleware(UpdateSequencerMiddleware())
+    if settings.throttle_enabled:
+        # До DatabaseMiddleware: флуд отсекается без сессии и запросов
+        throttling = ThrottlingMiddleware()
+        dp.message.middleware(throttling)
+        dp.callback_query.middleware(throttling)
+    if settings.sql_profile:
+        dp.message.middleware(QueryProfilerMiddleware())
+        dp.callback_query.middleware(QueryProfilerMiddleware())
     dp.message.middleware(DatabaseMiddleware())
     dp.callback_query.middleware(DatabaseMiddleware())
     dp.message.middleware(AuthMiddleware())
     dp.callback_query.middleware(AuthMiddleware())
     
-    # Routers
+    # Routers: таблица кнопок первой - нажатие находится одним поиском по словарю
+    dp.include_router(text_commands)
+    # Админский /stats (фильтр по ADMIN_USER_IDS) раньше семейного /stats из webapp_router
+    dp.include_router(admin_router)
     dp.include_router(webapp_router)
     dp.include_router(start_router)
     dp.include_router(tasks_router)
-    dp.include_router(admin_router)
+    dp.include_router(checkins_router)
     
     return dp
 
 
+def create_background_jobs(bot: Bot) -> list:
+    """Фоновые задачи (run/stop) - по экземпляру на каждый шард семей."""
+    jobs = []
+    for shard, session_factory in enumerate(shard_router.sessionmakers()):
+        if settings.reminders_enabled:
+            jobs.append(ReminderScheduler(bot, session_factory=session_factory, shard=shard))
+        if settings.ledger_reconcile_enabled:
+            jobs.append(LedgerReconciler(session_factory=session_factory))
+        if settings.archive_enabled:
+            jobs.append(ArchiveJob(session_factory=session_factory))
+        if settings.rollup_enabled:
+            jobs.append(RollupJob(session_factory=session_factory))
+    return jobs
+
+
 async def main():
     """Основная функция запуска бота."""
     logging.basicConfig(
@@ -55,12 +113,20 @@ async def main():
     
     logger.info("Bot starting...")
     
+    # События бота (сдача, проверка) нужны API-процессу для SSE и кэша, события API - планировщику
+    if settings.events_backend == "redis":
+        await event_hub.start_backplane(settings.redis_url)
+    background = [asyncio.create_task(job.run()) for job in create_background_jobs(bot)]
+    
     try:
         # Удаляем webhook на всякий случай
         await bot.delete_webhook(drop_pending_updates=True)
         # Запуск polling
         await dp.start_polling(bot)
     finally:
+        for task in background:
+            task.cancel()
+        await event_hub.stop_backplane()
         await bot.session.close()
 
 
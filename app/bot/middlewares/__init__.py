@@ -1,5 +1,10 @@
 # Purpose: Bot middlewares.
 
 from .auth import DatabaseMiddleware, AuthMiddleware
+from .profiler import QueryProfilerMiddleware
+from .sequencer import UpdateSequencerMiddleware
+from .dedup import DedupMiddleware
+from .throttling import ThrottlingMiddleware
+from .recorder import UpdateRecorder
 
-__all__ = ["DatabaseMiddleware", "AuthMiddleware"]
\ No newline at end of file
+__all__ = ["DatabaseMiddleware", "AuthMiddleware", "QueryProfilerMiddleware", "UpdateSequencerMiddleware", "DedupMiddleware", "ThrottlingMiddleware", "UpdateRecorder"]
\ No newline at end of file
@@ -7,8 +7,8 @@ from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import SessionLocal
-from app.db.models import Parent, Child
+from app.db.shards import shard_router
+from app.services.user_resolver import user_resolver
 from app.core import get_logger
 
 logger = get_logger(__name__)
@@ -23,7 +23,9 @@ class DatabaseMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any]
     ) -> Any:
-        async with SessionLocal() as session:
+        # Сессия на шарде семьи пользователя (без шардинга - основная БД)
+        user = getattr(event, "from_user", None)
+        async with shard_router.session_for_user(user.id if user else 0) as session:
             data["session"] = session
             return await handler(event, data)
 
@@ -45,31 +47,14 @@ class AuthMiddleware(BaseMiddleware):
         if user_id:
             session: AsyncSession = data.get("session")
             if session:
-                # Определяем роль пользователя
-                from sqlalchemy import select
+                # Определяем роль пользователя по индексу tg_id (с кэшем)
+                user = await user_resolver.resolve(session, user_id)
                 
-                # Проверяем родителя
-                result = await session.execute(
-                    select(Parent).where(Parent.tg_id == user_id)
-                )
-                parent = result.scalar_one_or_none()
-                
-                if parent:
-                    data["user_role"] = "parent"
-                    data["user_db_id"] = parent.id
-                    data["family_id"] = parent.family_id
+                if user:
+                    data["user_role"] = user.role
+                    data["user_db_id"] = user.db_id
+                    data["family_id"] = user.family_id
                 else:
-                    # Проверяем ребёнка
-                    result = await session.execute(
-                        select(Child).where(Child.tg_id == user_id)
-                    )
-                    child = result.scalar_one_or_none()
-                    
-                    if child:
-                        data["user_role"] = "child"
-                        data["user_db_id"] = child.id
-                        data["family_id"] = child.family_id
-                    else:
-                        data["user_role"] = "unknown"
+                    data["user_role"] = "unknown"
         
-        return await handler(event, data)
\ No newline at end of file
+        return await handler(event, data)
@@ -0,0 +1,38 @@
+# Purpose: Duplicate update filter middleware.
+# Context: Повторно доставленные update отбрасываются до handler и работы с БД.
+# Requirements: Проверка по update_id и id callback-запроса через общий дедупликатор.
+
+from typing import Callable, Dict, Any, Awaitable, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from app.core.dedup import UpdateDeduplicator, update_dedup
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+
+class DedupMiddleware(BaseMiddleware):
+    """Outer middleware на dp.update: повтор update не доходит до handler."""
+
+    def __init__(self, dedup: Optional[UpdateDeduplicator] = None):
+        self.dedup = dedup or update_dedup
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        # Webhook в cloud_server уже проверил update до разбора JSON
+        if data.get("dedup_checked") or not isinstance(event, Update):
+            return await handler(event, data)
+
+        keys = [f"update:{event.update_id}"]
+        if event.callback_query is not None:
+            keys.append(f"callback:{event.callback_query.id}")
+
+        if not await self.dedup.first_seen(*keys):
+            logger.info(f"Dropped duplicate update {event.update_id}")
+            return None
+        return await handler(event, data)
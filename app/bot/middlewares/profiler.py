@@ -0,0 +1,59 @@
+# Purpose: SQL query profiling middleware.
+# Context: Считает запросы на каждый update, включается через SQL_PROFILE.
+# Requirements: Бюджет запросов, N+1, медленные запросы с именем handler.
+
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.core.config import settings
+from app.db.profiler import install_query_profiler, profile_queries
+from app.db.session import get_engine, get_reader_engines
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+
+def handler_name(data: Dict[str, Any]) -> str:
+    """Имя handler, выбранного роутером для события."""
+    handler = data.get("handler")
+    callback = getattr(handler, "callback", None)
+    if callback is None:
+        return "unknown"
+    return f"{callback.__module__}.{callback.__qualname__}"
+
+
+class QueryProfilerMiddleware(BaseMiddleware):
+    """Middleware для подсчёта SQL-запросов в каждом handler."""
+
+    def __init__(self, budget: int | None = None, slow_ms: float | None = None):
+        self.budget = budget if budget is not None else settings.sql_profile_budget
+        self.slow_ms = slow_ms if slow_ms is not None else settings.sql_profile_slow_ms
+        for engine in (get_engine(), *get_reader_engines()):
+            install_query_profiler(engine)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        name = handler_name(data)
+        with profile_queries(name) as stats:
+            try:
+                return await handler(event, data)
+            finally:
+                self._report(stats)
+
+    def _report(self, stats) -> None:
+        if stats.count > self.budget:
+            logger.warning(f"{stats.label}: {stats.count} SQL queries (budget {self.budget})")
+
+        for statement, repeats in stats.duplicates().items():
+            logger.warning(f"{stats.label}: possible N+1, query repeated {repeats}x: {statement}")
+
+        for query in stats.slowest():
+            if query.duration_ms >= self.slow_ms:
+                logger.warning(f"{stats.label}: slow query {query.duration_ms:.1f} ms: {query.statement}")
+
+        logger.debug(f"{stats.label}: {stats.count} queries, {stats.total_ms:.1f} ms")
@@ -0,0 +1,134 @@
+# Purpose: Opt-in recorder of incoming updates.
+# Context: Медленные периоды воспроизводятся офлайн (`python -m app.bench.replay`) вместо догадок.
+# Requirements: Анонимизация (id, имена, тексты, file_id), время прихода, JSONL.gz, включается UPDATE_RECORD_DIR.
+
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from app.core.config import settings
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+# Анонимные Telegram ID: отдельный диапазон, влезает в Integer колонок tg_id
+TG_REPLAY_BASE = 1_900_000_000
+PERSONAL_FIELDS = {"last_name", "username", "title", "phone_number", "bio", "language_code"}
+DROPPED_FIELDS = {"contact", "location", "venue", "reply_to_message", "forward_from", "forward_from_chat"}
+TOKEN_FIELDS = {"file_id", "file_unique_id", "chat_instance", "inline_message_id"}
+# Allowlist: строки остальных полей (web_app_data, inline_query, опросы, платежи, новые поля Bot API) маскируются
+SAFE_STRINGS = {"type", "mime_type"}
+# callback_data собирает сам бот (действие и id задания) - без неё replay не попадёт в handlers
+SAFE_PATHS = {("callback_query", "data")}
+
+
+class UpdateRecorder(BaseMiddleware):
+    """Outer middleware на dp.update: пишет анонимный update и время его прихода."""
+
+    def __init__(self, directory: Optional[str] = None, salt: Optional[str] = None, flush_seconds: float = 1.0):
+        self.directory = Path(directory or settings.update_record_dir)
+        # Без соли из настроек id стабильны только в пределах процесса (одного файла)
+        self.salt = (salt or settings.update_record_salt or secrets.token_hex(16)).encode()
+        self.flush_seconds = flush_seconds
+        self.path: Optional[Path] = None
+        self._file = None
+        self._started = 0.0
+        self._flushed = 0.0
+        self.recorded = 0
+
+    def _open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"updates-{datetime.utcnow():%Y%m%d-%H%M%S}-{os.getpid()}.jsonl.gz"
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._started = self._flushed = time.monotonic()
+        logger.info(f"Recording updates to {self.path}")
+
+    def _tg_id(self, value: int) -> int:
+        digest = hmac.new(self.salt, str(value).encode(), hashlib.sha256).hexdigest()
+        return TG_REPLAY_BASE + int(digest[:12], 16) % 100_000_000
+
+    def _token(self, value: str) -> str:
+        return hmac.new(self.salt, value.encode(), hashlib.sha256).hexdigest()[:32]
+
+    @staticmethod
+    def _text(text: str) -> str:
+        """Команды, кнопки меню и числа (ответы FSM) остаются, остальное - 'x' той же длины."""
+        from app.bot.text_commands import text_commands
+
+        if text.startswith("/"):
+            return text.split()[0]
+        if text in text_commands.commands or text.strip().isdigit():
+            return text
+        return re.sub(r"\w", "x", text)
+
+    def anonymize(self, value: Any, key: Optional[str] = None, parent: Optional[str] = None) -> Any:
+        """Копия значения поля key (внутри объекта parent): известные поля - по правилам, прочие строки - 'x'."""
+        if isinstance(value, list):
+            return [self.anonymize(item, key, parent) for item in value]
+        if isinstance(value, str):
+            if key in SAFE_STRINGS or (parent, key) in SAFE_PATHS:
+                return value
+            return re.sub(r"\w", "x", value)
+        if not isinstance(value, dict):
+            return value
+        result = {}
+        for field, item in value.items():
+            if field in DROPPED_FIELDS or field in PERSONAL_FIELDS:
+                continue
+            if field == "id" and isinstance(item, int) and ("first_name" in value or "type" in value):
+                result[field] = self._tg_id(item)  # User / Chat
+            elif field == "first_name":
+                result[field] = "User"
+            elif field in TOKEN_FIELDS:
+                result[field] = self._token(str(item))
+            elif field in ("text", "caption") and isinstance(item, str):
+                result[field] = self._text(item)
+            else:
+                result[field] = self.anonymize(item, field, key)
+        return result
+
+    def record(self, update: Update) -> None:
+        if self._file is None:
+            self._open()
+        now = time.monotonic()
+        data = self.anonymize(update.model_dump(mode="json", exclude_none=True, by_alias=True))
+        # Запись небольшая и буферизована gzip - в event loop без потоков
+        self._file.write(json.dumps(
+            {"t": round(now - self._started, 4), "update": data}, ensure_ascii=False, separators=(",", ":")
+        ) + "\n")
+        self.recorded += 1
+        if now - self._flushed >= self.flush_seconds:
+            # Sync flush: файл читается и без закрытия (после падения процесса)
+            self._file.flush()
+            self._flushed = now
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if isinstance(event, Update):
+            try:
+                self.record(event)
+            except Exception as e:
+                logger.warning(f"Failed to record update {event.update_id}: {e}")
+        return await handler(event, data)
+
+    async def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logger.info(f"Recorded {self.recorded} updates to {self.path}")
+
@@ -0,0 +1,101 @@
+# Purpose: Update sequencer middleware.
+# Context: Апдейты одного чата обрабатываются строго по очереди, разные чаты - параллельно.
+# Requirements: Ключевые блокировки без утечек, общий лимит параллельности, backpressure.
+
+import asyncio
+from typing import Callable, Dict, Any, Awaitable, Hashable, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from app.core.config import settings
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+
+class _KeySlot:
+    """Блокировка ключа и число апдейтов, которые её держат или ждут."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()  # Lock отдаёт владение в порядке ожидания (FIFO)
+        self.users = 0
+
+
+def update_key(data: Dict[str, Any]) -> Optional[Hashable]:
+    """Ключ упорядочивания: чат, а для событий без чата - пользователь."""
+    chat = data.get("event_chat")
+    if chat is not None:
+        return "chat", chat.id
+    user = data.get("event_from_user")
+    if user is not None:
+        return "user", user.id
+    return None
+
+
+class UpdateSequencerMiddleware(BaseMiddleware):
+    """Outer middleware на dp.update: порядок внутри чата, параллельность между чатами."""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_per_key: Optional[int] = None
+    ):
+        self.concurrency = concurrency or settings.update_concurrency
+        self.max_pending = max_pending or settings.update_max_pending
+        self.max_per_key = max_per_key or settings.update_max_per_chat
+
+        self._slots: dict[Hashable, _KeySlot] = {}
+        # Сколько handler выполняется одновременно
+        self._running = asyncio.Semaphore(self.concurrency)
+        # Сколько апдейтов вообще принято в работу; сверх этого вызывающий ждёт
+        self._admission = asyncio.Semaphore(self.max_pending)
+        self.dropped = 0
+
+    @property
+    def active_keys(self) -> int:
+        return len(self._slots)
+
+    def _acquire_slot(self, key: Hashable) -> Optional[_KeySlot]:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _KeySlot()
+        elif slot.users >= self.max_per_key:
+            return None
+        slot.users += 1
+        return slot
+
+    def _release_slot(self, key: Hashable, slot: _KeySlot) -> None:
+        slot.users -= 1
+        if slot.users == 0:
+            # Последний апдейт ключа - убираем запись, чтобы словарь не рос
+            del self._slots[key]
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        key = update_key(data)
+        if key is None:
+            async with self._running:
+                return await handler(event, data)
+
+        slot = self._acquire_slot(key)
+        if slot is None:
+            # Один чат не может занять всю очередь (флуд одинаковыми нажатиями)
+            self.dropped += 1
+            update_id = event.update_id if isinstance(event, Update) else None
+            logger.warning(f"Dropped update {update_id}: too many pending updates for {key}")
+            return None
+
+        try:
+            async with self._admission:
+                async with slot.lock:
+                    async with self._running:
+                        return await handler(event, data)
+        finally:
+            self._release_slot(key, slot)
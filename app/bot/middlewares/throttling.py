@@ -0,0 +1,145 @@
+# Purpose: Anti-flood throttling middleware.
+# Context: Частые нажатия одного пользователя не доходят до сессии БД и handler.
+# Requirements: Скользящее окно на пользователя и группу handler, периодическая очистка, опционально Redis.
+
+import time
+from typing import Callable, Dict, Any, Awaitable, Optional
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import TelegramObject, Message, CallbackQuery
+
+from app.core.config import settings
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_GROUP = "default"
+REDIS_KEY_PREFIX = "fh:throttle:"
+THROTTLED_TEXT = "⏳ Слишком часто! Подожди немного и попробуй снова."
+
+
+class SlidingWindowCounter:
+    """Скользящее окно по двум фиксированным: O(1) памяти на пару (пользователь, группа).
+
+    Оценка = текущее окно + предыдущее * доля, ещё попадающая в скользящее окно.
+    """
+
+    def __init__(self, sweep_interval: float = 60.0):
+        # key -> [номер окна, счётчик предыдущего окна, счётчик текущего, предупреждён ли]
+        self._entries: dict[tuple, list] = {}
+        self._windows: dict[tuple, float] = {}
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hit(self, key: tuple, limit: int, window: float, now: Optional[float] = None) -> tuple[bool, bool]:
+        """Учесть событие. Возвращает (разрешено, нужно ли предупредить пользователя)."""
+        now = time.monotonic() if now is None else now
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        index = int(now // window)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < index - 1:
+            entry = self._entries[key] = [index, 0, 0, False]
+            self._windows[key] = window
+        elif entry[0] == index - 1:
+            entry[:] = [index, entry[2], 0, False]
+
+        elapsed = (now % window) / window
+        estimate = entry[1] * (1 - elapsed) + entry[2]
+        if estimate >= limit:
+            warn = not entry[3]
+            entry[3] = True
+            return False, warn
+
+        entry[2] += 1
+        return True, False
+
+    def _sweep(self, now: float) -> None:
+        """Удалить пары, по которым не было событий два окна."""
+        stale = [
+            key for key, entry in self._entries.items()
+            if entry[0] < int(now // self._windows[key]) - 1
+        ]
+        for key in stale:
+            del self._entries[key]
+            del self._windows[key]
+        self._next_sweep = now + self.sweep_interval
+
+
+class RedisSlidingWindowCounter:
+    """То же окно в Redis: общие лимиты для нескольких воркеров/реплик."""
+
+    def __init__(self, redis_url: str):
+        from redis import asyncio as aioredis
+        self._redis = aioredis.from_url(redis_url)
+
+    async def hit(self, key: tuple, limit: int, window: float) -> tuple[bool, bool]:
+        now = time.time()
+        index = int(now // window)
+        base = REDIS_KEY_PREFIX + ":".join(map(str, key))
+        current, previous, warned = f"{base}:{index}", f"{base}:{index - 1}", f"{base}:{index}:warned"
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(previous)
+            pipe.incr(current)
+            pipe.expire(current, int(window * 2) + 1)
+            previous_count, current_count, _ = await pipe.execute()
+
+        elapsed = (now % window) / window
+        # Текущее событие уже учтено в INCR - сравниваем без него
+        if int(previous_count or 0) * (1 - elapsed) + current_count - 1 < limit:
+            return True, False
+        warn = await self._redis.set(warned, 1, nx=True, ex=int(window) + 1)
+        return False, bool(warn)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Inner middleware до DatabaseMiddleware: лимит по группе handler (флаг "throttling")."""
+
+    def __init__(self, rules: Optional[dict[str, tuple[int, float]]] = None, backend: Optional[str] = None):
+        self.rules = rules or settings.THROTTLE_RULES
+        self.counter = SlidingWindowCounter()
+        self.shared: Optional[RedisSlidingWindowCounter] = None
+        if (backend or settings.throttle_backend) == "redis":
+            try:
+                self.shared = RedisSlidingWindowCounter(settings.redis_url)
+            except ImportError:
+                logger.warning("redis package is not installed, throttling stays in-process")
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get("event_from_user")
+        group = get_flag(data, "throttling", default=DEFAULT_GROUP)
+        rule = self.rules.get(group) or self.rules.get(DEFAULT_GROUP)
+        if user is None or rule is None:
+            return await handler(event, data)
+
+        limit, window = rule
+        key = (user.id, group)
+        if self.shared is not None:
+            try:
+                allowed, warn = await self.shared.hit(key, limit, window)
+            except Exception as e:
+                logger.warning(f"Redis throttling failed, using local counter: {e}")
+                allowed, warn = self.counter.hit(key, limit, window)
+        else:
+            allowed, warn = self.counter.hit(key, limit, window)
+
+        if allowed:
+            return await handler(event, data)
+
+        # Без сессии БД: одно короткое предупреждение на окно, остальное молча отбрасываем
+        logger.debug(f"Throttled user {user.id} in group {group}")
+        if isinstance(event, CallbackQuery):
+            await event.answer(THROTTLED_TEXT if warn else None)
+        elif warn and isinstance(event, Message):
+            await event.answer(THROTTLED_TEXT)
+        return None
@@ -0,0 +1,215 @@
+# Purpose: Due-date reminder scheduler.
+# Context: Напоминания детям о сроке задания и пометка просроченных заданий.
+# Requirements: Min-heap ближайших сроков, пополнение по индексу (status, due_at), без опроса таблицы.
+
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from aiogram import Bot
+from sqlalchemy import select, update, or_, and_
+
+from app.core.config import settings
+from app.core.events import event_hub
+from app.db.models import Task, Child, TaskStatus
+from app.db.session import SessionLocal
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+OPEN_STATUSES = (TaskStatus.new, TaskStatus.in_progress)
+
+REMIND = "remind"
+EXPIRE = "expire"
+
+
+class ReminderScheduler:
+    """Таймерная куча по Task.due_at: спит до ближайшего срока, а не опрашивает БД."""
+
+    def __init__(
+        self,
+        bot: Bot,
+        window: Optional[int] = None,
+        lead: Optional[timedelta] = None,
+        session_factory=SessionLocal,
+        shard: int = 0
+    ):
+        self.bot = bot
+        self.window = window or settings.reminder_window
+        self.lead = lead if lead is not None else timedelta(minutes=settings.reminder_lead_minutes)
+        self.session_factory = session_factory
+        self.shard = shard
+
+        self._heap: list[tuple[datetime, int, str, int]] = []
+        self._seq = itertools.count()
+        # Граница загруженного окна (due_at, id): всё, что раньше, уже в куче
+        self._horizon: Optional[tuple[datetime, int]] = None
+        self._exhausted = False
+        self._reloaded = float("-inf")
+        self._wakeup = asyncio.Event()
+        self._stopped = False
+
+        event_hub.add_listener(self._on_event)
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.utcnow()
+
+    def _push(self, task_id: int, due_at: datetime, reminded: bool) -> None:
+        if not reminded:
+            heapq.heappush(self._heap, (due_at - self.lead, next(self._seq), REMIND, task_id))
+        heapq.heappush(self._heap, (due_at, next(self._seq), EXPIRE, task_id))
+
+    def _on_event(self, channel: str, event: dict) -> None:
+        """Новое задание со сроком внутри окна попадает в кучу сразу."""
+        if event.get("type") != "task_created" or not event.get("due_at"):
+            return
+        if event.get("shard", 0) != self.shard:  # id заданий уникальны только внутри шарда
+            return
+        due_at = datetime.fromisoformat(event["due_at"])
+        if due_at.tzinfo is not None:
+            # В куче только naive UTC, как Task.due_at и _now()
+            due_at = due_at.astimezone(timezone.utc).replace(tzinfo=None)
+        if self._horizon is None or self._exhausted or (due_at, event["task_id"]) <= self._horizon:
+            self._push(event["task_id"], due_at, reminded=False)
+        self._wakeup.set()
+
+    async def _refill(self) -> None:
+        """Догрузить следующие window сроков после текущей границы."""
+        query = (
+            select(Task.id, Task.due_at, Task.reminded_at)
+            .where(Task.status.in_(OPEN_STATUSES), Task.due_at.is_not(None))
+            .order_by(Task.due_at, Task.id)
+            .limit(self.window)
+        )
+        if self._horizon is not None:
+            due_at, task_id = self._horizon
+            query = query.where(or_(
+                Task.due_at > due_at,
+                and_(Task.due_at == due_at, Task.id > task_id)
+            ))
+
+        async with self.session_factory() as session:
+            rows = (await session.execute(query)).all()
+
+        for task_id, due_at, reminded_at in rows:
+            self._push(task_id, due_at, reminded=reminded_at is not None)
+        if rows:
+            self._horizon = (rows[-1].due_at, rows[-1].id)
+        self._exhausted = len(rows) < self.window
+        logger.debug(f"Scheduler loaded {len(rows)} deadlines, heap size {len(self._heap)}")
+
+    async def _reload(self) -> None:
+        """Перечитать окно с начала: задания другого процесса или прямой записи в БД приходят без события."""
+        self._heap.clear()
+        self._horizon, self._exhausted = None, False
+        await self._refill()
+        self._reloaded = time.monotonic()
+
+    async def expire_overdue(self) -> int:
+        """Пометить все просроченные открытые задания одним UPDATE."""
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(Task)
+                .where(Task.status.in_(OPEN_STATUSES), Task.due_at <= self._now())
+                .values(status=TaskStatus.expired)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        if result.rowcount:
+            logger.info(f"Marked {result.rowcount} overdue tasks as expired")
+        return result.rowcount
+
+    async def send_reminders(self, task_ids: list[int]) -> int:
+        """Напомнить детям о заданиях, срок которых скоро истекает."""
+        async with self.session_factory() as session:
+            rows = (await session.execute(
+                select(Task.id, Task.title, Task.due_at, Child.tg_id)
+                .join(Child, Child.id == Task.child_id)
+                .where(
+                    Task.id.in_(task_ids),
+                    Task.status.in_(OPEN_STATUSES),
+                    Task.reminded_at.is_(None)
+                )
+            )).all()
+
+            sent = []
+            for task_id, title, due_at, tg_id in rows:
+                if tg_id:
+                    try:
+                        await self.bot.send_message(
+                            tg_id,
+                            f"⏰ <b>Скоро срок задания!</b>\n\n"
+                            f"📋 {title}\n"
+                            f"🕐 До: {due_at:%d.%m %H:%M} UTC\n\n"
+                            f"🎮 Успей выполнить и получить очки!"
+                        )
+                    except Exception as e:
+                        logger.warning(f"Failed to remind about task {task_id}: {e}")
+                        continue
+                sent.append(task_id)
+
+            if sent:
+                await session.execute(
+                    update(Task)
+                    .where(Task.id.in_(sent))
+                    .values(reminded_at=self._now())
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+        return len(sent)
+
+    async def _fire_due(self) -> None:
+        now = self._now()
+        reminders: list[int] = []
+        expire = False
+        while self._heap and self._heap[0][0] <= now:
+            _, _, kind, task_id = heapq.heappop(self._heap)
+            if kind == REMIND:
+                reminders.append(task_id)
+            else:
+                expire = True
+
+        if reminders:
+            await self.send_reminders(reminders)
+        if expire:
+            await self.expire_overdue()
+
+    async def run(self) -> None:
+        """Основной цикл: сон до ближайшего срока или до нового задания."""
+        logger.info("Reminder scheduler started")
+        await self.expire_overdue()
+
+        while not self._stopped:
+            try:
+                await self._fire_due()
+
+                if time.monotonic() - self._reloaded >= settings.reminder_idle_seconds:
+                    # Раз в reminder_idle_seconds - проход по индексу с начала окна
+                    await self._reload()
+                elif not self._exhausted and len(self._heap) < self.window:
+                    await self._refill()
+
+                delay = settings.reminder_idle_seconds
+                if self._heap:
+                    delay = min(max((self._heap[0][0] - self._now()).total_seconds(), 0), delay)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Reminder scheduler error: {e}")
+                # Куча могла остаться с испорченной записью - следующая итерация перечитает окно из БД
+                self._heap.clear()
+                self._reloaded = float("-inf")
+                await asyncio.sleep(5)
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
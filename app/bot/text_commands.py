@@ -0,0 +1,42 @@
+# Purpose: Reply-keyboard text command table.
+# Context: Нажатие кнопки reply-клавиатуры находит handler одним поиском в словаре.
+# Requirements: Один фильтр вместо цепочки lambda-фильтров по всем роутерам, флаги handler сохраняются.
+
+from typing import Any, Callable, Optional, Union
+
+from aiogram import Router
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import Message
+
+
+class TextCommandRouter(Router):
+    """Роутер с таблицей «текст кнопки -> handler»; подключается первым в Dispatcher."""
+
+    def __init__(self, name: Optional[str] = None):
+        super().__init__(name=name)
+        self.commands: dict[str, HandlerObject] = {}
+        self.message.register(self._dispatch, self._match)
+
+    def button(self, text: str, flags: Optional[dict[str, Any]] = None) -> Callable:
+        """Декоратор: зарегистрировать handler для текста кнопки."""
+        def decorator(callback: Callable) -> Callable:
+            if text in self.commands:
+                raise ValueError(f"Text command {text!r} is already registered")
+            self.commands[text] = HandlerObject(callback=callback, flags=dict(flags or {}))
+            return callback
+        return decorator
+
+    def _match(self, message: Message) -> Union[bool, dict[str, Any]]:
+        handler = self.commands.get(message.text)
+        if handler is None:
+            return False
+        # Middleware (флаги throttling, имя для профилировщика) видят handler кнопки, а не диспетчер
+        return {"handler": handler}
+
+    @staticmethod
+    async def _dispatch(message: Message, handler: HandlerObject, **data: Any) -> Any:
+        return await handler.call(message, handler=handler, **data)
+
+
+# Общая таблица кнопок главного меню
+text_commands = TextCommandRouter(name="text_commands")
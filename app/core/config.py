@@ -12,26 +12,106 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite+aiosqlite:///./family_habits.db"
     database_url_sync: str = "sqlite:///./family_habits.db"
+    database_replica_urls: str = ""  # Реплики для read_only-методов через запятую (пусто - всё на writer)
+    database_shard_urls: str = ""  # Дополнительные шарды семей через запятую; шард 0 - database_url
+    database_pool_size: int = 10  # Соединений на каждую БД (writer, реплика, шард); SQLite - одно общее
+    database_max_overflow: int = 20
     
     # Telegram Bot
     telegram_bot_token: str = "demo_token_for_testing"
     webapp_url: str = "https://example.com"
+    telegram_api_server: str = ""  # Свой Bot API сервер, например http://localhost:8081
     
     # FastAPI
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     api_workers: int = 1
+    leader_lock_file: str = "/tmp/family_habits_leader.lock"  # Лидер воркеров: scheduler, setWebhook
+    leader_retry_seconds: float = 5.0
     
     # Security
     secret_key: str = "demo-secret-key-change-in-production"
+    api_token_ttl: int = 3600
+    webapp_auth_max_age: int = 86400
     admin_user_ids: str = "123456789,987654321"
     
     # Logging
     log_level: str = "INFO"
     
+    # SQL profiling
+    sql_profile: bool = False
+    sql_profile_budget: int = 10
+    sql_profile_slow_ms: float = 50.0
+    
+    # Caches
+    user_cache_size: int = 10000
+    keyboard_cache_size: int = 1024
+    user_cache_ttl: int = 300
+    bootstrap_cache_ttl: int = 30
+    
     # Redis
     redis_url: str = "redis://localhost:6379/0"
     
+    # FSM storage (memory | redis); при api_workers > 1 нужен redis
+    fsm_storage: str = "memory"
+    
+    # Live events (memory | redis)
+    events_backend: str = "memory"
+    events_buffer_size: int = 100
+    events_ping_interval: float = 15.0
+    
+    # Media check-ins
+    media_cache_dir: str = "media_cache"
+    media_cache_max_mb: int = 500
+    media_thumb_size: int = 320
+    media_thumb_workers: int = 2
+    
+    # Reminders
+    reminders_enabled: bool = True
+    reminder_lead_minutes: int = 60
+    reminder_window: int = 1000
+    reminder_idle_seconds: float = 300.0
+    
+    # Ledger reconciliation: Child.points/coins против PointsLedger
+    ledger_reconcile_enabled: bool = True
+    ledger_reconcile_interval: float = 3600.0
+    ledger_reconcile_batch: int = 500  # Детей на одну транзакцию
+    ledger_reconcile_fix: bool = False  # Исправлять счётчики по журналу, иначе только отчёт
+    ledger_checkpoint_min_rows: int = 50  # Новых строк журнала для следующего checkpoint
+    ledger_checkpoint_lag_seconds: int = 300  # Свежие строки в checkpoint не попадают
+    
+    # Archive: старые checkins/points_ledger -> *_archive (чтение через *_all)
+    archive_enabled: bool = True
+    archive_after_days: int = 180
+    archive_batch: int = 1000  # Строк на одну транзакцию
+    archive_interval: float = 86400.0
+    archive_pause_seconds: float = 0.1
+    
+    # Monthly rollups (ledger_monthly): пересчёт закрытых месяцев
+    rollup_enabled: bool = True
+    rollup_batch: int = 500  # Детей на одну транзакцию
+    rollup_interval: float = 21600.0
+    rollup_refresh_months: int = 1  # Сколько последних закрытых месяцев пересчитывать
+    
+    # Update dedup (memory | redis)
+    dedup_backend: str = "memory"
+    dedup_ring_size: int = 10000
+    dedup_ttl: int = 3600
+    
+    # Anti-flood: группа=лимит/окно_в_секундах (группа задаётся флагом handler)
+    throttle_enabled: bool = True
+    throttle_rules: str = "default=20/60,start=3/30,points=5/30,review=10/60"
+    throttle_backend: str = "memory"  # memory | redis
+    
+    # Update processing
+    update_concurrency: int = 64  # Одновременно выполняемых handler
+    update_max_pending: int = 1000  # Принятых в работу апдейтов, дальше - ожидание
+    update_max_per_chat: int = 20  # Очередь одного чата, лишнее отбрасывается
+    
+    # Update recording for offline replay (app.bench.replay)
+    update_record_dir: str = ""  # Каталог для updates-*.jsonl.gz; пусто - запись выключена
+    update_record_salt: str = ""  # Соль анонимизации id; пусто - случайная на процесс
+    
     # Subscription
     sub_price_rub: int = 299
     
@@ -51,6 +131,18 @@ class Settings(BaseSettings):
         """Parse comma-separated admin IDs into list of integers."""
         return [int(x.strip()) for x in self.admin_user_ids.split(",") if x.strip()]
     
+    @property
+    def THROTTLE_RULES(self) -> dict[str, tuple[int, float]]:
+        """Parse "group=limit/window" rules into {group: (limit, window_seconds)}."""
+        rules = {}
+        for rule in self.throttle_rules.split(","):
+            if "=" not in rule:
+                continue
+            group, limit = rule.split("=", 1)
+            count, window = limit.split("/", 1)
+            rules[group.strip()] = (int(count), float(window))
+        return rules
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -0,0 +1,94 @@
+# Purpose: Duplicate update detection.
+# Context: Telegram повторяет webhook при таймаутах; повтор не должен выполняться дважды.
+# Requirements: O(1) проверка по update_id и id callback, кольцо фиксированного размера, опционально Redis.
+
+from typing import Hashable, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+REDIS_KEY_PREFIX = "fh:dedup:"
+
+
+def update_keys(update: dict) -> list[str]:
+    """Ключи дедупликации сырого update: update_id и id callback-запроса."""
+    keys = []
+    if update.get("update_id") is not None:
+        keys.append(f"update:{update['update_id']}")
+    callback = update.get("callback_query")
+    if callback and callback.get("id"):
+        keys.append(f"callback:{callback['id']}")
+    return keys
+
+
+class SeenRing:
+    """Последние N ключей: кольцевой буфер для вытеснения и set для поиска."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._slots: list[Optional[Hashable]] = [None] * size
+        self._index = 0
+        self._seen: set[Hashable] = set()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def add(self, key: Hashable) -> bool:
+        """Запомнить ключ; False, если он уже был."""
+        if key in self._seen:
+            return False
+        evicted = self._slots[self._index]
+        if evicted is not None:
+            self._seen.discard(evicted)
+        self._slots[self._index] = key
+        self._seen.add(key)
+        self._index = (self._index + 1) % self.size
+        return True
+
+
+class UpdateDeduplicator:
+    """Локальное кольцо + общий Redis (SET NX EX) для нескольких реплик."""
+
+    def __init__(self, ring_size: int = 10_000, ttl: int = 3600):
+        self.ttl = ttl
+        self._ring = SeenRing(ring_size)
+        self._redis = None
+        self.duplicates = 0
+
+    def connect(self, redis_url: str) -> None:
+        """Подключить общий Redis-стор (без пакета redis остаётся локальное кольцо)."""
+        try:
+            from redis import asyncio as aioredis
+        except ImportError:
+            logger.warning("redis package is not installed, update dedup stays in-process")
+            return
+        self._redis = aioredis.from_url(redis_url)
+
+    async def first_seen(self, *keys: str) -> bool:
+        """True, если ни один ключ ещё не встречался; ключи запоминаются."""
+        if any(key in self._ring for key in keys):
+            self.duplicates += 1
+            return False
+        for key in keys:
+            self._ring.add(key)
+
+        if self._redis is not None:
+            try:
+                for key in keys:
+                    if not await self._redis.set(REDIS_KEY_PREFIX + key, 1, nx=True, ex=self.ttl):
+                        self.duplicates += 1
+                        return False
+            except Exception as e:
+                logger.warning(f"Redis dedup failed, using local ring only: {e}")
+        return True
+
+
+# Общий дедупликатор процесса
+update_dedup = UpdateDeduplicator(ring_size=settings.dedup_ring_size, ttl=settings.dedup_ttl)
+if settings.dedup_backend == "redis":
+    update_dedup.connect(settings.redis_url)
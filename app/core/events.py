@@ -0,0 +1,136 @@
+# Purpose: In-process pub/sub hub for live updates.
+# Context: События заданий и балансов для WebApp (SSE), каналы по семьям.
+# Requirements: Ограниченные буферы подписчиков, опциональный Redis backplane.
+
+import asyncio
+from typing import Any, Callable, Optional
+
+import orjson
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+REDIS_CHANNEL_PREFIX = "fh:events:"
+
+
+def family_channel(family_id: int) -> str:
+    """Имя канала семьи."""
+    return f"family:{family_id}"
+
+
+class Subscription:
+    """Подписка на канал с ограниченным буфером (старые события вытесняются)."""
+
+    def __init__(self, hub: "EventHub", channel: str, maxsize: int):
+        self.hub = hub
+        self.channel = channel
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, message: bytes) -> None:
+        if self.queue.full():
+            # Медленный клиент не должен копить память - выбрасываем старое
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Следующее событие или None по таймауту."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventHub:
+    """Fan-out событий подписчикам процесса; через Redis - между репликами."""
+
+    def __init__(self, buffer_size: int = 100):
+        self.buffer_size = buffer_size
+        self._subscriptions: dict[str, set[Subscription]] = {}
+        self._listeners: list[Callable[[str, dict], Any]] = []
+        self._redis = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(self, channel, self.buffer_size)
+        self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscriptions.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscriptions[subscription.channel]
+
+    def add_listener(self, callback: Callable[[str, dict], Any]) -> None:
+        """Синхронный обработчик всех событий (например, сброс кэшей)."""
+        self._listeners.append(callback)
+
+    async def publish(self, channel: str, event_type: str, **data: Any) -> None:
+        """Опубликовать событие в канал."""
+        message = orjson.dumps({"type": event_type, **data})
+        if self._redis is not None:
+            try:
+                await self._redis.publish(REDIS_CHANNEL_PREFIX + channel, message)
+                return
+            except Exception as e:
+                logger.warning(f"Redis publish failed, delivering locally: {e}")
+        self._dispatch(channel, message)
+
+    def _dispatch(self, channel: str, message: bytes) -> None:
+        for subscription in self._subscriptions.get(channel, ()):
+            subscription.put(message)
+
+        if self._listeners:
+            event = orjson.loads(message)
+            for callback in self._listeners:
+                try:
+                    callback(channel, event)
+                except Exception as e:
+                    logger.warning(f"Event listener failed: {e}")
+
+    async def start_backplane(self, redis_url: str) -> None:
+        """Подключить Redis pub/sub для доставки между репликами."""
+        try:
+            from redis import asyncio as aioredis
+        except ImportError:
+            logger.warning("redis package is not installed, events stay in-process")
+            return
+
+        self._redis = aioredis.from_url(redis_url)
+        pubsub = self._redis.pubsub()
+        await pubsub.psubscribe(REDIS_CHANNEL_PREFIX + "*")
+        self._reader_task = asyncio.create_task(self._read_backplane(pubsub))
+        logger.info("Event hub Redis backplane started")
+
+    async def _read_backplane(self, pubsub) -> None:
+        async for item in pubsub.listen():
+            if item["type"] != "pmessage":
+                continue
+            channel = item["channel"].decode()[len(REDIS_CHANNEL_PREFIX):]
+            self._dispatch(channel, item["data"])
+
+    async def stop_backplane(self) -> None:
+        if self._reader_task:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+# Общий хаб процесса
+event_hub = EventHub(buffer_size=settings.events_buffer_size)
@@ -0,0 +1,25 @@
+# Purpose: Lazy package exports (PEP 562).
+# Context: Пакеты отдают имена как раньше, но модули грузятся при первом обращении.
+# Requirements: Холодный старт не платит за модули, не нужные первому запросу.
+
+import importlib
+from typing import Any, Callable
+
+
+def lazy_exports(package: str, exports: dict[str, str]) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Вернуть __getattr__ и __dir__ для пакета: имя -> ".модуль" или ".модуль:атрибут"."""
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module, _, attr = module.partition(":")
+        value = getattr(importlib.import_module(module, package), attr or name)
+        namespace[name] = value  # Следующие обращения идут мимо __getattr__
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
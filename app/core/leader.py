@@ -0,0 +1,65 @@
+# Purpose: Leader election between worker processes.
+# Context: Несколько uvicorn-воркеров, но планировщик и setWebhook нужны в одном.
+# Requirements: Без внешних сервисов, лидерство освобождается при смерти процесса.
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from app.core.logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: воркер всегда один
+    fcntl = None
+
+logger = get_logger(__name__)
+
+
+class LeaderLock:
+    """Эксклюзивный flock на файле; ОС снимает его вместе с процессом."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Стать лидером, если лидера нет (не блокирует)."""
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        if self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+    async def run_when_leader(self, on_elected: Callable[[], Awaitable[None]], retry: float = 5.0) -> None:
+        """Ждать лидерства (резервный воркер подхватывает упавшего) и один раз вызвать on_elected."""
+        while not self.try_acquire():
+            await asyncio.sleep(retry)
+        logger.info(f"Process {os.getpid()} is the leader")
+        await on_elected()
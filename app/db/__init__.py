@@ -4,7 +4,8 @@ from .models import *
 from .session import get_session, SessionLocal
 
 __all__ = [
-    "Base", "Family", "Parent", "Child", "Task", "CheckIn", "PointsLedger", 
+    "Base", "Family", "Parent", "Child", "Task", "CheckIn", "PointsLedger", "BalanceCheckpoint", "LedgerMonthly",
     "ShopItem", "Purchase", "TaskType", "TaskStatus", "Plan",
+    "FamilyShard", "UserShard", "CheckInArchive", "PointsLedgerArchive", "checkins_all", "points_ledger_all",
     "get_session", "SessionLocal"
 ]
\ No newline at end of file
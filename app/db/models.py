@@ -1,10 +1,13 @@
 # Purpose: Database models for Family Habit domain.
 # Context: SQLAlchemy models with relationships and enums.
-# Requirements: Family, Parent, Child, Task, CheckIn, PointsLedger, Shop.
+# Requirements: Family, Parent, Child, Task, CheckIn, PointsLedger, BalanceCheckpoint, LedgerMonthly, Shop, шарды, архив.
 
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, ForeignKey, DateTime, Enum, Boolean, Text, func
-from datetime import datetime
+from sqlalchemy import (
+    String, Integer, ForeignKey, Date, DateTime, Enum, Boolean, Text, Index, func,
+    Column, DDL, MetaData, Table, event
+)
+from datetime import date, datetime
 import enum
 
 
@@ -27,6 +30,7 @@ class TaskStatus(str, enum.Enum):
     done = "done"
     approved = "approved"
     rejected = "rejected"
+    expired = "expired"
 
 
 class Plan(str, enum.Enum):
@@ -100,10 +104,16 @@ class Task(Base):
     points: Mapped[int] = mapped_column(Integer, default=5)
     coins: Mapped[int] = mapped_column(Integer, default=0)
     due_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    reminded_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     status: Mapped[TaskStatus] = mapped_column(Enum(TaskStatus), default=TaskStatus.new, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
     
+    # Диапазонные запросы планировщика: открытые задания по сроку
+    __table_args__ = (
+        Index("ix_tasks_status_due_at", "status", "due_at"),
+    )
+    
     # Relationships
     parent: Mapped["Parent"] = relationship("Parent", back_populates="tasks")
     child: Mapped["Child"] = relationship("Child", back_populates="tasks")
@@ -119,7 +129,8 @@ class CheckIn(Base):
     child_id: Mapped[int] = mapped_column(ForeignKey("children.id", ondelete="CASCADE"), index=True)
     note: Mapped[str | None] = mapped_column(String(280), nullable=True)
     media_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    media_thumb_id: Mapped[str | None] = mapped_column(String(128), nullable=True)  # Превью видео от Telegram
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), index=True)  # Архивация по возрасту
     
     # Relationships
     task: Mapped["Task"] = relationship("Task", back_populates="checkins")
@@ -136,12 +147,48 @@ class PointsLedger(Base):
     delta_coins: Mapped[int] = mapped_column(Integer, default=0)
     reason: Mapped[str] = mapped_column(String(120))
     ref_id: Mapped[int | None] = mapped_column(Integer, nullable=True)  # task_id, purchase_id, etc.
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    # Граница сверки, архивация и итоги месяца - диапазоны по created_at
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), index=True)
     
     # Relationships
     child: Mapped["Child"] = relationship("Child", back_populates="ledger_entries")
 
 
+class BalanceCheckpoint(Base):
+    """Баланс ребёнка по журналу на момент строки ledger_id (включительно)."""
+    __tablename__ = "balance_checkpoints"
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    child_id: Mapped[int] = mapped_column(ForeignKey("children.id", ondelete="CASCADE"))
+    ledger_id: Mapped[int] = mapped_column(Integer)
+    points: Mapped[int] = mapped_column(Integer)
+    coins: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    
+    # Последний checkpoint ребёнка - max(ledger_id) по индексу
+    __table_args__ = (
+        Index("ix_balance_checkpoints_child_ledger", "child_id", "ledger_id", unique=True),
+    )
+
+
+class LedgerMonthly(Base):
+    """Итоги журнала ребёнка за месяц: долгие периоды читаются отсюда, а не из журнала."""
+    __tablename__ = "ledger_monthly"
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    child_id: Mapped[int] = mapped_column(ForeignKey("children.id", ondelete="CASCADE"))
+    month: Mapped[date] = mapped_column(Date)  # Первое число месяца (UTC)
+    points: Mapped[int] = mapped_column(Integer, default=0)
+    coins_earned: Mapped[int] = mapped_column(Integer, default=0)
+    coins_spent: Mapped[int] = mapped_column(Integer, default=0)
+    tasks: Mapped[int] = mapped_column(Integer, default=0)
+    purchases: Mapped[int] = mapped_column(Integer, default=0)
+    
+    __table_args__ = (
+        Index("ix_ledger_monthly_child_month", "child_id", "month", unique=True),
+    )
+
+
 class ShopItem(Base):
     """Товар в магазине."""
     __tablename__ = "shop_items"
@@ -171,4 +218,91 @@ class Purchase(Base):
     
     # Relationships
     child: Mapped["Child"] = relationship("Child", back_populates="purchases")
-    item: Mapped["ShopItem"] = relationship("ShopItem", back_populates="purchases")
\ No newline at end of file
+    item: Mapped["ShopItem"] = relationship("ShopItem", back_populates="purchases")
+
+
+# Справочник шардов: живёт в основной БД (DATABASE_URL), нужен только при DATABASE_SHARD_URLS
+
+class FamilyShard(Base):
+    """Семья -> шард; заодно глобальный генератор id семей (id не пересекаются между шардами)."""
+    __tablename__ = "family_shards"
+    
+    family_id: Mapped[int] = mapped_column(primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+
+class UserShard(Base):
+    """Telegram ID родителя -> семья и шард (для DatabaseMiddleware и API)."""
+    __tablename__ = "user_shards"
+    
+    tg_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    family_id: Mapped[int] = mapped_column(Integer)
+    shard: Mapped[int] = mapped_column(Integer)
+
+
+# Архив: старые строки checkins/points_ledger переносятся сюда (app.services.archive_service).
+# Без внешних ключей; на PostgreSQL - таблицы с помесячными партициями по created_at.
+
+class CheckInArchive(Base):
+    """Архивный чекин (та же структура, что у CheckIn)."""
+    __tablename__ = "checkins_archive"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    task_id: Mapped[int] = mapped_column(Integer)
+    child_id: Mapped[int] = mapped_column(Integer)
+    note: Mapped[str | None] = mapped_column(String(280), nullable=True)
+    media_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    media_thumb_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_checkins_archive_child_id", "child_id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+class PointsLedgerArchive(Base):
+    """Архивная запись журнала (та же структура, что у PointsLedger)."""
+    __tablename__ = "points_ledger_archive"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    child_id: Mapped[int] = mapped_column(Integer)
+    delta_points: Mapped[int] = mapped_column(Integer)
+    delta_coins: Mapped[int] = mapped_column(Integer)
+    reason: Mapped[str] = mapped_column(String(120))
+    ref_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_points_ledger_archive_child_id", "child_id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+# Представления «горячая + архив» для выгрузки и статистики (вне Base.metadata - create_all их не трогает).
+# Хуки ниже - для create_all (бенчмарки); в рабочих БД представления и партиции создаёт миграция 0005.
+views_metadata = MetaData()
+
+
+def _union_view(name: str, hot: Table, cold: Table) -> Table:
+    columns = ", ".join(column.name for column in hot.columns)
+    select_sql = f"SELECT {columns} FROM {hot.name} UNION ALL SELECT {columns} FROM {cold.name}"
+    event.listen(Base.metadata, "after_create", DDL(
+        f"CREATE VIEW IF NOT EXISTS {name} AS {select_sql}"
+    ).execute_if(dialect="sqlite"))
+    event.listen(Base.metadata, "after_create", DDL(
+        f"CREATE OR REPLACE VIEW {name} AS {select_sql}"
+    ).execute_if(dialect="postgresql"))
+    event.listen(Base.metadata, "before_drop", DDL(f"DROP VIEW IF EXISTS {name}"))
+    return Table(name, views_metadata, *(Column(column.name, column.type) for column in hot.columns))
+
+
+# Партиция по умолчанию: вставка не падает, даже если помесячная ещё не создана
+for _archive in (CheckInArchive.__table__, PointsLedgerArchive.__table__):
+    event.listen(_archive, "after_create", DDL(
+        f"CREATE TABLE IF NOT EXISTS {_archive.name}_default PARTITION OF {_archive.name} DEFAULT"
+    ).execute_if(dialect="postgresql"))
+
+checkins_all = _union_view("checkins_all", CheckIn.__table__, CheckInArchive.__table__)
+points_ledger_all = _union_view("points_ledger_all", PointsLedger.__table__, PointsLedgerArchive.__table__)
@@ -0,0 +1,100 @@
+# Purpose: Per-update SQL query profiler.
+# Context: Подсчёт запросов через SQLAlchemy before_cursor_execute.
+# Requirements: Бюджет запросов на update, поиск N+1, медленные запросы.
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class QueryRecord:
+    """Один выполненный SQL-запрос."""
+    statement: str
+    duration_ms: float
+
+
+@dataclass
+class QueryStats:
+    """Статистика запросов в рамках одного update/блока."""
+    label: str = ""
+    queries: list[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(q.duration_ms for q in self.queries)
+
+    def duplicates(self, min_repeats: int = 2) -> dict[str, int]:
+        """Повторяющиеся одинаковые запросы (признак N+1)."""
+        counter = Counter(q.statement for q in self.queries)
+        return {stmt: n for stmt, n in counter.items() if n >= min_repeats}
+
+    def slowest(self, limit: int = 3) -> list[QueryRecord]:
+        """Самые медленные запросы."""
+        return sorted(self.queries, key=lambda q: q.duration_ms, reverse=True)[:limit]
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Превышен бюджет SQL-запросов."""
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+_installed_engines: set[int] = set()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    started = starts.pop() if starts else time.perf_counter()
+    duration_ms = (time.perf_counter() - started) * 1000
+    stats.queries.append(QueryRecord(statement=" ".join(statement.split()), duration_ms=duration_ms))
+
+
+def install_query_profiler(engine) -> None:
+    """Подключить счётчик запросов к engine (sync или async)."""
+    sync_engine: Engine = getattr(engine, "sync_engine", engine)
+    if id(sync_engine) in _installed_engines:
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    _installed_engines.add(id(sync_engine))
+
+
+@contextmanager
+def profile_queries(label: str = "") -> Iterator[QueryStats]:
+    """Собрать все запросы, выполненные внутри блока."""
+    stats = QueryStats(label=label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = "") -> Iterator[QueryStats]:
+    """Проверить, что блок выполнил не больше limit запросов."""
+    with profile_queries(label) as stats:
+        yield stats
+    if stats.count > limit:
+        listing = "\n".join(f"  {q.statement}" for q in stats.queries)
+        raise QueryBudgetExceeded(
+            f"{label or 'block'} executed {stats.count} queries (limit {limit}):\n{listing}"
+        )
@@ -1,28 +1,135 @@
 # Purpose: Database session management.
-# Context: AsyncSession for async operations.
-# Requirements: Database connection, dependency injection.
+# Context: AsyncSession for async operations; чтение из read-only методов может идти на реплики.
+# Requirements: Database connection, dependency injection, writer/reader routing.
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import functools
+import itertools
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from sqlalchemy import Select, event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
 from app.core.config import settings
 
-# Создаём async engine
-engine = create_async_engine(
-    settings.database_url,
-    poolclass=StaticPool,
-    echo=settings.log_level == "DEBUG"
-)
+T = TypeVar("T")
+
+_engine: Optional[AsyncEngine] = None
+_reader_engines: Optional[list[AsyncEngine]] = None
+_reader_cycle: Optional[Iterator] = None
+_read_only: ContextVar[bool] = ContextVar("db_read_only", default=False)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    echo = settings.log_level == "DEBUG"
+    if url.startswith("sqlite"):
+        # Одно соединение на процесс: иначе база :memory: у каждого соединения своя
+        return create_async_engine(url, poolclass=StaticPool, echo=echo)
+    # PostgreSQL: на одном asyncpg-соединении параллельные сессии падают ("another operation is in progress")
+    return create_async_engine(
+        url,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_pre_ping=True,
+        echo=echo
+    )
+
+
+def get_engine() -> AsyncEngine:
+    """Async engine; создаётся при первой сессии, а не при импорте (драйвер БД не грузится на старте)."""
+    global _engine
+    if _engine is None:
+        _engine = _create_engine(settings.database_url)
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def get_reader_engines() -> list[AsyncEngine]:
+    """Engine реплик из DATABASE_REPLICA_URLS (пусто - реплик нет, всё читается с writer)."""
+    global _reader_engines, _reader_cycle
+    if _reader_engines is None:
+        urls = [url.strip() for url in settings.database_replica_urls.split(",") if url.strip()]
+        _reader_engines = [_create_engine(url) for url in urls]
+        _reader_cycle = itertools.cycle(_reader_engines)
+    return _reader_engines
+
+
+def read_only(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Метод сервиса только читает: его SELECT можно отправить на реплику."""
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        token = _read_only.set(True)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+    return wrapper
+
+
+class RoutingSession(Session):
+    """SELECT из read_only-методов - на реплику, всё остальное - на writer.
+
+    После первой записи сессия остаётся на writer до конца (read-your-writes в рамках update/запроса).
+    """
+
+    _reader = None
+    _wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            _read_only.get()
+            and isinstance(clause, Select)
+            and not self._wrote
+            and not self.info.get("shard")  # Реплики настроены только для основной БД (шард 0)
+            and get_reader_engines()
+        ):
+            if self._reader is None:
+                # Одна реплика на всю сессию: чтения внутри неё согласованы между собой
+                self._reader = next(_reader_cycle).sync_engine
+            return self._reader
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+# autoflush выполняется до выбора bind, поэтому незаписанные изменения тоже переводят сессию на writer
+@event.listens_for(RoutingSession, "after_flush")
+def _stick_to_writer(session: RoutingSession, flush_context) -> None:
+    session._wrote = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _stick_to_writer_dml(orm_execute_state) -> None:
+    # session.execute(insert/update/delete) минует flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session._wrote = True
+
+
+class _LazySessionMaker(async_sessionmaker):
+    """Фабрика сессий, которая привязывается к engine при первом вызове."""
+
+    def __call__(self, **local_kw: Any) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
 
 # Session factory
-SessionLocal = async_sessionmaker(
-    engine,
+SessionLocal = _LazySessionMaker(
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False
 )
 
 
+def __getattr__(name: str) -> Any:
+    # Совместимость: `from app.db.session import engine`
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 async def get_session() -> AsyncSession:
     """Dependency для получения database session."""
     async with SessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
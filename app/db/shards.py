@@ -0,0 +1,191 @@
+# Purpose: Family-based database sharding.
+# Context: Все таблицы висят на families.id - семья целиком живёт на одном шарде.
+# Requirements: family_id/tg_id -> шард через справочник в основной БД, сессии по шардам, fan-out для админ-статистики.
+
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.models import Child, Family, FamilyShard, Parent, UserShard
+from app.db.session import RoutingSession, SessionLocal, _create_engine, get_engine
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class ShardRouter:
+    """Шард 0 - DATABASE_URL (там же справочник), шарды 1..N - DATABASE_SHARD_URLS.
+
+    Без DATABASE_SHARD_URLS шард один и роутер ничего не делает (ни запросов, ни записей в справочник).
+    """
+
+    def __init__(self, shard_urls: str):
+        self.urls = [url.strip() for url in shard_urls.split(",") if url.strip()]
+        self._engines: dict[int, AsyncEngine] = {}
+        self._sessionmakers: dict[int, async_sessionmaker] = {0: SessionLocal}
+        # Семья не переезжает между шардами - кэш без истечения, только LRU
+        self._families: TTLCache[int, int] = TTLCache(maxsize=settings.user_cache_size, ttl=float("inf"))
+        self._users: TTLCache[int, int] = TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+
+    @property
+    def count(self) -> int:
+        return len(self.urls) + 1
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.urls)
+
+    def engine(self, shard: int) -> AsyncEngine:
+        if shard == 0:
+            return get_engine()
+        if shard not in self._engines:
+            self._engines[shard] = _create_engine(self.urls[shard - 1])
+        return self._engines[shard]
+
+    def sessionmaker(self, shard: int) -> async_sessionmaker:
+        """Фабрика сессий шарда (шард 0 - обычный SessionLocal)."""
+        if shard not in self._sessionmakers:
+            self._sessionmakers[shard] = async_sessionmaker(
+                bind=self.engine(shard),
+                class_=AsyncSession,
+                sync_session_class=RoutingSession,
+                expire_on_commit=False,
+                info={"shard": shard}
+            )
+        return self._sessionmakers[shard]
+
+    def sessionmakers(self) -> list[async_sessionmaker]:
+        """Фабрики всех шардов: фоновые задачи запускаются по одной на шард."""
+        return [self.sessionmaker(shard) for shard in range(self.count)]
+
+    @staticmethod
+    def shard_of(session: AsyncSession) -> int:
+        return session.info.get("shard", 0)
+
+    def placement(self, tg_id: int) -> int:
+        """Шард для новой семьи; детерминирован по tg_id, поэтому справочник - не единственный источник."""
+        return tg_id % self.count
+
+    async def shard_for_user(self, tg_id: int) -> int:
+        """Шард пользователя: справочник (с кэшем), для новых - placement."""
+        if not self.enabled:
+            return 0
+        shard = self._users.get(tg_id)
+        if shard is None:
+            async with SessionLocal() as session:
+                shard = await session.scalar(select(UserShard.shard).where(UserShard.tg_id == tg_id))
+            if shard is None:
+                return self.placement(tg_id)
+            self._users.set(tg_id, shard)
+        return shard
+
+    async def shard_for_family(self, family_id: int) -> int:
+        if not self.enabled:
+            return 0
+        shard = self._families.get(family_id)
+        if shard is None:
+            async with SessionLocal() as session:
+                shard = await session.scalar(select(FamilyShard.shard).where(FamilyShard.family_id == family_id))
+            if shard is None:
+                raise LookupError(f"Family {family_id} is not in the shard directory")
+            self._families.set(family_id, shard)
+        return shard
+
+    @asynccontextmanager
+    async def session_for_user(self, tg_id: int) -> AsyncIterator[AsyncSession]:
+        async with self.sessionmaker(await self.shard_for_user(tg_id))() as session:
+            yield session
+
+    @asynccontextmanager
+    async def session_for_family(self, family_id: int) -> AsyncIterator[AsyncSession]:
+        async with self.sessionmaker(await self.shard_for_family(family_id))() as session:
+            yield session
+
+    async def allocate_family_id(self, shard: int) -> Optional[int]:
+        """Глобальный id новой семьи на шарде; None - шардинг выключен (id выдаёт сама таблица)."""
+        if not self.enabled:
+            return None
+        async with SessionLocal() as session:
+            entry = FamilyShard(shard=shard)
+            session.add(entry)
+            await session.commit()
+        self._families.set(entry.family_id, shard)
+        return entry.family_id
+
+    async def register_user(self, tg_id: int, family_id: int, shard: int) -> None:
+        """Запомнить шард пользователя (после создания семьи или привязки Telegram ребёнка)."""
+        if not self.enabled:
+            return
+        async with SessionLocal() as session:
+            await session.merge(UserShard(tg_id=tg_id, family_id=family_id, shard=shard))
+            await session.commit()
+        self._users.set(tg_id, shard)
+
+    async def fan_out(self, fn: Callable[[AsyncSession], Awaitable[T]]) -> list[T]:
+        """Выполнить fn на каждом шарде параллельно (своя сессия на шард)."""
+        async def run(shard: int) -> T:
+            async with self.sessionmaker(shard)() as session:
+                return await fn(session)
+        return list(await asyncio.gather(*(run(shard) for shard in range(self.count))))
+
+    async def rebuild_directory(self) -> int:
+        """Заполнить справочник по уже существующим семьям всех шардов (перед включением шардинга)."""
+        async def collect(session: AsyncSession) -> tuple[list[int], list]:
+            family_ids = (await session.scalars(select(Family.id))).all()
+            # Дети с Telegram тоже в справочнике: иначе placement(tg_id) отправит их не на шард семьи
+            users = (await session.execute(
+                select(Parent.tg_id, Parent.family_id)
+                .union_all(select(Child.tg_id, Child.family_id).where(Child.tg_id.is_not(None)))
+            )).all()
+            return list(family_ids), list(users)
+
+        per_shard = await self.fan_out(collect)
+        async with SessionLocal() as session:
+            for shard, (family_ids, users) in enumerate(per_shard):
+                for family_id in family_ids:
+                    await session.merge(FamilyShard(family_id=family_id, shard=shard))
+                for tg_id, family_id in users:
+                    await session.merge(UserShard(tg_id=tg_id, family_id=family_id, shard=shard))
+            if session.get_bind().dialect.name == "postgresql":
+                # id вставлены явно - двигаем последовательность за максимум
+                await session.execute(text(
+                    "SELECT setval(pg_get_serial_sequence('family_shards', 'family_id'), "
+                    "(SELECT COALESCE(MAX(family_id), 1) FROM family_shards))"
+                ))
+            await session.commit()
+            total = await session.scalar(select(func.count(UserShard.tg_id)))
+        logger.info(f"Shard directory rebuilt: {total} users across {self.count} shards")
+        return total
+
+    async def dispose(self) -> None:
+        for engine in self._engines.values():
+            await engine.dispose()
+
+
+shard_router = ShardRouter(settings.database_shard_urls)
+
+
+async def _main(command: str) -> None:
+    if command == "rebuild":
+        await shard_router.rebuild_directory()
+    await shard_router.dispose()
+    await get_engine().dispose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Family shard directory")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: заполнить справочник по данным шардов")
+    args = parser.parse_args(argv)
+    asyncio.run(_main(args.command))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
 # Purpose: Services module.
+# Context: Модули сервисов загружаются при первом обращении (быстрый холодный старт).
 
-from .parent_service import ParentService
-from .task_service import TaskService
+from app.core.lazy import lazy_exports
 
-__all__ = ["ParentService", "TaskService"]
\ No newline at end of file
+_EXPORTS = {
+    "ArchiveService": ".archive_service",
+    "FamilyService": ".family_service",
+    "LedgerService": ".ledger_service",
+    "ParentService": ".parent_service",
+    "ShopService": ".shop_service",
+    "StatsService": ".stats_service",
+    "TaskService": ".task_service",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
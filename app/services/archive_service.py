@@ -0,0 +1,166 @@
+# Purpose: Hot/cold archival of check-ins and ledger rows.
+# Context: checkins и points_ledger растут каждый день; старые строки уезжают в *_archive.
+# Requirements: Небольшие пачки в отдельных транзакциях, помесячные партиции на PostgreSQL, чтение через *_all.
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select, delete, insert, exists, and_, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import (
+    CheckIn, PointsLedger, BalanceCheckpoint, Task, TaskStatus, CheckInArchive, PointsLedgerArchive
+)
+from app.db.session import SessionLocal
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ArchiveReport:
+    """Сколько строк перенесено за проход."""
+    checkins: int = 0
+    ledger: int = 0
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value: datetime) -> datetime:
+    return (_month_start(value) + timedelta(days=32)).replace(day=1)
+
+
+class ArchiveService:
+    """Перенос старых строк из горячих таблиц в архивные."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._partitions: set[str] = set()
+
+    async def _ensure_partitions(self, table: str, months: set[datetime]) -> None:
+        """PostgreSQL: помесячные партиции архива под переносимые строки."""
+        if self.session.get_bind().dialect.name != "postgresql":
+            return
+        for month in sorted(months):
+            name = f"{table}_{month:%Y_%m}"
+            if name in self._partitions:
+                continue
+            await self.session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_next_month(month):%Y-%m-%d}')"
+            ))
+            self._partitions.add(name)
+
+    async def _move(self, hot, cold, condition, limit: int) -> int:
+        """Одна пачка: INSERT ... SELECT в архив и DELETE из горячей таблицы, одна транзакция."""
+        # Последняя строка остаётся в горячей таблице: SQLite без AUTOINCREMENT выдаёт max(id) + 1,
+        # и id в пустой таблице пошли бы заново (checkpoint и курсоры по id сломались бы)
+        newest = select(func.max(hot.id)).scalar_subquery()
+        rows = (await self.session.execute(
+            select(hot.id, hot.created_at).where(condition, hot.id < newest).order_by(hot.id).limit(limit)
+        )).all()
+        if not rows:
+            return 0
+
+        ids = [row.id for row in rows]
+        await self._ensure_partitions(cold.__tablename__, {_month_start(row.created_at) for row in rows})
+        columns = [column.name for column in hot.__table__.columns]
+        await self.session.execute(
+            insert(cold).from_select(columns, select(*hot.__table__.columns).where(hot.id.in_(ids)))
+        )
+        await self.session.execute(
+            delete(hot).where(hot.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return len(ids)
+
+    async def archive_ledger_batch(self, cutoff: datetime, limit: int) -> int:
+        """Строки журнала старше cutoff, уже покрытые checkpoint (баланс по журналу не меняется)."""
+        covered = exists().where(
+            BalanceCheckpoint.child_id == PointsLedger.child_id,
+            BalanceCheckpoint.ledger_id >= PointsLedger.id
+        )
+        return await self._move(
+            PointsLedger, PointsLedgerArchive,
+            and_(PointsLedger.created_at < cutoff, covered),
+            limit
+        )
+
+    async def archive_checkins_batch(self, cutoff: datetime, limit: int) -> int:
+        """Чекины старше cutoff, кроме заданий, которые ещё ждут проверки."""
+        pending = exists().where(Task.id == CheckIn.task_id, Task.status == TaskStatus.done)
+        return await self._move(
+            CheckIn, CheckInArchive,
+            and_(CheckIn.created_at < cutoff, ~pending),
+            limit
+        )
+
+
+class ArchiveJob:
+    """Периодический перенос: пачками до опустошения, с паузой между пачками."""
+
+    def __init__(
+        self,
+        after_days: Optional[int] = None,
+        batch: Optional[int] = None,
+        interval: Optional[float] = None,
+        session_factory=SessionLocal
+    ):
+        self.after = timedelta(days=after_days or settings.archive_after_days)
+        self.batch = batch or settings.archive_batch
+        self.interval = interval or settings.archive_interval
+        self.session_factory = session_factory
+        self._wakeup = asyncio.Event()
+        self._stopped = False
+
+    async def _drain(self, method: str, cutoff: datetime) -> int:
+        moved = 0
+        async with self.session_factory() as session:
+            service = ArchiveService(session)
+            while not self._stopped:
+                count = await getattr(service, method)(cutoff, self.batch)
+                moved += count
+                if count < self.batch:
+                    break
+                # Короткие транзакции и пауза - боту не приходится ждать блокировок
+                await asyncio.sleep(settings.archive_pause_seconds)
+        return moved
+
+    async def archive(self) -> ArchiveReport:
+        """Один проход по обеим таблицам."""
+        # Текущий месяц статистика читает из горячего журнала - его не архивируем
+        now = datetime.utcnow()
+        cutoff = min(now - self.after, datetime(now.year, now.month, 1))
+        report = ArchiveReport(
+            checkins=await self._drain("archive_checkins_batch", cutoff),
+            ledger=await self._drain("archive_ledger_batch", cutoff)
+        )
+        if report.checkins or report.ledger:
+            logger.info(f"Archived {report.checkins} check-ins and {report.ledger} ledger rows older than {cutoff:%Y-%m-%d}")
+        return report
+
+    async def run(self) -> None:
+        """Архивация раз в interval секунд."""
+        logger.info("Archive job started")
+        while not self._stopped:
+            try:
+                await self.archive()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Archive job error: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
@@ -0,0 +1,54 @@
+# Purpose: Family service layer for Family Habit Bot.
+# Context: Загрузка семьи вместе с родителями и детьми.
+# Requirements: Явные стратегии загрузки связей для AsyncSession.
+
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select
+
+from app.db.models import Family, Parent, Child
+from app.db.session import read_only
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+
+# Родители и дети грузятся отдельными SELECT ... IN, без декартова произведения
+FAMILY_MEMBERS_OPTIONS = (
+    selectinload(Family.parents),
+    selectinload(Family.children),
+)
+
+
+class FamilyService:
+    """Сервис для работы с семьями."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @read_only
+    async def get_family_with_members(self, family_id: int) -> Optional[Family]:
+        """Получить семью с родителями и детьми (3 запроса)."""
+        result = await self.session.execute(
+            select(Family)
+            .where(Family.id == family_id)
+            .options(*FAMILY_MEMBERS_OPTIONS)
+        )
+        return result.scalar_one_or_none()
+
+    @read_only
+    async def get_family_by_parent(self, parent_id: int) -> Optional[Family]:
+        """Получить семью родителя с участниками (3 запроса)."""
+        result = await self.session.execute(
+            select(Family)
+            .join(Parent, Parent.family_id == Family.id)
+            .where(Parent.id == parent_id)
+            .options(*FAMILY_MEMBERS_OPTIONS)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def active_children(family: Family) -> list[Child]:
+        """Активные дети уже загруженной семьи."""
+        return [child for child in family.children if child.is_active]
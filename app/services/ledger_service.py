@@ -0,0 +1,248 @@
+# Purpose: Ledger balances, checkpoints and reconciliation.
+# Context: Child.points/coins - денормализованные счётчики, PointsLedger - история начислений.
+# Requirements: Баланс = последний checkpoint + строки журнала после него; фоновая сверка пачками по детям.
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select, update, func, case, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Child, PointsLedger, BalanceCheckpoint, points_ledger_all
+from app.db.session import SessionLocal, read_only
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Drift:
+    """Расхождение счётчиков ребёнка с журналом: (points, coins)."""
+    child_id: int
+    stored: tuple[int, int]
+    expected: tuple[int, int]
+    fixed: bool = False
+
+
+@dataclass
+class ReconcileReport:
+    """Итог сверки."""
+    checked: int = 0
+    checkpoints: int = 0
+    drifts: list[Drift] = field(default_factory=list)
+
+    @property
+    def fixed(self) -> int:
+        return sum(drift.fixed for drift in self.drifts)
+
+
+class LedgerService:
+    """Балансы по журналу и сверка с Child.points/coins."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @read_only
+    async def get_balance(self, child_id: int) -> tuple[int, int]:
+        """Баланс (очки, монеты) по журналу: checkpoint + строки после него."""
+        checkpoint = (await self.session.execute(
+            select(BalanceCheckpoint.ledger_id, BalanceCheckpoint.points, BalanceCheckpoint.coins)
+            .where(BalanceCheckpoint.child_id == child_id)
+            .order_by(BalanceCheckpoint.ledger_id.desc())
+            .limit(1)
+        )).first()
+        after_id, points, coins = checkpoint or (0, 0, 0)
+
+        delta_points, delta_coins = (await self.session.execute(
+            select(
+                func.coalesce(func.sum(PointsLedger.delta_points), 0),
+                func.coalesce(func.sum(PointsLedger.delta_coins), 0)
+            ).where(PointsLedger.child_id == child_id, PointsLedger.id > after_id)
+        )).one()
+        return points + delta_points, coins + delta_coins
+
+    @read_only
+    async def get_history(self, child_id: int, limit: int = 100, before_id: Optional[int] = None) -> list:
+        """История начислений вместе с архивом (новые сверху, курсор по id)."""
+        query = select(points_ledger_all).where(points_ledger_all.c.child_id == child_id)
+        if before_id is not None:
+            query = query.where(points_ledger_all.c.id < before_id)
+        result = await self.session.execute(query.order_by(points_ledger_all.c.id.desc()).limit(limit))
+        return list(result.all())
+
+    async def settled_ledger_id(self, lag: timedelta) -> int:
+        """Граница журнала, старше которой новых строк уже не появится (для checkpoint)."""
+        settled = await self.session.scalar(
+            select(func.max(PointsLedger.id)).where(PointsLedger.created_at <= datetime.utcnow() - lag)
+        )
+        return settled or 0
+
+    async def reconcile_batch(
+        self,
+        after_child_id: int,
+        limit: int,
+        settled_id: int,
+        fix: bool = False,
+        checkpoint_min_rows: int = 1
+    ) -> tuple[ReconcileReport, Optional[int]]:
+        """Сверить следующую пачку детей; возвращает отчёт и id последнего ребёнка (None - конец)."""
+        child_ids = list((await self.session.scalars(
+            select(Child.id).where(Child.id > after_child_id).order_by(Child.id).limit(limit)
+        )).all())
+        report = ReconcileReport()
+        if not child_ids:
+            return report, None
+
+        latest = (
+            select(BalanceCheckpoint.child_id, func.max(BalanceCheckpoint.ledger_id).label("ledger_id"))
+            .where(BalanceCheckpoint.child_id.in_(child_ids))
+            .group_by(BalanceCheckpoint.child_id)
+            .subquery()
+        )
+        checkpoints = (
+            select(BalanceCheckpoint.child_id, BalanceCheckpoint.ledger_id, BalanceCheckpoint.points, BalanceCheckpoint.coins)
+            .join(latest, and_(
+                BalanceCheckpoint.child_id == latest.c.child_id,
+                BalanceCheckpoint.ledger_id == latest.c.ledger_id
+            ))
+            .cte("checkpoints")
+        )
+        # Только строки после checkpoint; «устоявшуюся» часть считаем отдельно для нового checkpoint
+        settled = PointsLedger.id <= settled_id
+        tail = (
+            select(
+                PointsLedger.child_id,
+                func.sum(PointsLedger.delta_points).label("points"),
+                func.sum(PointsLedger.delta_coins).label("coins"),
+                func.sum(case((settled, PointsLedger.delta_points), else_=0)).label("settled_points"),
+                func.sum(case((settled, PointsLedger.delta_coins), else_=0)).label("settled_coins"),
+                func.max(case((settled, PointsLedger.id))).label("settled_id"),
+                func.count(case((settled, PointsLedger.id))).label("settled_rows")
+            )
+            .outerjoin(checkpoints, checkpoints.c.child_id == PointsLedger.child_id)
+            .where(
+                PointsLedger.child_id.in_(child_ids),
+                PointsLedger.id > func.coalesce(checkpoints.c.ledger_id, 0)
+            )
+            .group_by(PointsLedger.child_id)
+            .subquery()
+        )
+        # Счётчики и журнал читаются одним запросом - один снимок данных
+        rows = (await self.session.execute(
+            select(
+                Child.id, Child.points, Child.coins,
+                func.coalesce(checkpoints.c.points, 0).label("base_points"),
+                func.coalesce(checkpoints.c.coins, 0).label("base_coins"),
+                func.coalesce(tail.c.points, 0).label("tail_points"),
+                func.coalesce(tail.c.coins, 0).label("tail_coins"),
+                func.coalesce(tail.c.settled_points, 0).label("settled_points"),
+                func.coalesce(tail.c.settled_coins, 0).label("settled_coins"),
+                tail.c.settled_id,
+                func.coalesce(tail.c.settled_rows, 0).label("settled_rows")
+            )
+            .outerjoin(checkpoints, checkpoints.c.child_id == Child.id)
+            .outerjoin(tail, tail.c.child_id == Child.id)
+            .where(Child.id.in_(child_ids))
+            .order_by(Child.id)
+        )).all()
+
+        for row in rows:
+            report.checked += 1
+            stored = (row.points, row.coins)
+            expected = (row.base_points + row.tail_points, row.base_coins + row.tail_coins)
+            if stored != expected:
+                report.drifts.append(Drift(row.id, stored, expected, fixed=fix and await self._fix(row.id, stored, expected)))
+
+            if row.settled_rows >= checkpoint_min_rows and row.settled_id is not None:
+                self.session.add(BalanceCheckpoint(
+                    child_id=row.id,
+                    ledger_id=row.settled_id,
+                    points=row.base_points + row.settled_points,
+                    coins=row.base_coins + row.settled_coins
+                ))
+                report.checkpoints += 1
+
+        await self.session.commit()
+        return report, child_ids[-1]
+
+    async def _fix(self, child_id: int, stored: tuple[int, int], expected: tuple[int, int]) -> bool:
+        """Выставить счётчики по журналу, если их не изменили после чтения."""
+        result = await self.session.execute(
+            update(Child)
+            .where(Child.id == child_id, Child.points == stored[0], Child.coins == stored[1])
+            .values(points=expected[0], coins=expected[1])
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+
+class LedgerReconciler:
+    """Периодическая сверка всех детей с журналом и запись checkpoint."""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        batch: Optional[int] = None,
+        fix: Optional[bool] = None,
+        session_factory=SessionLocal
+    ):
+        self.interval = interval or settings.ledger_reconcile_interval
+        self.batch = batch or settings.ledger_reconcile_batch
+        self.fix = settings.ledger_reconcile_fix if fix is None else fix
+        self.session_factory = session_factory
+        self._wakeup = asyncio.Event()
+        self._stopped = False
+
+    async def reconcile(self) -> ReconcileReport:
+        """Один полный проход по детям пачками (каждая пачка - своя транзакция)."""
+        total = ReconcileReport()
+        lag = timedelta(seconds=settings.ledger_checkpoint_lag_seconds)
+        after_id: Optional[int] = 0
+        settled_id = None
+        while after_id is not None:
+            async with self.session_factory() as session:
+                service = LedgerService(session)
+                if settled_id is None:
+                    settled_id = await service.settled_ledger_id(lag)
+                report, after_id = await service.reconcile_batch(
+                    after_id, self.batch, settled_id,
+                    fix=self.fix, checkpoint_min_rows=settings.ledger_checkpoint_min_rows
+                )
+            total.checked += report.checked
+            total.checkpoints += report.checkpoints
+            total.drifts += report.drifts
+
+        for drift in total.drifts:
+            logger.warning(
+                f"Balance drift for child {drift.child_id}: stored {drift.stored}, ledger {drift.expected}"
+                + (" (fixed)" if drift.fixed else "")
+            )
+        logger.info(
+            f"Ledger reconciled: {total.checked} children, {len(total.drifts)} drifted, "
+            f"{total.fixed} fixed, {total.checkpoints} checkpoints"
+        )
+        return total
+
+    async def run(self) -> None:
+        """Сверка раз в interval секунд."""
+        logger.info("Ledger reconciler started")
+        while not self._stopped:
+            try:
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ledger reconciler error: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
@@ -0,0 +1,169 @@
+# Purpose: Local cache for Telegram media of check-ins.
+# Context: Ленивая загрузка файлов через getFile, LRU на диске, превью в пуле процессов.
+# Requirements: Ограничение размера кэша, без повторных скачиваний, event loop не блокируется.
+
+import asyncio
+import hashlib
+import importlib.util
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+from app.core import get_logger
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+logger = get_logger(__name__)
+
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+_thumb_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_thumb_pool() -> ProcessPoolExecutor:
+    global _thumb_pool
+    if _thumb_pool is None:
+        _thumb_pool = ProcessPoolExecutor(max_workers=settings.media_thumb_workers)
+    return _thumb_pool
+
+
+def render_thumbnail(source: str, destination: str, size: int) -> None:
+    """Сделать JPEG-превью (выполняется в отдельном процессе)."""
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.thumbnail((size, size))
+        image.convert("RGB").save(destination, "JPEG", quality=80, optimize=True)
+
+
+class MediaCache:
+    """LRU-кэш оригиналов и превью на диске с лимитом по размеру."""
+
+    def __init__(
+        self,
+        bot: "Bot",
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        thumb_size: Optional[int] = None
+    ):
+        self.bot = bot
+        self.cache_dir = Path(cache_dir or settings.media_cache_dir)
+        self.max_bytes = max_bytes or settings.media_cache_max_mb * 1024 * 1024
+        self.thumb_size = thumb_size or settings.media_thumb_size
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries: OrderedDict[Path, int] = OrderedDict()
+        self._total = 0
+        self._inflight: dict[Path, asyncio.Future] = {}
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Восстановить LRU-порядок по mtime файлов после рестарта."""
+        files = sorted(
+            (entry for entry in os.scandir(self.cache_dir) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in files:
+            size = entry.stat().st_size
+            self._entries[Path(entry.path)] = size
+            self._total += size
+
+    def _path(self, file_id: str, suffix: str) -> Path:
+        digest = hashlib.sha1(file_id.encode()).hexdigest()
+        return self.cache_dir / f"{digest}{suffix}"
+
+    def _touch(self, path: Path) -> bool:
+        if path not in self._entries:
+            return False
+        if not path.exists():
+            self._total -= self._entries.pop(path)
+            return False
+        self._entries.move_to_end(path)
+        os.utime(path)
+        return True
+
+    def _add(self, path: Path) -> None:
+        size = path.stat().st_size
+        self._total += size - self._entries.get(path, 0)
+        self._entries[path] = size
+        self._entries.move_to_end(path)
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            path, size = self._entries.popitem(last=False)
+            self._total -= size
+            path.unlink(missing_ok=True)
+            logger.debug(f"Evicted {path.name} from media cache")
+
+    async def _once(self, path: Path, produce) -> Path:
+        """Один производитель на файл: параллельные запросы ждут его результата."""
+        if self._touch(path):
+            return path
+        pending = self._inflight.get(path)
+        if pending is not None:
+            return await pending
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[path] = future
+        try:
+            await produce(path)
+            self._add(path)
+            future.set_result(path)
+            return path
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Ожидающих может не быть - помечаем как полученное
+            raise
+        finally:
+            del self._inflight[path]
+
+    async def get_original(self, file_id: str) -> Path:
+        """Оригинал файла: из кэша или через getFile + download."""
+        async def download(path: Path) -> None:
+            telegram_file = await self.bot.get_file(file_id)
+            tmp_path = path.with_suffix(".part")
+            await self.bot.download_file(telegram_file.file_path, destination=tmp_path)
+            tmp_path.replace(path)
+
+        return await self._once(self._path(file_id, ".orig"), download)
+
+    async def get_thumbnail(self, file_id: str) -> Path:
+        """Превью для экрана проверки; оригинал не скачивается повторно."""
+        async def render(path: Path) -> None:
+            original = await self.get_original(file_id)
+            if not HAS_PILLOW:
+                # Без Pillow отдаём оригинал (Telegram-превью видео и так маленькие)
+                path.write_bytes(original.read_bytes())
+                return
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                _get_thumb_pool(), render_thumbnail, str(original), str(path), self.thumb_size
+            )
+
+        return await self._once(self._path(file_id, ".thumb.jpg"), render)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._total
+
+
+_media_cache: Optional[MediaCache] = None
+
+
+def get_media_cache() -> MediaCache:
+    """Общий кэш процесса (API) со своим экземпляром Bot."""
+    global _media_cache
+    if _media_cache is None:
+        from aiogram import Bot
+        from app.bot.main import create_bot_session
+        bot = Bot(token=settings.TELEGRAM_BOT_TOKEN, session=create_bot_session())
+        _media_cache = MediaCache(bot)
+    return _media_cache
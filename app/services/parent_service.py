@@ -7,6 +7,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.db.models import Parent, Child, Family, Plan
+from app.db.shards import shard_router
+from app.db.session import read_only
+from app.services.user_resolver import user_resolver
 from app.core import get_logger
 
 logger = get_logger(__name__)
@@ -27,8 +30,9 @@ class ParentService:
 
     async def create_parent(self, tg_id: int, name: Optional[str] = None) -> Parent:
         """Создать нового родителя с семьёй."""
-        # Создаём семью
-        family = Family(plan=Plan.FREE)
+        # Создаём семью (при шардинге id выдаёт справочник - id семей уникальны между шардами)
+        shard = shard_router.shard_of(self.session)
+        family = Family(id=await shard_router.allocate_family_id(shard), plan=Plan.FREE)
         self.session.add(family)
         await self.session.flush()  # Получаем ID семьи
 
@@ -41,21 +45,20 @@ class ParentService:
         self.session.add(parent)
         await self.session.commit()
         await self.session.refresh(parent)
+        await shard_router.register_user(tg_id, family.id, shard)
 
         logger.info(f"Created parent {parent.id} with family {family.id}")
         return parent
 
+    @read_only
     async def get_children(self, parent_id: int) -> List[Child]:
         """Получить всех детей родителя."""
-        # Сначала получаем родителя
-        parent = await self.session.get(Parent, parent_id)
-        if not parent:
-            return []
-
-        # Получаем детей из той же семьи
+        # Дети из семьи родителя одним запросом
         result = await self.session.execute(
-            select(Child).where(
-                Child.family_id == parent.family_id,
+            select(Child)
+            .join(Parent, Parent.family_id == Child.family_id)
+            .where(
+                Parent.id == parent_id,
                 Child.is_active == True
             )
         )
@@ -78,6 +81,38 @@ class ParentService:
         logger.info(f"Added child {child.id} to family {parent.family_id}")
         return child
 
+    async def link_child_telegram(self, child_id: int, tg_id: int) -> Child:
+        """Привязать Telegram ID к ребёнку."""
+        child = await self.session.get(Child, child_id)
+        if not child:
+            raise ValueError("Child not found")
+
+        child.tg_id = tg_id
+        await self.session.commit()
+        # Ребёнок должен попадать на шард семьи, а не на placement(tg_id)
+        await shard_router.register_user(tg_id, child.family_id, shard_router.shard_of(self.session))
+        user_resolver.invalidate(tg_id)
+
+        logger.info(f"Linked Telegram {tg_id} to child {child.id}")
+        return child
+
+    async def add_children_to_family(self, parent_id: int, children: List[tuple[str, Optional[str]]]) -> List[Child]:
+        """Добавить несколько детей (имя, аватар) одной транзакцией."""
+        parent = await self.session.get(Parent, parent_id)
+        if not parent:
+            raise ValueError("Parent not found")
+
+        added = [
+            Child(name=name, avatar=avatar, family_id=parent.family_id)
+            for name, avatar in children
+        ]
+        self.session.add_all(added)
+        await self.session.commit()
+
+        logger.info(f"Added {len(added)} children to family {parent.family_id}")
+        return added
+
+    @read_only
     async def get_family_stats(self, parent_id: int) -> dict:
         """Получить статистику семьи."""
         parent = await self.session.get(Parent, parent_id)
@@ -95,6 +130,10 @@ class ParentService:
             select(func.count(Task.id)).where(Task.parent_id == parent_id)
         )
 
+        # За год: ~12 строк ledger_monthly на ребёнка + журнал текущего месяца
+        from app.services.stats_service import StatsService
+        year = await StatsService(self.session).totals(child.id for child in children)
+
         total_points = sum(child.points for child in children)
         total_coins = sum(child.coins for child in children)
 
@@ -109,7 +148,8 @@ class ParentService:
                     "name": child.name,
                     "points": child.points,
                     "coins": child.coins,
-                    "has_telegram": child.tg_id is not None
+                    "has_telegram": child.tg_id is not None,
+                    "year": year[child.id]
                 }
                 for child in children
             ]
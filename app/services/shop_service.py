@@ -0,0 +1,81 @@
+# Purpose: Shop service layer for Family Habit Bot.
+# Context: Business logic для магазина наград.
+# Requirements: Каталог товаров, покупка за монеты с записью в журнал.
+
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.models import Child, ShopItem, Purchase, PointsLedger
+from app.db.session import read_only
+from app.core.events import event_hub, family_channel
+from app.services.stats_service import StatsService
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+
+class ShopService:
+    """Сервис для работы с магазином."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @read_only
+    async def get_items(self) -> List[ShopItem]:
+        """Получить активные товары магазина."""
+        result = await self.session.execute(
+            select(ShopItem)
+            .where(ShopItem.is_active == True)
+            .order_by(ShopItem.price_coins)
+        )
+        return list(result.scalars().all())
+
+    async def purchase(self, child_id: int, item_id: int) -> Purchase:
+        """Купить товар за монеты ребёнка."""
+        # Перечитываем с writer: в сессии может лежать версия с реплики (read_only-методы)
+        child = await self.session.get(Child, child_id, populate_existing=True)
+        if not child:
+            raise ValueError("Child not found")
+
+        item = await self.session.get(ShopItem, item_id, populate_existing=True)
+        if not item or not item.is_active:
+            raise ValueError("Item not found")
+
+        # Проверка и списание одним UPDATE: два одновременных нажатия не пройдут проверку оба
+        coins = await self.session.scalar(
+            update(Child)
+            .where(Child.id == child.id, Child.coins >= item.price_coins)
+            .values(coins=Child.coins - item.price_coins)
+            .returning(Child.coins)
+            .execution_options(synchronize_session=False)
+        )
+        if coins is None:
+            raise ValueError("Not enough coins")
+        set_committed_value(child, "coins", coins)
+
+        purchase = Purchase(
+            child_id=child.id,
+            item_id=item.id,
+            cost_coins=item.price_coins
+        )
+        self.session.add(purchase)
+        await self.session.flush()  # Получаем ID покупки
+
+        self.session.add(PointsLedger(
+            child_id=child.id,
+            delta_points=0,
+            delta_coins=-item.price_coins,
+            reason=f"Покупка: {item.title}",
+            ref_id=purchase.id
+        ))
+        await StatsService(self.session).record(child.id, coins=-item.price_coins, purchases=1)
+        await self.session.commit()
+
+        logger.info(f"Child {child.id} bought item {item.id} for {item.price_coins} coins")
+        await event_hub.publish(
+            family_channel(child.family_id), "balance_changed",
+            child_id=child.id, points=child.points, coins=child.coins, purchase_id=purchase.id
+        )
+        return purchase
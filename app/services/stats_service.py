@@ -0,0 +1,229 @@
+# Purpose: Monthly ledger rollups and long-range statistics.
+# Context: Год статистики - ~12 строк ledger_monthly + сырые строки журнала только за текущий месяц.
+# Requirements: Инкремент при одобрении/покупке, пересчёт закрытых месяцев пачками, чтение без скана журнала.
+
+import asyncio
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import LedgerMonthly, PointsLedger, points_ledger_all
+from app.db.session import SessionLocal, read_only
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+COUNTERS = ("points", "coins_earned", "coins_spent", "tasks", "purchases")
+
+
+def month_start(value: Optional[datetime] = None) -> date:
+    """Первое число месяца (по умолчанию - текущего, UTC)."""
+    value = value or datetime.utcnow()
+    return date(value.year, value.month, 1)
+
+
+def shift_month(month: date, delta: int) -> date:
+    index = month.year * 12 + month.month - 1 + delta
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _at(month: date) -> datetime:
+    # Сравнение с DateTime-колонками журнала
+    return datetime(month.year, month.month, 1)
+
+
+def _ledger_totals(source) -> list:
+    # В журнале два вида строк: одобрение задания (delta_coins >= 0) и покупка (delta_coins < 0)
+    return [
+        func.coalesce(func.sum(source.delta_points), 0).label("points"),
+        func.coalesce(func.sum(case((source.delta_coins > 0, source.delta_coins), else_=0)), 0).label("coins_earned"),
+        func.coalesce(func.sum(case((source.delta_coins < 0, -source.delta_coins), else_=0)), 0).label("coins_spent"),
+        func.count(case((source.delta_coins >= 0, 1))).label("tasks"),
+        func.count(case((source.delta_coins < 0, 1))).label("purchases"),
+    ]
+
+
+def _empty() -> dict[str, int]:
+    return dict.fromkeys(COUNTERS, 0)
+
+
+class StatsService:
+    """Месячные итоги журнала и статистика за длинные периоды."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _upsert(self, child_id: int, month: date, values: dict[str, int], increment: bool) -> None:
+        """Строка (child, month): прибавить значения или заменить их."""
+        dialect = self.session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(LedgerMonthly).values(child_id=child_id, month=month, **values)
+            table = LedgerMonthly.__table__
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["child_id", "month"],
+                set_={
+                    key: (table.c[key] + stmt.excluded[key]) if increment else stmt.excluded[key]
+                    for key in values
+                }
+            )
+            await self.session.execute(stmt)
+            return
+
+        row = await self.session.scalar(
+            select(LedgerMonthly).where(LedgerMonthly.child_id == child_id, LedgerMonthly.month == month)
+        )
+        if row is None:
+            self.session.add(LedgerMonthly(child_id=child_id, month=month, **{**_empty(), **values}))
+            return
+        for key, value in values.items():
+            setattr(row, key, getattr(row, key) + value if increment else value)
+
+    async def record(
+        self,
+        child_id: int,
+        points: int = 0,
+        coins: int = 0,
+        tasks: int = 0,
+        purchases: int = 0
+    ) -> None:
+        """Учесть запись журнала в итогах текущего месяца (в транзакции вызывающего)."""
+        await self._upsert(child_id, month_start(), {
+            "points": points,
+            "coins_earned": max(coins, 0),
+            "coins_spent": max(-coins, 0),
+            "tasks": tasks,
+            "purchases": purchases,
+        }, increment=True)
+
+    async def rebuild_month(self, month: date, batch: int) -> int:
+        """Пересчитать итоги месяца: журнал агрегируется один раз, запись - транзакциями по batch детей."""
+        source = points_ledger_all.c  # Старые месяцы уже могут быть в архиве
+        rows = (await self.session.execute(
+            select(source.child_id, *_ledger_totals(source))
+            .where(source.created_at >= _at(month), source.created_at < _at(shift_month(month, 1)))
+            .group_by(source.child_id)
+        )).all()
+        for start in range(0, len(rows), batch):
+            for row in rows[start:start + batch]:
+                await self._upsert(row.child_id, month, {key: getattr(row, key) for key in COUNTERS}, increment=False)
+            await self.session.commit()
+        return len(rows)
+
+    @read_only
+    async def monthly(self, child_ids: Iterable[int], months: int = 12) -> dict[int, dict[date, dict[str, int]]]:
+        """Итоги по месяцам за последние months месяцев (включая текущий)."""
+        child_ids = list(child_ids)
+        current = month_start()
+        result: dict[int, dict[date, dict[str, int]]] = {child_id: {} for child_id in child_ids}
+        if not child_ids:
+            return result
+
+        # Закрытые месяцы - из ledger_monthly
+        rollups = await self.session.scalars(
+            select(LedgerMonthly).where(
+                LedgerMonthly.child_id.in_(child_ids),
+                LedgerMonthly.month >= shift_month(current, 1 - months),
+                LedgerMonthly.month < current
+            )
+        )
+        for row in rollups:
+            result[row.child_id][row.month] = {key: getattr(row, key) for key in COUNTERS}
+
+        # Текущий месяц - из сырых строк журнала
+        raw = await self.session.execute(
+            select(PointsLedger.child_id, *_ledger_totals(PointsLedger))
+            .where(PointsLedger.child_id.in_(child_ids), PointsLedger.created_at >= _at(current))
+            .group_by(PointsLedger.child_id)
+        )
+        for row in raw:
+            result[row.child_id][current] = {key: getattr(row, key) for key in COUNTERS}
+        return result
+
+    @read_only
+    async def totals(self, child_ids: Iterable[int], months: int = 12) -> dict[int, dict[str, int]]:
+        """Суммы за последние months месяцев по каждому ребёнку."""
+        totals = {}
+        for child_id, by_month in (await self.monthly(child_ids, months)).items():
+            total = _empty()
+            for values in by_month.values():
+                for key in COUNTERS:
+                    total[key] += values[key]
+            totals[child_id] = total
+        return totals
+
+
+class RollupJob:
+    """Пересчёт закрытых месяцев: при пустой таблице - вся история, дальше - последние месяцы."""
+
+    def __init__(
+        self,
+        batch: Optional[int] = None,
+        interval: Optional[float] = None,
+        session_factory=SessionLocal
+    ):
+        self.batch = batch or settings.rollup_batch
+        self.interval = interval or settings.rollup_interval
+        self.session_factory = session_factory
+        self._wakeup = asyncio.Event()
+        self._stopped = False
+
+    async def _months(self, full: bool) -> list[date]:
+        current = month_start()
+        async with self.session_factory() as session:
+            # Строки текущего месяца пишет record(); история считается заполненной, если есть закрытые месяцы
+            has_history = await session.scalar(
+                select(LedgerMonthly.id).where(LedgerMonthly.month < current).limit(1)
+            ) is not None
+            if full or not has_history:
+                first = await session.scalar(select(func.min(points_ledger_all.c.created_at)))
+                if first is None:
+                    return []
+                start = month_start(first)
+            else:
+                start = shift_month(current, -settings.rollup_refresh_months)
+
+        months = []
+        while start < current:
+            months.append(start)
+            start = shift_month(start, 1)
+        return months
+
+    async def backfill(self, full: bool = False) -> int:
+        """Пересчитать закрытые месяцы: один проход по журналу на месяц, запись пачками детей."""
+        months = await self._months(full)
+        for month in months:
+            if self._stopped:
+                break
+            async with self.session_factory() as session:
+                await StatsService(session).rebuild_month(month, self.batch)
+        if months:
+            logger.info(f"Ledger rollups rebuilt for {len(months)} months since {months[0]:%Y-%m}")
+        return len(months)
+
+    async def run(self) -> None:
+        """Пересчёт раз в interval секунд: закрывает прошедший месяц и чинит пропуски."""
+        logger.info("Rollup job started")
+        while not self._stopped:
+            try:
+                await self.backfill()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Rollup job error: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
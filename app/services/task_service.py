@@ -2,11 +2,17 @@
 # Context: Business logic для работы с заданиями.
 # Requirements: Создание, получение, обновление заданий.
 
+from datetime import datetime
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-
-from app.db.models import Task, Child, TaskStatus, CheckIn, PointsLedger
+from sqlalchemy import select, update, and_, func
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.models import Task, Child, TaskType, TaskStatus, CheckIn, PointsLedger
+from app.db.session import read_only
+from app.db.shards import shard_router
+from app.core.events import event_hub, family_channel
+from app.services.stats_service import StatsService
 from app.core import get_logger
 
 logger = get_logger(__name__)
@@ -18,6 +24,54 @@ class TaskService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    async def create_task(
+        self,
+        parent_id: int,
+        child_id: int,
+        title: str,
+        description: str,
+        task_type: TaskType,
+        points: int,
+        coins: int = 0,
+        due_at: Optional[datetime] = None
+    ) -> Task:
+        """Создать задание для ребёнка."""
+        task = Task(
+            title=title,
+            description=description,
+            type=task_type,
+            points=points,
+            coins=coins,
+            due_at=due_at,
+            child_id=child_id,
+            parent_id=parent_id,
+            status=TaskStatus.new
+        )
+        self.session.add(task)
+        await self.session.commit()
+        await self.session.refresh(task)
+
+        logger.info(f"Task {task.id} created for child {child_id} by parent {parent_id}")
+        await self._publish(task, "task_created")
+        return task
+
+    async def _publish(self, task: Task, event_type: str, child: Optional[Child] = None) -> None:
+        """Сообщить семье об изменении задания (и баланса ребёнка)."""
+        if child is None:
+            child = await self.session.get(Child, task.child_id)
+        if not child:
+            return
+
+        data = {"task_id": task.id, "child_id": child.id, "status": task.status.value}
+        if event_type == "task_approved":
+            data.update(points=child.points, coins=child.coins)
+        elif event_type == "task_created" and task.due_at:
+            data.update(due_at=task.due_at)
+            if shard_router.enabled:
+                data.update(shard=shard_router.shard_of(self.session))
+        await event_hub.publish(family_channel(child.family_id), event_type, **data)
+
+    @read_only
     async def get_tasks_for_child(self, child_id: int, status: Optional[TaskStatus] = None) -> List[Task]:
         """Получить задания для ребёнка."""
         query = select(Task).where(Task.child_id == child_id)
@@ -30,6 +84,7 @@ class TaskService:
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
+    @read_only
     async def get_tasks_by_parent(self, parent_id: int) -> List[Task]:
         """Получить все задания, созданные родителем."""
         result = await self.session.execute(
@@ -38,10 +93,17 @@ class TaskService:
         )
         return list(result.scalars().all())
 
-    async def submit_task(self, task_id: int, child_id: int, note: Optional[str] = None, media_id: Optional[str] = None) -> bool:
+    async def submit_task(
+        self,
+        task_id: int,
+        child_id: int,
+        note: Optional[str] = None,
+        media_id: Optional[str] = None,
+        media_thumb_id: Optional[str] = None
+    ) -> bool:
         """Сдать задание на проверку."""
         # Проверяем, что задание принадлежит ребёнку
-        task = await self.session.get(Task, task_id)
+        task = await self.session.get(Task, task_id, populate_existing=True)
         if not task or task.child_id != child_id:
             return False
 
@@ -54,7 +116,8 @@ class TaskService:
             task_id=task_id,
             child_id=child_id,
             note=note,
-            media_id=media_id
+            media_id=media_id,
+            media_thumb_id=media_thumb_id
         )
         self.session.add(checkin)
 
@@ -63,25 +126,39 @@ class TaskService:
         await self.session.commit()
 
         logger.info(f"Task {task_id} submitted by child {child_id}")
+        await self._publish(task, "task_submitted")
         return True
 
     async def approve_task(self, task_id: int, parent_id: int) -> bool:
         """Одобрить выполненное задание."""
-        task = await self.session.get(Task, task_id)
+        # Перечитываем с writer: в сессии может лежать версия с реплики (read_only-методы)
+        task = await self.session.get(Task, task_id, populate_existing=True)
         if not task or task.parent_id != parent_id:
             return False
 
-        if task.status != TaskStatus.done:
+        # Смена статуса одним UPDATE: два одновременных одобрения не начислят награду дважды
+        result = await self.session.execute(
+            update(Task)
+            .where(Task.id == task.id, Task.status == TaskStatus.done)
+            .values(status=TaskStatus.approved)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
             return False
+        set_committed_value(task, "status", TaskStatus.approved)
 
-        # Обновляем статус
-        task.status = TaskStatus.approved
-        
-        # Начисляем очки и монеты ребёнку
-        child = await self.session.get(Child, task.child_id)
+        # Начисляем очки и монеты ребёнку в SQL, не поверх прочитанного баланса
+        child = await self.session.get(Child, task.child_id, populate_existing=True)
         if child:
-            child.points += task.points
-            child.coins += task.coins
+            balance = (await self.session.execute(
+                update(Child)
+                .where(Child.id == child.id)
+                .values(points=Child.points + task.points, coins=Child.coins + task.coins)
+                .returning(Child.points, Child.coins)
+                .execution_options(synchronize_session=False)
+            )).one()
+            set_committed_value(child, "points", balance.points)
+            set_committed_value(child, "coins", balance.coins)
 
             # Записываем в журнал
             ledger_entry = PointsLedger(
@@ -92,14 +169,16 @@ class TaskService:
                 ref_id=task.id
             )
             self.session.add(ledger_entry)
+            await StatsService(self.session).record(child.id, points=task.points, coins=task.coins, tasks=1)
 
         await self.session.commit()
         logger.info(f"Task {task_id} approved, child {child.id} got {task.points} points and {task.coins} coins")
+        await self._publish(task, "task_approved", child=child)
         return True
 
     async def reject_task(self, task_id: int, parent_id: int) -> bool:
         """Отклонить выполненное задание."""
-        task = await self.session.get(Task, task_id)
+        task = await self.session.get(Task, task_id, populate_existing=True)
         if not task or task.parent_id != parent_id:
             return False
 
@@ -111,8 +190,10 @@ class TaskService:
         await self.session.commit()
 
         logger.info(f"Task {task_id} rejected by parent {parent_id}")
+        await self._publish(task, "task_rejected")
         return True
 
+    @read_only
     async def get_pending_tasks(self, parent_id: int) -> List[Task]:
         """Получить задания, ожидающие проверки."""
         result = await self.session.execute(
@@ -125,6 +206,34 @@ class TaskService:
         )
         return list(result.scalars().all())
 
+    @read_only
+    async def get_pending_checkins(self, parent_id: int) -> List[tuple[Task, CheckIn]]:
+        """Задания на проверке вместе с последним чекином (один запрос)."""
+        latest = (
+            select(func.max(CheckIn.id))
+            .where(CheckIn.task_id == Task.id)
+            .correlate(Task)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            select(Task, CheckIn)
+            .join(CheckIn, CheckIn.id == latest)
+            .where(Task.parent_id == parent_id, Task.status == TaskStatus.done)
+            .order_by(Task.updated_at.desc())
+        )
+        return [(task, checkin) for task, checkin in result.all()]
+
+    @read_only
+    async def count_tasks_by_status(self, child_id: int) -> dict[TaskStatus, int]:
+        """Количество заданий ребёнка по статусам."""
+        result = await self.session.execute(
+            select(Task.status, func.count(Task.id))
+            .where(Task.child_id == child_id)
+            .group_by(Task.status)
+        )
+        return {status: count for status, count in result.all()}
+
+    @read_only
     async def get_task_with_checkin(self, task_id: int) -> Optional[tuple[Task, Optional[CheckIn]]]:
         """Получить задание с последним чекином."""
         task = await self.session.get(Task, task_id)
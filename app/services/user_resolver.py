@@ -0,0 +1,82 @@
+# Purpose: Telegram ID -> user resolver.
+# Context: Поиск родителя/ребёнка по индексу tg_id с кэшем между update.
+# Requirements: Один запрос на промах, identity map / PK lookup на попадание.
+
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.db.models import Parent, Child
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ResolvedUser:
+    """Пользователь, найденный по Telegram ID."""
+    role: str  # "parent" | "child"
+    db_id: int
+    family_id: int
+
+
+class UserResolver:
+    """Кэширующий резолвер tg_id -> Parent/Child."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300.0):
+        self._cache: TTLCache[int, ResolvedUser] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def resolve(self, session: AsyncSession, tg_id: int) -> Optional[ResolvedUser]:
+        """Определить роль и ID пользователя по Telegram ID."""
+        cached = self._cache.get(tg_id)
+        if cached is not None:
+            return cached
+
+        # Запросы по уникальному индексу tg_id
+        entity = await session.scalar(select(Parent).where(Parent.tg_id == tg_id))
+        if entity:
+            user = ResolvedUser("parent", entity.id, entity.family_id)
+        else:
+            entity = await session.scalar(select(Child).where(Child.tg_id == tg_id))
+            if not entity:
+                return None
+            user = ResolvedUser("child", entity.id, entity.family_id)
+
+        # Identity map держит объекты по слабым ссылкам - закрепляем на время сессии
+        session.info.setdefault("resolved_users", {})[tg_id] = entity
+        self._cache.set(tg_id, user)
+        return user
+
+    async def _get_entity(self, session: AsyncSession, tg_id: int, role: str, model):
+        user = await self.resolve(session, tg_id)
+        if not user or user.role != role:
+            return None
+        entity = session.info.get("resolved_users", {}).get(tg_id)
+        if entity is not None:
+            return entity
+        return await session.get(model, user.db_id)
+
+    async def get_parent(self, session: AsyncSession, tg_id: int) -> Optional[Parent]:
+        """Получить родителя по Telegram ID."""
+        return await self._get_entity(session, tg_id, "parent", Parent)
+
+    async def get_child(self, session: AsyncSession, tg_id: int) -> Optional[Child]:
+        """Получить ребёнка по Telegram ID."""
+        return await self._get_entity(session, tg_id, "child", Child)
+
+    def invalidate(self, tg_id: int) -> None:
+        """Сбросить кэш пользователя (смена роли, удаление)."""
+        self._cache.pop(tg_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+# Общий резолвер для middleware и handlers
+user_resolver = UserResolver(
+    maxsize=settings.user_cache_size,
+    ttl=settings.user_cache_ttl
+)
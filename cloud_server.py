@@ -7,8 +7,10 @@
 import os
 import json
 import asyncio
+import importlib.util
 import urllib.request
 import urllib.parse
+from collections import deque
 from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
@@ -179,6 +181,85 @@ async def serve_statistics():
     except:
         return JSONResponse({"error": "File not found"}, status_code=404)
 
+# JSON API WebApp (нужны зависимости из requirements.txt)
+try:
+    from app.api import api_router
+    app.include_router(api_router)
+    print("✅ WebApp API подключен")
+except ImportError as e:
+    print(f"⚠️ WebApp API отключен: {e}")
+
+# Telegram Bot на aiogram (нужны зависимости из requirements.txt)
+try:
+    from app.core.config import settings
+    from app.core.leader import LeaderLock
+    from app.core.dedup import update_dedup, update_keys
+    BOT_RUNTIME_AVAILABLE = importlib.util.find_spec("aiogram") is not None
+except ImportError as e:
+    BOT_RUNTIME_AVAILABLE = False
+    update_dedup = None
+    print(f"⚠️ aiogram-бот отключен, webhook в упрощённом режиме: {e}")
+
+
+class BotRuntime:
+    """Бот и dispatcher этого воркера; лидер дополнительно держит singleton-задачи."""
+
+    def __init__(self):
+        self.bot = None
+        self.dp = None
+        self.leader = None
+        self.jobs = []
+        self._ready = asyncio.Event()
+        self._tasks = []
+
+    async def start(self):
+        # aiogram импортируется ~2 с: грузим его в фоне, чтобы /health и WebApp отвечали сразу
+        self._tasks.append(asyncio.create_task(self._boot()))
+
+    async def _boot(self):
+        try:
+            if TELEGRAM_BOT_TOKEN:
+                bot_main = await asyncio.to_thread(importlib.import_module, "app.bot.main")
+                self.bot = await bot_main.create_bot()
+                self.dp = await bot_main.create_dispatcher()
+        except Exception as e:
+            print(f"❌ Ошибка запуска aiogram-бота: {e}")
+        finally:
+            self._ready.set()
+
+        self.leader = LeaderLock(settings.leader_lock_file)
+        await self.leader.run_when_leader(self._start_singletons, settings.leader_retry_seconds)
+
+    async def wait_ready(self):
+        """Dispatcher воркера (None - упрощённый режим) после фоновой загрузки."""
+        await self._ready.wait()
+        return self.dp
+
+    async def _start_singletons(self):
+        """Только в одном воркере: webhook, напоминания и фоновые задачи над журналом."""
+        print(f"👑 Воркер {os.getpid()} выполняет фоновые задачи")
+        await setup_webhook()
+        if self.bot:
+            from app.bot.main import create_background_jobs
+            self.jobs = create_background_jobs(self.bot)
+            self._tasks.extend(asyncio.create_task(job.run()) for job in self.jobs)
+
+    async def stop(self):
+        for job in self.jobs:
+            job.stop()
+        for task in self._tasks:
+            task.cancel()
+        if self.dp:
+            # В webhook-режиме polling нет - shutdown-handler dispatcher (запись update) вызываем сами
+            await self.dp.emit_shutdown(bot=self.bot)
+        if self.bot:
+            await self.bot.session.close()
+        if self.leader:
+            self.leader.release()
+
+
+bot_runtime = BotRuntime()
+
 @app.post("/api/telegram-data")
 async def handle_telegram_data(request: Request):
     """Обработка данных от Telegram WebApp"""
@@ -188,12 +269,43 @@ async def handle_telegram_data(request: Request):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+# Упрощённый режим без app.core: последние update_id в памяти
+_recent_update_ids = deque(maxlen=10000)
+_recent_update_set = set()
+
+def _remember_update_id(update_id) -> bool:
+    if update_id is None:
+        return True
+    if update_id in _recent_update_set:
+        return False
+    if len(_recent_update_ids) == _recent_update_ids.maxlen:
+        _recent_update_set.discard(_recent_update_ids[0])
+    _recent_update_ids.append(update_id)
+    _recent_update_set.add(update_id)
+    return True
+
 # Telegram Bot Webhook
 @app.post("/telegram-webhook")
 async def telegram_webhook(request: Request):
     """Webhook для получения обновлений от Telegram Bot"""
     try:
         update = await request.json()
+        
+        # Повторная доставка того же update (таймаут ответа) - сразу подтверждаем
+        if update_dedup is not None:
+            is_new = await update_dedup.first_seen(*update_keys(update))
+        else:
+            is_new = _remember_update_id(update.get("update_id"))
+        if not is_new:
+            return {"status": "ok", "duplicate": True}
+        
+        if BOT_RUNTIME_AVAILABLE:
+            dp = await bot_runtime.wait_ready()
+            if dp is not None:
+                # Полноценная обработка; обновления распределяются по воркерам
+                await dp.feed_webhook_update(bot_runtime.bot, update, dedup_checked=True)
+                return {"status": "ok"}
+        
         print(f"📨 Получено обновление от Telegram: {update}")
         
         # Простая обработка команды /start
@@ -275,12 +387,16 @@ async def setup_webhook():
         req = urllib.request.Request(url, data=data, method="POST")
         req.add_header("Content-Type", "application/x-www-form-urlencoded")
         
-        with urllib.request.urlopen(req) as response:
-            result = json.loads(response.read().decode())
-            if result.get("ok"):
-                print(f"✅ Webhook установлен: {webhook_url}")
-            else:
-                print(f"❌ Ошибка установки webhook: {result}")
+        def post():
+            with urllib.request.urlopen(req, timeout=10) as response:
+                return json.loads(response.read().decode())
+        
+        # Сетевой запрос не должен задерживать старт сервера
+        result = await asyncio.to_thread(post)
+        if result.get("ok"):
+            print(f"✅ Webhook установлен: {webhook_url}")
+        else:
+            print(f"❌ Ошибка установки webhook: {result}")
     except Exception as e:
         print(f"❌ Ошибка установки webhook: {e}")
 
@@ -288,7 +404,14 @@ async def setup_webhook():
 @app.on_event("startup")
 async def startup_event():
     """Выполняется при запуске приложения"""
-    await setup_webhook()
+    if BOT_RUNTIME_AVAILABLE:
+        await bot_runtime.start()
+    else:
+        asyncio.create_task(setup_webhook())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await bot_runtime.stop()
 
 if __name__ == "__main__":
     print(f"🚀 Запуск Family Habits WebApp + Bot на {HOST}:{PORT}")
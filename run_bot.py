@@ -7,8 +7,9 @@ import asyncio
 import os
 import sys
 from app.core.config import settings
+from app.core.events import event_hub
 from app.core import setup_logging, get_logger
-from app.bot.main import create_bot, create_dispatcher
+from app.bot.main import create_background_jobs, create_bot, create_dispatcher
 
 logger = get_logger(__name__)
 
@@ -123,6 +124,11 @@ async def main():
     bot = await create_bot()
     dp = await create_dispatcher()
     
+    if settings.events_backend == "redis":
+        await event_hub.start_backplane(settings.redis_url)
+    # Те же фоновые задачи, что у app.bot.main: напоминания, сверка журнала, архив, итоги (по шардам)
+    background = [asyncio.create_task(job.run()) for job in create_background_jobs(bot)]
+    
     try:
         await bot.delete_webhook(drop_pending_updates=True)
         logger.info("✅ Bot started! Send /start to test")
@@ -130,6 +136,9 @@ async def main():
     except Exception as e:
         logger.error(f"❌ Bot error: {e}")
     finally:
+        for task in background:
+            task.cancel()
+        await event_hub.stop_backplane()
         await bot.session.close()
 
 
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Purpose: Production runner for WebApp API + bot webhook.
+# Context: N процессов uvicorn (API_WORKERS) на всех ядрах, один из них - лидер.
+# Requirements: uvloop/httptools при наличии, состояние воркеров не разделяется.
+
+import importlib.util
+import os
+import sys
+
+import uvicorn
+
+from app.core.config import settings
+from app.core import setup_logging, get_logger
+
+logger = get_logger(__name__)
+
+APP = "cloud_server:app"
+
+
+def pick_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def pick_http() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def main() -> None:
+    setup_logging(settings.log_level)
+
+    workers = max(settings.api_workers, 1)
+    port = int(os.environ.get("PORT", settings.api_port))
+
+    if workers > 1 and settings.fsm_storage != "redis":
+        logger.warning("API_WORKERS > 1 with in-memory FSM: dialogs break when updates hit another worker, set FSM_STORAGE=redis")
+    if workers > 1 and settings.events_backend != "redis":
+        logger.warning("API_WORKERS > 1 with in-memory events: SSE clients only see events of their own worker, set EVENTS_BACKEND=redis")
+
+    # Импортируем приложение заранее: ошибки конфигурации видны до запуска воркеров
+    import cloud_server  # noqa: F401
+
+    logger.info(f"🚀 Starting {workers} worker(s) on {settings.api_host}:{port} (loop={pick_loop()}, http={pick_http()})")
+    uvicorn.run(
+        APP,
+        host=settings.api_host,
+        port=port,
+        workers=workers,
+        loop=pick_loop(),
+        http=pick_http(),
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        access_log=False,
+        timeout_keep_alive=30
+    )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped by user")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
@@ -4,14 +4,20 @@ FastAPI server для обслуживания Family Habits WebApp
 Интеграция с Telegram WebApp API
 """
 
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
+import sys
 import logging
 from pathlib import Path
 
+# Корень проекта в sys.path, чтобы сервер запускался из папки webapp
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.api import api_router
+
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -111,70 +117,13 @@ async def design_system_css():
     """CSS файл дизайн-системы"""
     return FileResponse(static_dir / "design-system.css", media_type="text/css")
 
+@app.get("/telegram-webapp.js")
+async def telegram_webapp_js():
+    """Клиентская библиотека Telegram WebApp"""
+    return FileResponse(static_dir / "telegram-webapp.js", media_type="application/javascript")
+
 # API эндпоинты для интеграции с Telegram Bot
-@app.post("/api/telegram/user-data")
-async def receive_telegram_data(request: Request):
-    """Получение данных пользователя из Telegram WebApp"""
-    try:
-        data = await request.json()
-        logger.info(f"Received Telegram data: {data}")
-        
-        # Здесь можно обработать данные пользователя
-        # и синхронизировать с базой данных бота
-        
-        return {"status": "success", "message": "Data received"}
-    except Exception as e:
-        logger.error(f"Error processing Telegram data: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
-
-@app.post("/api/tasks/create")
-async def create_task_api(request: Request):
-    """API для создания задач из WebApp"""
-    try:
-        data = await request.json()
-        logger.info(f"Creating task: {data}")
-        
-        # Здесь будет логика создания задачи
-        # Интеграция с базой данных бота
-        
-        return {"status": "success", "task_id": "demo_task_123"}
-    except Exception as e:
-        logger.error(f"Error creating task: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
-
-@app.post("/api/shop/purchase")
-async def purchase_item_api(request: Request):
-    """API для покупки товаров в магазине"""
-    try:
-        data = await request.json()
-        logger.info(f"Purchase request: {data}")
-        
-        # Здесь будет логика покупки товаров
-        # Проверка баланса звезд, списание, добавление в инвентарь
-        
-        return {"status": "success", "purchase_id": "demo_purchase_456"}
-    except Exception as e:
-        logger.error(f"Error processing purchase: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
-
-@app.get("/api/user/{user_id}/stats")
-async def get_user_stats(user_id: int):
-    """Получение статистики пользователя"""
-    try:
-        # Здесь будет логика получения статистики из базы данных
-        stats = {
-            "user_id": user_id,
-            "stars": 150,
-            "level": 7,
-            "streak_days": 12,
-            "tasks_completed": 89,
-            "family_participation": 85
-        }
-        
-        return stats
-    except Exception as e:
-        logger.error(f"Error getting user stats: {e}")
-        raise HTTPException(status_code=404, detail="User not found")
+app.include_router(api_router)
 
 if __name__ == "__main__":
     import uvicorn
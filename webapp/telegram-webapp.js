@@ -290,17 +290,48 @@ class TelegramWebApp {
     }
 
     /**
-     * Отправка данных в бот
+     * Получение токена API (initData проверяется сервером один раз)
      */
-    async sendToBot(endpoint, data) {
-        const response = await fetch(endpoint, {
+    async getApiToken() {
+        const cached = JSON.parse(sessionStorage.getItem('apiToken') || 'null');
+        if (cached && cached.expires_at * 1000 > Date.now() + 60000) {
+            return cached.token;
+        }
+
+        const response = await fetch('/api/auth/telegram', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify(data)
+            body: JSON.stringify({ init_data: this.initData || '' })
         });
 
+        if (!response.ok) {
+            throw new Error(`Auth error: ${response.status}`);
+        }
+
+        const auth = await response.json();
+        sessionStorage.setItem('apiToken', JSON.stringify(auth));
+        return auth.token;
+    }
+
+    /**
+     * Запрос к API с токеном
+     */
+    async apiRequest(endpoint, options = {}) {
+        const token = await this.getApiToken();
+        const response = await fetch(endpoint, {
+            ...options,
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${token}`,
+                ...(options.headers || {})
+            }
+        });
+
+        if (response.status === 401) {
+            sessionStorage.removeItem('apiToken');
+        }
         if (!response.ok) {
             throw new Error(`Server error: ${response.status}`);
         }
@@ -308,6 +339,54 @@ class TelegramWebApp {
         return await response.json();
     }
 
+    /**
+     * Данные первого экрана одним запросом: роль, семья, задания, магазин
+     */
+    async bootstrap() {
+        if (!this.bootstrapData) {
+            this.bootstrapData = await this.apiRequest('/api/bootstrap');
+        }
+        return this.bootstrapData;
+    }
+
+    /**
+     * Подписка на события семьи (Server-Sent Events)
+     */
+    async subscribeEvents(onEvent) {
+        if (!this.initData) return;
+
+        const token = await this.getApiToken();
+        const source = new EventSource(`/api/events?token=${encodeURIComponent(token)}`);
+
+        source.onmessage = (message) => {
+            const event = JSON.parse(message.data);
+            // Данные первого экрана устарели
+            this.bootstrapData = null;
+            onEvent(event);
+        };
+
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) {
+                // Токен мог истечь - переподключаемся с новым
+                sessionStorage.removeItem('apiToken');
+                setTimeout(() => this.subscribeEvents(onEvent), 5000);
+            }
+        };
+
+        this.eventSource = source;
+        return source;
+    }
+
+    /**
+     * Отправка данных в бот
+     */
+    async sendToBot(endpoint, data) {
+        return await this.apiRequest(endpoint, {
+            method: 'POST',
+            body: JSON.stringify(data)
+        });
+    }
+
     /**
      * Показать прогресс
      */